@@ -0,0 +1,7 @@
+import sys
+
+from algoviz.cli import main
+
+# Same as: python -m algoviz sort --algo merge --n 100000
+if __name__ == '__main__':
+    sys.exit(main(['sort', '--algo', 'merge', '--n', '100000'] + sys.argv[1:]))
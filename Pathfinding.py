@@ -0,0 +1,7 @@
+import sys
+
+from algoviz.cli import main
+
+# Same as: python -m algoviz grid --algo astar
+if __name__ == '__main__':
+    sys.exit(main(['grid', '--algo', 'astar'] + sys.argv[1:]))
@@ -0,0 +1,2 @@
+# Shared engine for the visualizer scripts. Nothing in here imports pygame
+# at module level, so the algorithms can run headless.
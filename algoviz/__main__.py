@@ -0,0 +1,5 @@
+import sys
+
+from algoviz.cli import main
+
+sys.exit(main())
@@ -0,0 +1,693 @@
+import sys
+
+import pygame
+
+from algoviz import datasets
+from algoviz.arraystate import STATE_COLORS as BAR_COLORS, NORMAL, WORKER_COLORS, ArrayState, ArrayReplayer
+from algoviz.display import first_frame_seconds
+from algoviz.grid import EMPTY, WALL, ENDPOINT, CURRENT, VISITED, FOUND, make_grid
+from algoviz.ops import COMPARE, SWAP, WRITE, record, record_in_background
+from algoviz.pathfinding import SearchStats
+from algoviz.profiler import FrameProfiler, StepProfiler
+from algoviz.registry import SORTS, SEARCHES
+from algoviz.render import BarRenderer, ColumnRenderer, GridRenderer
+from algoviz.scheduler import StepScheduler
+from algoviz.text import TextOverlay, render_text
+from algoviz.timeline import ArrayTimeline, GridTimeline
+from algoviz.tracefile import TraceFile
+
+# The interactive visualizers. Imported by the command line only once the
+# display is up, since importing this module imports pygame.
+
+# WINDOW
+WINDOW_SIZE = 600
+TOP = 100               # header height above the bars
+STATUS_HEIGHT = 40      # status line below the grid
+RACE_TOP = 80           # header height above the race panes
+PANE_LABEL = 30         # counter line at the top of each pane
+PANE_GAP = 6
+
+# VARIABLES
+FPS = 60
+HUD_REFRESH = 15        # frames between profiler HUD updates
+IDLE_WAKEUP = 1000      # ms a paused loop sleeps at most between frames
+HUD_MARGIN = 8
+RECT_WIDTH = 20         # widest bar
+MIN_RECT_WIDTH = 4      # below this the array is drawn binned into pixel columns
+MIN_HEIGHT = 20
+MAX_HEIGHT = 500
+
+# COLORS
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+GREEN = (0, 255, 0)
+BLUE = (0, 0, 255)
+YELLOW = (255, 255, 0)
+RED = (255, 0, 0)
+GRAY = (128, 128, 128)
+BROWN = (139, 90, 43)    # open cells of the heaviest weight
+PURPLE = (128, 0, 128)
+
+STATE_COLORS = {
+    EMPTY: WHITE,
+    WALL: BLACK,
+    ENDPOINT: RED,
+    CURRENT: BLUE,
+    VISITED: YELLOW,
+    FOUND: GREEN,
+}
+
+# FUNCTIONS
+def display_text(window, txt, y, size):
+    text = render_text(txt, size, BLACK)
+    text_rect = text.get_rect(center=(window.get_width() / 2, y))
+    window.blit(text, text_rect)
+    return text_rect
+
+def report_first_frame(options):
+    # With --startup-time: print time-to-first-frame and ask the loop to stop
+    if not options.startup_time:
+        return True
+    print(f'first frame after {first_frame_seconds() * 1000:.1f} ms', file=sys.stderr)
+    return False
+
+def start_profiling(window, options, scheduler):
+    # The frame profiler always runs; F3 shows it. --profile-steps wraps the
+    # scheduler's step function as well.
+    profiler = FrameProfiler()
+    hud = ProfileHUD(window, profiler)
+    steps = None
+    if options.profile_steps:
+        steps = StepProfiler(options.profiler)
+        scheduler.wrap = steps.wrap
+    return profiler, hud, steps
+
+def poll_events(idle):
+    # A paused loop has nothing to draw until something happens, so it
+    # sleeps in event.wait() (with a wakeup timer for the profiler HUD)
+    # instead of spinning at FPS. A running one just drains the queue.
+    if not idle:
+        return pygame.event.get()
+    event = pygame.event.wait(IDLE_WAKEUP)
+    events = [] if event.type == pygame.NOEVENT else [event]
+    return events + pygame.event.get()
+
+def finish_profiling(options, profiler, steps):
+    if options.profile:
+        profiler.dump(options.profile)
+        print(f'frame timings written to {options.profile}', file=sys.stderr)
+    if steps is not None:
+        steps.save(options.profile_steps)
+        print(f'step profile written to {options.profile_steps}', file=sys.stderr)
+
+def create_rectangles(heights, width):
+    # Right-aligned, like the original scripts
+    left = WINDOW_SIZE - len(heights) * width
+    rectangles = []
+
+    for i, height in enumerate(heights):
+        rect = Rectangle(PURPLE, left + i * width, width, height)
+        rectangles.append(rect)
+
+    return rectangles
+
+def handle_speed_keys(event, scheduler):
+    if event.key == pygame.K_UP:
+        scheduler.faster()
+    if event.key == pygame.K_DOWN:
+        scheduler.slower()
+
+def handle_timeline_keys(event, timeline):
+    # LEFT/RIGHT step once, PAGE DOWN/UP a hundredth of the run, HOME/END
+    # jump to either end. Returns True when the key moved the timeline.
+    jump = max(1, len(timeline) // 100)
+    if event.key == pygame.K_RIGHT:
+        timeline.step()
+    elif event.key == pygame.K_PAGEUP:
+        timeline.seek(timeline.position + jump)
+    elif event.key == pygame.K_LEFT:
+        timeline.seek(timeline.position - 1)
+    elif event.key == pygame.K_PAGEDOWN:
+        timeline.seek(timeline.position - jump)
+    elif event.key == pygame.K_HOME:
+        timeline.seek(0)
+    elif event.key == pygame.K_END:
+        timeline.seek(len(timeline))
+    else:
+        return False
+    return True
+
+def run_sort(window, options):
+    algorithm = SORTS[options.algo]
+    n = options.n
+
+    # Small arrays are drawn as outlined bars with heights in pixels; large
+    # ones as values 1..n binned into columns
+    if n * MIN_RECT_WIDTH <= WINDOW_SIZE:
+        state = ArrayState(datasets.generate(options.distribution, n, MIN_HEIGHT, MAX_HEIGHT, seed=options.seed))
+        view = BarView(window, state)
+        title = f'{algorithm.title} Algorithm Visualization: '
+        speed = options.speed or 10
+    else:
+        state = ArrayState(datasets.generate(options.distribution, n, seed=options.seed))
+        view = ColumnView(window, state)
+        title = f'{algorithm.title} of {n} Elements: '
+        speed = options.speed or 100_000
+
+    # Recorded in the background, so the first frame does not wait for it
+    trace = record_in_background(algorithm.runner(options.workers), state.values.tolist())
+    timeline = ArrayTimeline(state, trace, view.dirty)
+    timeline.seek(options.start)
+    sort_loop(window, options, title, view, timeline, speed)
+
+def run_replay(window, options):
+    # Play back a recorded trace file, optionally from the middle
+    tracefile = TraceFile(options.trace)
+    state = ArrayState(tracefile.keyframe(0)[0])
+    view = ColumnView(window, state)
+    timeline = ArrayTimeline(state, tracefile)
+    timeline.seek(options.start)
+    title = f'Replay of {tracefile.elements} Elements: '
+    try:
+        sort_loop(window, options, title, view, timeline, options.speed or 100_000)
+    finally:
+        tracefile.close()
+
+def sort_loop(window, options, title, view, timeline, speed):
+    scheduler = StepScheduler(speed)
+    step_text = TextOverlay(window, WINDOW_SIZE / 2, 92, 20, BLACK, YELLOW)
+    scrub = ScrubBar(window, (10, 4, WINDOW_SIZE - 20, 8), WHITE, BLACK)
+    clock = pygame.time.Clock()
+    profiler, hud, steps = start_profiling(window, options, scheduler)
+    first_frame = True
+
+    # MAIN LOOP
+    run = True
+    sorting = False
+    full_redraw = True
+    while run:
+        profiler.frame()
+        clock.tick(FPS)
+        profiler.mark('wait')
+
+        if sorting:
+            taken, finished = scheduler.advance(timeline)
+            view.changed = view.changed or taken > 0
+            if finished:
+                sorting = False
+        profiler.mark('step')
+
+        if timeline.full_redraw:
+            full_redraw = True
+            timeline.full_redraw = False
+
+        status = f'Step {timeline.position} / {len(timeline)} at {scheduler.steps_per_second} steps/s (UP/DOWN to change)'
+        if full_redraw:
+            window.fill(YELLOW)
+            view.draw(full_redraw)
+            profiler.mark('draw')
+            display_text(window, title, 30, 40)
+            display_text(window, 'SPACE play/pause, LEFT/RIGHT step, q quit.', 70, 30)
+            step_text.invalidate()
+            step_text.draw(status)
+            scrub.invalidate()
+            scrub.draw(timeline.position, len(timeline))
+            profiler.mark('text')
+            hud.draw()
+            profiler.mark('hud')
+            pygame.display.update()
+            full_redraw = False
+        else:
+            updated = view.draw(full_redraw)
+            profiler.mark('draw')
+            for rect in (step_text.draw(status), scrub.draw(timeline.position, len(timeline))):
+                if rect:
+                    updated.append(rect)
+            profiler.mark('text')
+            hud_rect = hud.draw()
+            if hud_rect:
+                updated.append(hud_rect)
+            profiler.mark('hud')
+            if updated:
+                pygame.display.update(updated)
+        profiler.mark('update')
+
+        # EVENT HANDLER
+        # The first frame never waits, so --startup-time can report it
+        events = poll_events(not (sorting or first_frame))
+        profiler.mark('idle')
+        for event in events:
+            if event.type == pygame.QUIT:
+                run = False
+
+            if event.type == pygame.VIDEOEXPOSE or hud.handle(event):
+                full_redraw = True
+
+            fraction = scrub.handle(event)
+            if fraction is not None:
+                timeline.seek(round(fraction * len(timeline)))
+                sorting = False
+                view.changed = True
+
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_SPACE:
+                    sorting = not sorting
+                    scheduler.reset()
+                if handle_timeline_keys(event, timeline):
+                    sorting = False
+                    view.changed = True
+                handle_speed_keys(event, scheduler)
+                if event.key == pygame.K_q:
+                    run = False
+        profiler.mark('events')
+
+        if first_frame:
+            first_frame = False
+            run = run and report_first_frame(options)
+
+    finish_profiling(options, profiler, steps)
+
+def run_grid(window, options):
+    rows, cols = options.rows, options.cols
+    if options.resumed is not None:
+        grid = options.resumed.grid
+        start, target = options.resumed.start, options.resumed.target
+    else:
+        grid = make_grid(rows, cols, (0, 0), (rows - 1, cols - 1), options.density, options.seed, options.maze,
+                         options.weights)
+        start = grid.index(0, 0)
+        target = grid.index(rows - 1, cols - 1)
+    renderer = GridRenderer(window, grid, options.cell_size, STATE_COLORS, GRAY, BROWN)
+    status_y = renderer.height + STATUS_HEIGHT / 2
+    status_text = TextOverlay(window, window.get_width() / 2, status_y, 20, BLACK, WHITE)
+    keys = {getattr(pygame, f'K_{k + 1}'): name for k, name in enumerate(SEARCHES)}
+
+    def start_search(name):
+        grid.reset_search()
+        grid.state[start] = ENDPOINT
+        grid.state[target] = ENDPOINT
+        renderer.invalidate()
+        stats = SearchStats()
+        search = SEARCHES[name].search(diagonal=options.diagonal, heuristic=options.heuristic)(grid, start, target, stats=stats)
+        timeline = GridTimeline(grid, search, renderer.dirty)
+        return SEARCHES[name], stats, timeline
+
+    if options.resumed is not None:
+        search = options.resumed
+        algorithm, stats, timeline = SEARCHES[search.name], search.stats, GridTimeline(grid, search, renderer.dirty)
+    else:
+        algorithm, stats, timeline = start_search(options.algo)
+    scheduler = StepScheduler(options.speed or 10)
+    scrub = ScrubBar(window, (10, renderer.height + STATUS_HEIGHT - 8, window.get_width() - 20, 6), WHITE, BLACK)
+    clock = pygame.time.Clock()
+    profiler, hud, steps = start_profiling(window, options, scheduler)
+    first_frame = True
+
+    run = True
+    searching = False
+    while run:
+        profiler.frame()
+        clock.tick(FPS)
+        profiler.mark('wait')
+
+        if searching:
+            _, finished = scheduler.advance(timeline)
+            if finished:
+                searching = False
+        profiler.mark('step')
+
+        if timeline.full_redraw:
+            renderer.invalidate()
+            timeline.full_redraw = False
+
+        full_redraw = renderer.full_redraw
+        if full_redraw:
+            window.fill(WHITE)
+            status_text.invalidate()
+            scrub.invalidate()
+
+        # Patch the touched cells, then put back any header text they covered
+        updated = renderer.draw()
+        profiler.mark('draw')
+        title_rect = display_text(window, f'{algorithm.title} Algorithm Visualization: ', 30, 40)
+        help_rect = display_text(window, f'SPACE play, LEFT/RIGHT step, 1-{len(SEARCHES)} search, q quit.', 70, 30)
+        for text_rect in (title_rect, help_rect):
+            if text_rect.collidelist(updated) != -1:
+                updated.append(text_rect)
+
+        # The counters belong to the search, which is always at the explored end
+        status = f'step {timeline.position} / {len(timeline)}  expanded {stats.expanded}  pushes {stats.pushes}  pops {stats.pops}  stale {stats.stale}'
+        if stats.cost is not None:
+            status += f'  cost {stats.cost:g}'
+        if not grid.reachable(start, target):
+            status += '  unreachable'
+        for rect in (status_text.draw(status), scrub.draw(timeline.position, len(timeline))):
+            if rect:
+                updated.append(rect)
+        profiler.mark('text')
+        hud_rect = hud.draw()
+        if hud_rect:
+            updated.append(hud_rect)
+        profiler.mark('hud')
+
+        if full_redraw:
+            pygame.display.update()
+        elif updated:
+            pygame.display.update(updated)
+        profiler.mark('update')
+
+        events = poll_events(not (searching or first_frame))
+        profiler.mark('idle')
+        for event in events:
+            if event.type == pygame.QUIT:
+                run = False
+
+            if event.type == pygame.VIDEOEXPOSE or hud.handle(event):
+                renderer.invalidate()
+
+            fraction = scrub.handle(event)
+            if fraction is not None:
+                timeline.seek(round(fraction * len(timeline)))
+                searching = False
+
+            # Clicking a cell adds or removes a wall and restarts the search
+            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and event.pos[1] < renderer.height:
+                index = renderer.cell_at(*event.pos)
+                if index not in (start, target):
+                    grid.set_wall(index, not grid.walls[index])
+                    algorithm, stats, timeline = start_search(algorithm.name)
+                    searching = False
+
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_SPACE:
+                    searching = not searching
+                    scheduler.reset()
+                if event.key in keys:
+                    algorithm, stats, timeline = start_search(keys[event.key])
+                    searching = False
+                if handle_timeline_keys(event, timeline):
+                    searching = False
+                if event.key == pygame.K_s and options.checkpoint:
+                    # Saved at the explored end, where the search itself is
+                    timeline.seek(len(timeline))
+                    timeline.search.save(options.checkpoint)
+                    searching = False
+                handle_speed_keys(event, scheduler)
+                if event.key == pygame.K_q:
+                    run = False
+        profiler.mark('events')
+
+        if first_frame:
+            first_frame = False
+            run = run and report_first_frame(options)
+
+    finish_profiling(options, profiler, steps)
+
+# CLASSES
+class Rectangle:
+    def __init__(self, color, x, width, height):
+        self.color = color
+        self.x = x
+        self.width = width
+        self.height = height
+
+class BarView:
+    # Outlined bars drawn from an ArrayState. Only the indices in `dirty` are
+    # copied onto their rectangles and repainted.
+    def __init__(self, window, state):
+        width = min(RECT_WIDTH, WINDOW_SIZE // max(len(state), 1))
+        self.state = state
+        self.rectangles = create_rectangles(state.values.tolist(), width)
+        self.renderer = BarRenderer(window, YELLOW, BLACK)
+        self.dirty = self.renderer.dirty
+        self.changed = True
+
+    def draw(self, full_redraw):
+        values = self.state.values
+        colors = self.state.colors
+        owners = self.state.owners
+        if full_redraw:
+            self.renderer.invalidate()
+        for k in range(len(values)) if full_redraw else self.dirty:
+            rect = self.rectangles[k]
+            rect.height = int(values[k])
+            if colors[k] == NORMAL and owners[k]:
+                rect.color = WORKER_COLORS[owners[k] - 1]
+            else:
+                rect.color = BAR_COLORS[colors[k]]
+        self.changed = False
+        return self.renderer.draw(self.rectangles)
+
+class ColumnView:
+    # Values binned into pixel columns; redrawn whenever anything moved
+    def __init__(self, window, state):
+        self.state = state
+        self.renderer = ColumnRenderer(window, (0, TOP, WINDOW_SIZE, WINDOW_SIZE - TOP), state.values.max(initial=1))
+        self.dirty = None
+        self.changed = True
+
+    def draw(self, full_redraw):
+        if not (full_redraw or self.changed):
+            return []
+        self.changed = False
+        return [self.renderer.draw(self.state)]
+
+class ScrubBar:
+    # Progress bar that doubles as a slider: click or drag on it to jump.
+    # draw() returns its rect only when the filled width changed.
+    def __init__(self, window, rect, track, fill):
+        self.window = window
+        self.rect = pygame.Rect(rect)
+        self.track = track
+        self.fill = fill
+        self.dragging = False
+        self.shown = None
+
+    def invalidate(self):
+        self.shown = None
+
+    def draw(self, position, length):
+        width = self.rect.width * position // length if length else 0
+        if width == self.shown:
+            return None
+        self.window.fill(self.track, self.rect)
+        self.window.fill(self.fill, (self.rect.x, self.rect.y, width, self.rect.height))
+        self.shown = width
+        return self.rect
+
+    def handle(self, event):
+        # The fraction under the mouse while clicking or dragging, else None
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            self.dragging = self.rect.inflate(0, 12).collidepoint(event.pos)
+        elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+            self.dragging = False
+        if not (self.dragging and event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEMOTION)):
+            return None
+        return min(max((event.pos[0] - self.rect.x) / self.rect.width, 0.0), 1.0)
+
+class ProfileHUD:
+    # p50/p99 of every frame phase in the bottom-left corner, toggled with
+    # F3. While shown it is drawn over the view every frame; the numbers are
+    # recomputed every HUD_REFRESH frames.
+    def __init__(self, window, profiler):
+        self.window = window
+        self.profiler = profiler
+        self.visible = False
+        self.surface = None
+        self.refreshed = 0
+
+    def handle(self, event):
+        # True when the HUD was toggled, so the caller repaints under it
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+            self.visible = not self.visible
+            self.surface = None
+            return True
+        return False
+
+    def render(self):
+        # A table of phase, p50, p99 in milliseconds, numbers right-aligned
+        rows = [('ms', 'p50', 'p99')]
+        for phase, (p50, p99) in self.profiler.percentiles().items():
+            rows.append((phase, f'{p50:.2f}', f'{p99:.2f}'))
+        cells = [[render_text(txt, 16, BLACK) for txt in row] for row in rows]
+        widths = [max(row[k].get_width() for row in cells) + HUD_MARGIN for k in range(3)]
+        line = max(text.get_height() for row in cells for text in row)
+        surface = pygame.Surface((sum(widths) + HUD_MARGIN, line * len(rows) + 2 * HUD_MARGIN))
+        surface.fill(WHITE)
+        pygame.draw.rect(surface, BLACK, surface.get_rect(), 1)
+        for r, row in enumerate(cells):
+            y = HUD_MARGIN + r * line
+            surface.blit(row[0], (HUD_MARGIN, y))
+            right = widths[0]
+            for k in (1, 2):
+                right += widths[k]
+                surface.blit(row[k], (right - row[k].get_width(), y))
+        return surface
+
+    def draw(self):
+        # Returns the rect drawn, or None when hidden
+        if not self.visible:
+            return None
+        if self.surface is None or self.profiler.frames - self.refreshed >= HUD_REFRESH:
+            self.surface = self.render()
+            self.refreshed = self.profiler.frames
+        rect = self.surface.get_rect(bottomleft=(HUD_MARGIN, self.window.get_height() - HUD_MARGIN))
+        self.window.blit(self.surface, rect)
+        return rect
+
+class Pane:
+    # One algorithm in a race: its own copy of the input, replayer, renderer
+    # and counters. `changed` tells the render pass whether to draw it.
+    def __init__(self, window, algorithm, values, area):
+        self.algorithm = algorithm
+        self.state = ArrayState(values)
+        self.replayer = ArrayReplayer(self.state)
+        self.trace = record(algorithm.run, values.tolist())
+        self.position = 0
+        self.finished = False
+        self.changed = True
+        self.compares = 0
+        self.writes = 0
+
+        area = pygame.Rect(area)
+        self.area = area
+        self.renderer = ColumnRenderer(
+            window,
+            (area.x, area.y + PANE_LABEL, area.width, area.height - PANE_LABEL),
+            self.state.values.max(initial=1),
+        )
+        self.label = TextOverlay(window, area.centerx, area.y + PANE_LABEL / 2, 18, BLACK, YELLOW)
+
+    def step(self):
+        if self.position == len(self.trace):
+            self.replayer.finish()
+            self.finished = True
+            return
+        op, i, j = self.trace[self.position]
+        self.replayer.apply(op, i, j)
+        self.position += 1
+        if op == COMPARE:
+            self.compares += 1
+        elif op == SWAP:
+            self.writes += 2
+        elif op == WRITE:
+            self.writes += 1
+
+    def status(self):
+        txt = f'{self.algorithm.title}: {self.compares} compares, {self.writes} writes'
+        if self.finished:
+            txt += ' (done)'
+        return txt
+
+# FUNCTIONS
+def layout_panes(count, width, height, top):
+    cols = 1
+    while cols * cols < count:
+        cols += 1
+    rows = -(-count // cols)
+    pane_width = (width - PANE_GAP * (cols + 1)) // cols
+    pane_height = (height - top - PANE_GAP * (rows + 1)) // rows
+    return [
+        (PANE_GAP + (k % cols) * (pane_width + PANE_GAP), top + PANE_GAP + (k // cols) * (pane_height + PANE_GAP), pane_width, pane_height)
+        for k in range(count)
+    ]
+
+def lockstep(panes):
+    # One scheduler step = one operation in every pane still running.
+    # Finished panes drop out, so they cost nothing afterwards.
+    running = list(panes)
+    while running:
+        for pane in running:
+            pane.step()
+            pane.changed = True
+        running = [pane for pane in running if not pane.finished]
+        yield
+
+def run_race(window, options):
+    names = options.algos or list(SORTS)
+    # Every pane sorts an identical copy of one seeded input
+    values = datasets.generate(options.distribution, options.n, seed=options.seed)
+    areas = layout_panes(len(names), window.get_width(), window.get_height(), RACE_TOP)
+    panes = [Pane(window, SORTS[name], values, area) for name, area in zip(names, areas)]
+
+    race = lockstep(panes)
+    scheduler = StepScheduler(options.speed or 10)
+    header = TextOverlay(window, window.get_width() / 2, 60, 20, BLACK, YELLOW)
+    clock = pygame.time.Clock()
+    profiler, hud, steps = start_profiling(window, options, scheduler)
+    first_frame = True
+    step = 0
+
+    run = True
+    racing = False
+    full_redraw = True
+    while run:
+        profiler.frame()
+        clock.tick(FPS)
+        profiler.mark('wait')
+
+        if racing:
+            taken, finished = scheduler.advance(race)
+            step += taken
+            if finished:
+                racing = False
+        profiler.mark('step')
+
+        status = f'{options.n} elements, step {step} at {scheduler.steps_per_second} steps/s (UP/DOWN to change)'
+        if full_redraw:
+            window.fill(YELLOW)
+            display_text(window, 'Sorting Race: SPACE start/pause, q quit', 25, 32)
+            header.invalidate()
+            for pane in panes:
+                pane.label.invalidate()
+                pane.changed = True
+
+        # One render pass over the panes that moved, then a single flip
+        updated = []
+        header_rect = header.draw(status)
+        if header_rect:
+            updated.append(header_rect)
+        profiler.mark('text')
+        for pane in panes:
+            if pane.changed:
+                updated.append(pane.renderer.draw(pane.state))
+                pane.changed = False
+            label_rect = pane.label.draw(pane.status())
+            if label_rect:
+                updated.append(label_rect)
+        profiler.mark('draw')
+        hud_rect = hud.draw()
+        if hud_rect:
+            updated.append(hud_rect)
+        profiler.mark('hud')
+
+        if full_redraw:
+            pygame.display.update()
+            full_redraw = False
+        elif updated:
+            pygame.display.update(updated)
+        profiler.mark('update')
+
+        events = poll_events(not (racing or first_frame))
+        profiler.mark('idle')
+        for event in events:
+            if event.type == pygame.QUIT:
+                run = False
+
+            if event.type == pygame.VIDEOEXPOSE or hud.handle(event):
+                full_redraw = True
+
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_SPACE:
+                    racing = not racing
+                    scheduler.reset()
+                handle_speed_keys(event, scheduler)
+                if event.key == pygame.K_q:
+                    run = False
+        profiler.mark('events')
+
+        if first_frame:
+            first_frame = False
+            run = run and report_first_frame(options)
+
+    finish_profiling(options, profiler, steps)
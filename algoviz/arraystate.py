@@ -0,0 +1,300 @@
+from array import array
+
+import numpy as np
+
+from algoviz.ops import COMPARE, SWAP, WRITE, SORTED, PIVOT, WORKER
+
+# COLOR STATES
+# Ordered by priority: when several elements share a pixel column, the
+# highest state wins so highlights stay visible at any zoom level.
+NORMAL = 0
+DONE = 1
+SELECTED = 2
+KEY = 3
+
+# EFFECT MARKS
+UNCHANGED = 255         # the position keeps the incoming color or owner
+INCOMING_WORKER = 254   # the position was painted by the incoming state's worker
+
+# COLORS
+BACKGROUND = (255, 255, 0)
+STATE_COLORS = (
+    (128, 0, 128),    # NORMAL, purple
+    (0, 255, 0),      # DONE, green
+    (0, 0, 255),      # SELECTED, blue
+    (255, 0, 0),      # KEY, red
+)
+# Unsorted elements last touched by a parallel worker take its color;
+# owner k (1-based) uses WORKER_COLORS[k - 1]
+WORKER_COLORS = (
+    (255, 140, 0),    # orange
+    (0, 160, 160),    # teal
+    (200, 0, 160),    # magenta
+    (120, 80, 40),    # brown
+    (90, 90, 255),    # light blue
+    (0, 120, 0),      # dark green
+    (160, 160, 160),  # gray
+    (0, 0, 0),        # black
+)
+
+# CLASSES
+class ArrayState:
+    # The values being sorted plus one uint8 color state per element. Holds a
+    # million elements in a few MB instead of a million Rectangle objects.
+    # `owners` records which parallel worker last touched each element (0
+    # for none).
+    def __init__(self, values):
+        self.values = np.array(values, dtype=np.int64)
+        self.colors = np.zeros(len(self.values), dtype=np.uint8)
+        self.owners = np.zeros(len(self.values), dtype=np.uint8)
+
+    def __len__(self):
+        return len(self.values)
+
+class ArrayReplayer:
+    # Applies trace operations to an ArrayState. A compare highlights the
+    # elements still NORMAL until the next operation, a swap carries colors
+    # and the pivot along with the values, a new pivot turns the old one
+    # back to NORMAL, and finish() marks everything DONE. Everything it
+    # needs to resume lives in snapshot(), so a replay can restart
+    # mid-trace from a saved copy.
+    def __init__(self, state):
+        self.state = state
+        self.highlighted = ()
+        self.pivot = None
+        self.worker = 0             # owner painted by the ops being applied
+
+    def apply(self, op, i, j):
+        values = self.state.values
+        colors = self.state.colors
+
+        for k in self.highlighted:
+            if colors[k] == SELECTED:
+                colors[k] = NORMAL
+        self.highlighted = ()
+
+        if op == COMPARE:
+            self.highlighted = [k for k in (i, j) if colors[k] == NORMAL]
+            for k in self.highlighted:
+                colors[k] = SELECTED
+            if self.worker:
+                self.state.owners[i] = self.state.owners[j] = self.worker
+        elif op == SWAP:
+            values[i], values[j] = values[j], values[i]
+            colors[i], colors[j] = colors[j], colors[i]
+            if self.pivot == i:
+                self.pivot = j
+            elif self.pivot == j:
+                self.pivot = i
+            if self.worker:
+                self.state.owners[i] = self.state.owners[j] = self.worker
+        elif op == WRITE:
+            values[i] = j
+            if self.worker:
+                self.state.owners[i] = self.worker
+        elif op == SORTED:
+            colors[i] = DONE
+        elif op == PIVOT:
+            if self.pivot is not None and colors[self.pivot] == KEY:
+                colors[self.pivot] = NORMAL
+            self.pivot = i
+            colors[i] = KEY
+        elif op == WORKER:
+            self.worker = worker_owner(i)
+
+    def apply_block(self, ops, first, second):
+        # apply() for every operation in three numpy columns at once. Owners
+        # are painted in one vectorized pass. Values, colors and the pivot
+        # move with the swaps, so the swaps, writes, sorted marks and pivots
+        # are replayed in a loop, over lists of only the positions they
+        # touch; compares leave nothing behind but the last one's highlights.
+        if not len(ops):
+            return
+        state = self.state
+        colors = state.colors
+        for k in self.highlighted:
+            if colors[k] == SELECTED:
+                colors[k] = NORMAL
+        self.highlighted = ()
+
+        # The owner each operation paints: the last WORKER op's, or the
+        # incoming one before the first
+        switches = np.flatnonzero(ops == WORKER)
+        if len(switches) or self.worker:
+            owner = np.full(len(ops), self.worker, dtype=np.int64)
+            if len(switches):
+                numbers = first[switches].astype(np.int64)
+                owners = np.where(numbers < 0, 0, numbers % len(WORKER_COLORS) + 1)
+                latest = np.maximum.accumulate(np.where(ops == WORKER, np.arange(len(ops)), -1))
+                owner = np.where(latest >= 0, owners[np.searchsorted(switches, latest)], owner)
+                self.worker = int(owners[-1])
+            pairs = ((ops == COMPARE) | (ops == SWAP)) & (owner > 0)
+            single = (ops == WRITE) & (owner > 0)
+            painted = pairs | single
+            # In operation order, so a cell painted twice keeps the later owner
+            cells = np.stack((first, np.where(pairs, second, first)), axis=1)[painted].reshape(-1)
+            state.owners[cells] = np.repeat(owner[painted], 2)
+
+        moves = (ops == SWAP) | (ops == WRITE) | (ops == SORTED) | (ops == PIVOT)
+        if moves.any():
+            codes, at, to = ops[moves], first[moves].astype(np.int64), second[moves].astype(np.int64)
+            swaps = codes == SWAP
+            touched = [at, to[swaps]] + ([np.array([self.pivot])] if self.pivot is not None else [])
+            cells = np.unique(np.concatenate(touched))
+            values = state.values[cells].tolist()
+            local = colors[cells].tolist()
+            at = np.searchsorted(cells, at)
+            to = np.where(swaps, np.searchsorted(cells, to), to)
+            pivot = None if self.pivot is None else int(np.searchsorted(cells, self.pivot))
+            for op, i, j in zip(codes.tolist(), at.tolist(), to.tolist()):
+                if op == SWAP:
+                    values[i], values[j] = values[j], values[i]
+                    local[i], local[j] = local[j], local[i]
+                    if pivot == i:
+                        pivot = j
+                    elif pivot == j:
+                        pivot = i
+                elif op == WRITE:
+                    values[i] = j
+                elif op == SORTED:
+                    local[i] = DONE
+                else:
+                    if pivot is not None and local[pivot] == KEY:
+                        local[pivot] = NORMAL
+                    pivot = i
+                    local[i] = KEY
+            state.values[cells] = values
+            colors[cells] = local
+            self.pivot = None if pivot is None else int(cells[pivot])
+
+        if ops[-1] == COMPARE:
+            self.highlighted = [k for k in (int(first[-1]), int(second[-1])) if colors[k] == NORMAL]
+            for k in self.highlighted:
+                colors[k] = SELECTED
+
+    def finish(self):
+        self.state.colors[:] = DONE
+        self.highlighted = ()
+        self.pivot = None
+
+    def snapshot(self):
+        state = self.state
+        return (state.values.copy(), state.colors.copy(), tuple(self.highlighted), self.pivot,
+                state.owners.copy(), self.worker)
+
+    def restore(self, snapshot):
+        values, colors, highlighted, pivot, owners, worker = snapshot
+        self.state.values[:] = values
+        self.state.colors[:] = colors
+        self.state.owners[:] = owners
+        self.highlighted = highlighted
+        self.pivot = pivot
+        self.worker = worker
+
+class Effect:
+    # What a run of trace operations does to any state it is applied to,
+    # found without knowing that state, so a long replay can be split into
+    # ranges whose effects are found in parallel and then chained.
+    # `source` follows the swaps: the incoming position each position's
+    # element came from. Values written, colors set and owners painted on
+    # the way are kept per position. Only the pivot is ever KEY, so the
+    # first new pivot turns an incoming KEY back to NORMAL wherever the
+    # swaps took it. A compare highlights only until the next operation,
+    # so only the last one's highlights are left to work out on the state.
+    def __init__(self, n):
+        self.source = array('i', range(n))
+        self.written = bytearray(n)
+        self.values = array('q', [0]) * n
+        self.colors = bytearray([UNCHANGED]) * n
+        self.owners = bytearray([UNCHANGED]) * n
+        self.pivot = None           # position of the last new pivot
+        self.keys_reset = False
+        self.worker = None          # owner painted since the last WORKER op, None before one
+        self.last = None            # the last operation
+
+    def paint(self, k):
+        if self.worker is None:
+            self.owners[k] = INCOMING_WORKER
+        elif self.worker:
+            self.owners[k] = self.worker
+
+    def apply(self, op, i, j):
+        self.last = (op, i, j)
+        if op == COMPARE:
+            self.paint(i)
+            self.paint(j)
+        elif op == SWAP:
+            for column in (self.source, self.written, self.values, self.colors):
+                column[i], column[j] = column[j], column[i]
+            if self.pivot == i:
+                self.pivot = j
+            elif self.pivot == j:
+                self.pivot = i
+            self.paint(i)
+            self.paint(j)
+        elif op == WRITE:
+            self.written[i] = 1
+            self.values[i] = j
+            self.paint(i)
+        elif op == SORTED:
+            self.colors[i] = DONE
+        elif op == PIVOT:
+            if self.pivot is None:
+                self.keys_reset = True
+            elif self.colors[self.pivot] == KEY:
+                self.colors[self.pivot] = NORMAL
+            self.pivot = i
+            self.colors[i] = KEY
+        elif op == WORKER:
+            self.worker = worker_owner(i)
+
+    def apply_to(self, snapshot):
+        # The ArrayReplayer snapshot after the run, from the one before it
+        if self.last is None:
+            return snapshot
+        values, colors, highlighted, pivot, owners, worker = snapshot
+        colors = colors.copy()
+        for k in highlighted:
+            if colors[k] == SELECTED:
+                colors[k] = NORMAL
+
+        source = np.frombuffer(self.source, dtype=np.int32)
+        written = np.frombuffer(self.written, dtype=np.bool_)
+        values = np.where(written, np.frombuffer(self.values, dtype=np.int64), values[source])
+        moved = colors[source]
+        if self.keys_reset:
+            moved[moved == KEY] = NORMAL
+        set_colors = np.frombuffer(self.colors, dtype=np.uint8)
+        colors = np.where(set_colors == UNCHANGED, moved, set_colors)
+        painted = np.frombuffer(self.owners, dtype=np.uint8)
+        owners = np.where(painted < INCOMING_WORKER, painted, owners)
+        if worker:
+            owners[painted == INCOMING_WORKER] = worker
+
+        if self.pivot is not None:
+            pivot = self.pivot
+        elif pivot is not None:
+            pivot = int(np.flatnonzero(source == pivot)[0])
+        highlighted = ()
+        op, i, j = self.last
+        if op == COMPARE:
+            highlighted = tuple(k for k in (i, j) if colors[k] == NORMAL)
+            colors[list(highlighted)] = SELECTED
+        return (values, colors, highlighted, pivot, owners, self.worker if self.worker is not None else worker)
+
+# FUNCTIONS
+def worker_owner(worker):
+    # The owners value painted by worker `worker`; 0 for the main process
+    return 0 if worker < 0 else worker % len(WORKER_COLORS) + 1
+
+def replay_array(state, trace, replayer=None, start=0):
+    # Apply a trace to an ArrayState one operation per step. To resume
+    # mid-trace pass the replayer that holds the state at `start`.
+    replayer = replayer if replayer is not None else ArrayReplayer(state)
+    apply = replayer.apply
+
+    for op, i, j in trace.iter_from(start):
+        apply(op, i, j)
+        yield
+
+    replayer.finish()
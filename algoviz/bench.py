@@ -0,0 +1,363 @@
+import argparse
+import csv
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from algoviz import datasets, mazes, parallel, pathfinding
+from algoviz.grid import Grid, make_grid
+from algoviz.ops import AUX, OP_NAMES, Trace
+from algoviz.registry import SORTS, SEARCHES
+
+# Headless benchmark for every sort and grid search. Run with
+#   python -m algoviz.bench --json results.json --baseline benchmarks/baseline.json
+# Rendering is measured through SDL's dummy video driver, or skipped when
+# pygame is not installed. With --speedup it times the parallel sorts on 1 to
+# N workers instead, each against its serial counterpart on the same input.
+
+# VARIABLES
+SIZES = (1000, 10000)
+DISTRIBUTIONS = ('uniform-unique', 'sorted', 'reversed', 'few-unique')
+GRID_SIZES = (100, 300)
+QUADRATIC_MAX_N = 2000       # bubble/selection/insertion are skipped above this
+RENDER_FRAMES = 60           # frames replayed per render measurement
+SEED = 12345
+TOLERANCE = 0.25             # allowed slowdown against the baseline
+SLACK = 0.005                # seconds of timer noise ignored on top of that
+STARTUP_TARGET = 1.0         # seconds from launch to first frame, always enforced
+STARTUP_CASES = (            # (command, extra arguments, n) timed to first frame
+    ('sort', (), 0),
+    ('sort', ('--algo', 'merge', '--n', '100000'), 100000),
+    ('grid', (), 0),
+)
+QUERIES = 100                # DFS queries per grid, the last quarter repeats of earlier ones
+WEIGHTED_SEARCHES = ('dijkstra', 'astar')
+WEIGHTED_CASES = (           # (weights, diagonal) the weighted searches also run on
+    ('terrain', False),
+    ('terrain', True),
+)
+
+# FUNCTIONS
+def load_pygame():
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+    try:
+        import pygame
+    except ImportError:
+        return None
+    return pygame
+
+def peak_memory(function, *args):
+    tracemalloc.start()
+    try:
+        function(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def render_sort_fps(pygame, values, trace):
+    from algoviz.arraystate import ArrayState, replay_array
+    from algoviz.render import ColumnRenderer
+
+    surface = pygame.Surface((600, 500))
+    state = ArrayState(values)
+    renderer = ColumnRenderer(surface, surface.get_rect(), state.values.max(initial=1))
+    steps = replay_array(state, trace)
+    per_frame = max(1, len(trace) // RENDER_FRAMES)
+
+    frames = 0
+    start = time.perf_counter()
+    while True:
+        taken = sum(1 for _ in zip(range(per_frame), steps))
+        renderer.draw(state)
+        frames += 1
+        if taken < per_frame:
+            break
+    return frames / (time.perf_counter() - start)
+
+def render_grid_fps(pygame, grid, steps):
+    from algoviz.render import GridRenderer, grid_cell_size
+
+    palette = {k: (k * 40, k * 40, k * 40) for k in range(6)}
+    cell = grid_cell_size(grid.rows, grid.cols)
+    surface = pygame.Surface((round(grid.cols * cell), round(grid.rows * cell)))
+    renderer = GridRenderer(surface, grid, cell, palette, (128, 128, 128))
+    renderer.draw()
+    per_frame = max(1, steps // RENDER_FRAMES)
+    search = pathfinding.dfs(grid, 0, len(grid) - 1, renderer.dirty)
+
+    frames = 0
+    start = time.perf_counter()
+    while True:
+        taken = sum(1 for _ in zip(range(per_frame), search))
+        renderer.draw()
+        frames += 1
+        if taken < per_frame:
+            break
+    return frames / (time.perf_counter() - start)
+
+def bench_sort(name, distribution, n, pygame):
+    values = datasets.generate(distribution, n, seed=SEED).tolist()
+    algorithm = SORTS[name].run
+    result = {'kind': 'sort', 'algorithm': name, 'distribution': distribution, 'n': n}
+
+    trace = Trace()
+    start = time.perf_counter()
+    algorithm(list(values), trace)
+    result['seconds'] = time.perf_counter() - start
+    result['status'] = 'ok'
+
+    ops = np.frombuffer(trace.ops, dtype=np.uint8)
+    result.update(zip(OP_NAMES, np.bincount(ops, minlength=len(OP_NAMES)).tolist()))
+    # Peak auxiliary elements rather than the number of AUX operations
+    result['aux'] = int(np.frombuffer(trace.first, dtype=np.int32)[ops == AUX].max(initial=0))
+    result['peak_bytes'] = peak_memory(algorithm, list(values), Trace())
+    if pygame is not None:
+        result['frames_per_second'] = render_sort_fps(pygame, values, trace)
+    return result
+
+def bench_search(name, size, pygame, weights='uniform', diagonal=False):
+    distribution = 'random-walls' if weights == 'uniform' else weights
+    if diagonal:
+        distribution += '-diagonal'
+    result = {'kind': 'grid', 'algorithm': name, 'distribution': distribution, 'n': size * size}
+    target = size * size - 1
+
+    def run():
+        grid = make_grid(size, size, (0, 0), (size - 1, size - 1), seed=SEED, weights=weights)
+        return pathfinding.find_path(SEARCHES[name].search(diagonal=diagonal), grid, 0, target)
+
+    start = time.perf_counter()
+    stats = run()
+    result['seconds'] = time.perf_counter() - start
+    result['status'] = 'ok'
+    result['expanded'] = stats.expanded
+    result['heap_pushes'] = stats.pushes
+    result['heap_pops'] = stats.pops
+    result['path_length'] = len(stats.path) if stats.path else 0
+    result['cost'] = stats.cost
+    result['peak_bytes'] = peak_memory(run)
+
+    if pygame is not None and name == 'dfs':
+        grid = make_grid(size, size, (0, 0), (size - 1, size - 1), seed=SEED)
+        result['frames_per_second'] = render_grid_fps(pygame, grid, 2 * stats.expanded)
+    return result
+
+def bench_queries(size):
+    # Repeated DFS queries on one grid through DFSQueries, repeats served from its cache
+    result = {'kind': 'grid', 'algorithm': 'dfs-queries', 'distribution': 'random-walls', 'n': size * size}
+    grid = make_grid(size, size, (0, 0), (size - 1, size - 1), seed=SEED)
+    cells = np.flatnonzero(grid.walls_view == 0)
+    pairs = np.random.default_rng(SEED).choice(cells, size=(QUERIES - QUERIES // 4, 2)).tolist()
+    pairs += pairs[:QUERIES // 4]
+
+    start = time.perf_counter()
+    queries = pathfinding.DFSQueries(grid)
+    queries.query_many(pairs)
+    result['seconds'] = time.perf_counter() - start
+    result['status'] = 'ok'
+    result['queries'] = len(pairs)
+    result['cache_hits'] = queries.hits
+    result['skipped'] = queries.skipped
+    result['expanded'] = queries.stats.expanded
+    result['pushes'] = queries.stats.pushes
+    return result
+
+def bench_maze(maze, size):
+    result = {'kind': 'maze', 'algorithm': maze, 'distribution': '-', 'n': size * size}
+    grid = Grid(size, size)
+    start = time.perf_counter()
+    mazes.generate(grid, maze, seed=SEED)
+    result['seconds'] = time.perf_counter() - start
+    result['status'] = 'ok'
+    result['walls'] = int(grid.walls_view.sum())
+    return result
+
+def bench_startup(command, arguments=(), n=0):
+    # Cold start of the real command line in a fresh interpreter
+    env = dict(os.environ, SDL_VIDEODRIVER='dummy')
+    start = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, '-m', 'algoviz', command, *arguments, '--startup-time'],
+        env=env, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - start
+    result = {'kind': 'startup', 'algorithm': command, 'distribution': '-', 'n': n}
+    match = re.search(r'first frame after ([0-9.]+) ms', process.stderr)
+    if process.returncode != 0 or match is None:
+        result['status'] = 'failed'
+        return result
+    result['status'] = 'ok'
+    result['seconds'] = float(match.group(1)) / 1000
+    result['process_seconds'] = wall
+    return result
+
+def time_serial(name, distribution, n):
+    values = datasets.generate(distribution, n, seed=SEED).tolist()
+    start = time.perf_counter()
+    SORTS[name].run(values, parallel.NullSink())
+    return time.perf_counter() - start
+
+def bench_speedup(name, distribution, n, workers, serial_seconds, pool_seconds):
+    # Neither side records a trace. The pool is already running; what it
+    # took to start is reported on its own as pool_seconds.
+    values = datasets.generate(distribution, n, seed=SEED).tolist()
+    start = time.perf_counter()
+    SORTS[name].run(values, None, workers)
+    seconds = time.perf_counter() - start
+    return {
+        'kind': 'speedup', 'algorithm': name, 'distribution': distribution, 'n': n, 'status': 'ok',
+        'workers': workers, 'seconds': seconds, 'serial': SORTS[name].serial,
+        'serial_seconds': serial_seconds, 'pool_seconds': pool_seconds, 'speedup': serial_seconds / seconds,
+    }
+
+def run_speedup(sizes, distributions, algorithms, max_workers):
+    # Each parallel sort against its own serial counterpart, timed once per input
+    serial = {}
+    for engine in sorted({SORTS[name].serial for name in algorithms}):
+        for distribution in distributions:
+            for n in sizes:
+                serial[engine, distribution, n] = time_serial(engine, distribution, n)
+
+    results = []
+    for workers in range(1, max_workers + 1):
+        start = time.perf_counter()
+        with parallel.shared_pool(workers):
+            pool_seconds = time.perf_counter() - start
+            for name in algorithms:
+                for distribution in distributions:
+                    for n in sizes:
+                        serial_seconds = serial[SORTS[name].serial, distribution, n]
+                        results.append(bench_speedup(name, distribution, n, workers, serial_seconds, pool_seconds))
+                        report(results[-1])
+    return results
+
+def run_suite(sizes, distributions, algorithms, grid_sizes, searches, maze_names, render=True):
+    pygame = load_pygame() if render else None
+    results = []
+    if pygame is not None:
+        for command, arguments, n in STARTUP_CASES:
+            results.append(bench_startup(command, arguments, n))
+            report(results[-1])
+    for name in algorithms:
+        for distribution in distributions:
+            for n in sizes:
+                if SORTS[name].quadratic and n > QUADRATIC_MAX_N:
+                    continue
+                results.append(bench_sort(name, distribution, n, pygame))
+                report(results[-1])
+    for name in searches:
+        for size in grid_sizes:
+            results.append(bench_search(name, size, pygame))
+            report(results[-1])
+        if name in WEIGHTED_SEARCHES:
+            for weights, diagonal in WEIGHTED_CASES:
+                for size in grid_sizes:
+                    results.append(bench_search(name, size, pygame, weights, diagonal))
+                    report(results[-1])
+    if 'dfs' in searches:
+        for size in grid_sizes:
+            results.append(bench_queries(size))
+            report(results[-1])
+    for maze in maze_names:
+        for size in grid_sizes:
+            results.append(bench_maze(maze, size))
+            report(results[-1])
+    return results
+
+def report(result):
+    line = f"{result['kind']:4} {result['algorithm']:14} {result['distribution']:16} n={result['n']:<9}"
+    if result['status'] != 'ok':
+        line += f" {result['status']}"
+    else:
+        line += f" {result['seconds'] * 1000:10.1f} ms"
+        if 'frames_per_second' in result:
+            line += f" {result['frames_per_second']:8.1f} fps"
+        if 'speedup' in result:
+            line += f" {result['workers']:3} workers {result['speedup']:6.2f}x vs {result['serial']}"
+    print(line, file=sys.stderr)
+
+def key(result):
+    return result['kind'], result['algorithm'], result['distribution'], result['n']
+
+def compare(results, baseline, tolerance):
+    # Returns a list of human-readable regressions. Operation counts must
+    # match exactly (the inputs are seeded); times may grow by `tolerance`.
+    # Startup time must also stay under STARTUP_TARGET.
+    previous = {key(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        if result['kind'] == 'startup' and result.get('seconds', 0) > STARTUP_TARGET:
+            regressions.append(f"startup {result['algorithm']}: {result['seconds'] * 1000:.1f} ms over the {STARTUP_TARGET * 1000:.0f} ms target")
+        old = previous.get(key(result))
+        if old is None or old['status'] != 'ok':
+            continue
+        label = ' '.join(str(part) for part in key(result))
+        if result['status'] != 'ok':
+            regressions.append(f"{label}: {result['status']}")
+            continue
+        for field in OP_NAMES + ('expanded', 'cost', 'walls'):
+            if field in old and result.get(field) != old[field]:
+                regressions.append(f"{label}: {field} {old[field]} -> {result.get(field)}")
+        if result['seconds'] > old['seconds'] * (1 + tolerance) + SLACK:
+            regressions.append(f"{label}: {old['seconds'] * 1000:.1f} ms -> {result['seconds'] * 1000:.1f} ms")
+        if 'frames_per_second' in old and 'frames_per_second' in result:
+            if result['frames_per_second'] < old['frames_per_second'] / (1 + tolerance):
+                regressions.append(f"{label}: {old['frames_per_second']:.1f} fps -> {result['frames_per_second']:.1f} fps")
+    return regressions
+
+def write_csv(results, path):
+    fields = []
+    for result in results:
+        fields.extend(field for field in result if field not in fields)
+    with open(path, 'w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(results)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m algoviz.bench', description='Benchmark the sorting and search engines headless.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--distributions', nargs='+', default=DISTRIBUTIONS, choices=sorted(datasets.DISTRIBUTIONS))
+    parser.add_argument('--algorithms', nargs='+', default=list(SORTS), choices=list(SORTS))
+    parser.add_argument('--grid-sizes', type=int, nargs='+', default=GRID_SIZES)
+    parser.add_argument('--searches', nargs='+', default=list(SEARCHES), choices=list(SEARCHES))
+    parser.add_argument('--mazes', nargs='+', default=list(mazes.MAZES), choices=list(mazes.MAZES))
+    parser.add_argument('--no-render', action='store_true', help='skip the pygame frame rate measurements')
+    parser.add_argument('--json', help='write results as JSON')
+    parser.add_argument('--csv', help='write results as CSV')
+    parser.add_argument('--baseline', help='compare against a previous JSON result file')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE)
+    parser.add_argument('--speedup', action='store_true', help='time the parallel sorts on 1 to --workers workers instead')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='most workers for --speedup (default: all cores)')
+    args = parser.parse_args(argv)
+
+    if args.speedup:
+        algorithms = [name for name in args.algorithms if SORTS[name].parallel]
+        results = run_speedup(args.sizes, args.distributions, algorithms, args.workers)
+    else:
+        results = run_suite(args.sizes, args.distributions, args.algorithms, args.grid_sizes, args.searches, args.mazes, not args.no_render)
+
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(results, file, indent=1)
+    if args.csv:
+        write_csv(results, args.csv)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f'REGRESSION {regression}', file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,202 @@
+import argparse
+import os
+import sys
+
+from algoviz.display import START  # noqa: F401  starts the cold-start clock
+from algoviz.datasets import DISTRIBUTIONS
+from algoviz.mazes import MAZES, WEIGHTS
+from algoviz.pathfinding import HEURISTICS
+from algoviz.profiler import PROFILERS
+from algoviz.registry import SORTS, SEARCHES
+
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+# FUNCTIONS
+def add_profile_arguments(parser):
+    parser.add_argument('--profile', help='write per-frame phase timings on exit (.json for JSON, else CSV)')
+    parser.add_argument('--profile-steps', help='profile the algorithm steps and write the result here on exit')
+    parser.add_argument('--profiler', choices=PROFILERS, default='cprofile',
+                        help='cprofile writes pstats, sample writes folded stacks')
+
+def sort_command(options):
+    from algoviz.display import init_display
+
+    pygame, window = init_display(600, 600, 'Sorting Algorithm Visualization')
+    from algoviz.app import run_sort
+    try:
+        run_sort(window, options)
+    finally:
+        pygame.quit()
+    return 0
+
+def grid_command(options):
+    from algoviz.display import init_display
+    from algoviz.render import grid_cell_size
+
+    options.resumed = None
+    if options.resume:
+        from algoviz.pathfinding import load_search
+
+        options.resumed = load_search(options.resume)
+        options.rows, options.cols = options.resumed.grid.rows, options.resumed.grid.cols
+    options.cell_size = grid_cell_size(options.rows, options.cols)
+    width = round(options.cols * options.cell_size)
+    height = round(options.rows * options.cell_size) + 40
+    pygame, window = init_display(width, height, 'Pathfinding Visualization')
+    from algoviz.app import run_grid
+    try:
+        run_grid(window, options)
+    finally:
+        pygame.quit()
+    return 0
+
+def bench_command(argv):
+    from algoviz import bench
+
+    return bench.main(argv)
+
+def race_command(options):
+    from algoviz.display import init_display
+
+    pygame, window = init_display(900, 700, 'Sorting Race')
+    from algoviz.app import run_race
+    try:
+        run_race(window, options)
+    finally:
+        pygame.quit()
+    return 0
+
+def export_command(options):
+    from algoviz.export import export
+
+    frames, steps = export(
+        options.algo, options.n, options.distribution, options.seed, options.output,
+        fmt=options.format, steps_per_frame=options.steps_per_frame, frames=options.frames,
+        workers=options.workers, size=options.size,
+    )
+    print(f'{frames} frames of {options.size}x{options.size} for {steps} steps', file=sys.stderr)
+    return 0
+
+def record_command(options):
+    from algoviz import datasets
+    from algoviz.tracefile import TraceWriter
+
+    values = datasets.generate(options.distribution, options.n, seed=options.seed)
+    with TraceWriter(options.output, values, options.keyframe_interval) as writer:
+        SORTS[options.algo].runner(options.workers)(values.tolist(), writer)
+    print(f'{writer.steps} steps of {options.n} elements to {options.output}', file=sys.stderr)
+    return 0
+
+def replay_command(options):
+    from algoviz.display import init_display
+
+    pygame, window = init_display(600, 600, 'Trace Replay')
+    from algoviz.app import run_replay
+    try:
+        run_replay(window, options)
+    finally:
+        pygame.quit()
+    return 0
+
+def list_command(options):
+    for kind, table in (('sort', SORTS), ('grid', SEARCHES)):
+        for name, algorithm in table.items():
+            print(f'{kind:5} {name:14} {algorithm.title}')
+    return 0
+
+def parser():
+    parser = argparse.ArgumentParser(prog='algoviz', description='Sorting and pathfinding visualizer.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    sort = commands.add_parser('sort', help='visualize a sorting algorithm')
+    sort.add_argument('--algo', choices=list(SORTS), default='bubble')
+    sort.add_argument('--n', type=int, default=25, help='number of elements (default 25)')
+    sort.add_argument('--distribution', choices=sorted(DISTRIBUTIONS), default='uniform-unique')
+    sort.add_argument('--seed', type=int, help='seed for a reproducible input')
+    sort.add_argument('--speed', type=int, help='steps per second to start at')
+    sort.add_argument('--start', type=int, default=0, help='step to start from')
+    sort.add_argument('--workers', type=int, help='processes for the parallel sorts (default 4)')
+    sort.add_argument('--startup-time', action='store_true', help='print the time to the first frame and exit')
+    add_profile_arguments(sort)
+    sort.set_defaults(handler=sort_command)
+
+    grid = commands.add_parser('grid', help='visualize a grid search')
+    grid.add_argument('--algo', choices=list(SEARCHES), default='dfs')
+    grid.add_argument('--rows', type=int, default=30)
+    grid.add_argument('--cols', type=int, default=30)
+    grid.add_argument('--maze', choices=list(MAZES), default='random', help='how the walls are laid out')
+    grid.add_argument('--density', type=float, help='wall density for random (default 0.2) and caves (0.45)')
+    grid.add_argument('--weights', choices=list(WEIGHTS), default='uniform',
+                      help='cost to enter each cell, 1 to 9; dijkstra and astar follow it')
+    grid.add_argument('--diagonal', action='store_true', help='let bfs, dijkstra and astar move diagonally')
+    grid.add_argument('--heuristic', choices=list(HEURISTICS),
+                      help='for astar (default: manhattan, or octile with --diagonal)')
+    grid.add_argument('--seed', type=int)
+    grid.add_argument('--speed', type=int, help='steps per second to start at')
+    grid.add_argument('--checkpoint', help="file the running search is saved to when 's' is pressed")
+    grid.add_argument('--resume', help='continue a search saved with --checkpoint')
+    grid.add_argument('--startup-time', action='store_true', help='print the time to the first frame and exit')
+    add_profile_arguments(grid)
+    grid.set_defaults(handler=grid_command)
+
+    race = commands.add_parser('race', help='run several sorts side by side on the same input')
+    race.add_argument('--algos', nargs='+', choices=list(SORTS), help='default: all of them')
+    race.add_argument('--n', type=int, default=100)
+    race.add_argument('--distribution', choices=sorted(DISTRIBUTIONS), default='uniform-unique')
+    race.add_argument('--seed', type=int)
+    race.add_argument('--speed', type=int, help='steps per second to start at')
+    race.add_argument('--startup-time', action='store_true', help='print the time to the first frame and exit')
+    add_profile_arguments(race)
+    race.set_defaults(handler=race_command)
+
+    export = commands.add_parser('export', help='render a sort to PNG frames or raw RGB without a window')
+    export.add_argument('--algo', choices=list(SORTS), default='quick')
+    export.add_argument('--n', type=int, default=10000)
+    export.add_argument('--distribution', choices=sorted(DISTRIBUTIONS), default='uniform-unique')
+    export.add_argument('--seed', type=int)
+    export.add_argument('--format', choices=('png', 'raw'), default='png', help='raw is RGB24, frame after frame')
+    export.add_argument('--output', required=True, help="directory for png, file or '-' (stdout) for raw")
+    export.add_argument('--steps-per-frame', type=int)
+    export.add_argument('--frames', type=int, help='target frame count when --steps-per-frame is not given (default 1800)')
+    export.add_argument('--workers', type=int, help='processes to render with (default: all cores)')
+    export.add_argument('--size', type=int, default=600, help='frame width and height in pixels')
+    export.set_defaults(handler=export_command)
+
+    record = commands.add_parser('record', help='record a sort to a binary trace file')
+    record.add_argument('--algo', choices=list(SORTS), default='quick')
+    record.add_argument('--n', type=int, default=10000)
+    record.add_argument('--distribution', choices=sorted(DISTRIBUTIONS), default='uniform-unique')
+    record.add_argument('--seed', type=int)
+    record.add_argument('--output', required=True)
+    record.add_argument('--keyframe-interval', type=int,
+                        help='steps between stored snapshots (default 8 * n, at least 65536)')
+    record.add_argument('--workers', type=int, help='processes for the parallel sorts (default 4)')
+    record.set_defaults(handler=record_command)
+
+    replay = commands.add_parser('replay', help='play back a recorded trace file')
+    replay.add_argument('trace')
+    replay.add_argument('--start', type=int, default=0, help='step to start from')
+    replay.add_argument('--speed', type=int, help='steps per second to start at')
+    replay.add_argument('--startup-time', action='store_true', help='print the time to the first frame and exit')
+    add_profile_arguments(replay)
+    replay.set_defaults(handler=replay_command)
+
+    # Listed for --help only; main() hands its arguments to the benchmark as-is
+    commands.add_parser('bench', help='run the headless benchmark (algoviz bench -h for options)', add_help=False)
+
+    listing = commands.add_parser('list', help='list the available algorithms')
+    listing.set_defaults(handler=list_command)
+    return parser
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ['bench']:
+        return bench_command(argv[1:])
+    arguments = parser()
+    options = arguments.parse_args(argv)
+    if options.command == 'grid' and options.diagonal and options.heuristic == 'manhattan':
+        arguments.error('manhattan is not admissible with --diagonal; use octile')
+    return options.handler(options)
+
+if __name__ == '__main__':
+    sys.exit(main())
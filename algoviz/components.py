@@ -0,0 +1,187 @@
+from array import array
+from collections import deque
+
+import numpy as np
+
+from algoviz.stamps import Stamps
+
+# Connected components of a grid's open cells, so "can the target be reached
+# at all?" costs two lookups and two union-find finds instead of a search.
+# Components use 4-neighbor moves only; a diagonal move never cuts a corner,
+# so it never joins cells the straight moves could not. Every open cell holds
+# a label, and labels are merged in a union-find. Opening a cell unions the
+# labels around it. Walling one off can only split its component: unless the
+# open cells around it still touch through the ring of eight, a BFS runs
+# from each side in lockstep, sides that meet carry on as one, and each side
+# that runs out of cells gets a new label. The work is bounded by the smaller
+# pieces, not by the grid.
+
+# CLASSES
+class Components:
+    # Kept current by Grid.set_wall; valid while `version` matches the grid's
+    def __init__(self, grid):
+        self.grid = grid
+        self.labels = array('i', label(grid).tobytes())      # -1 for walls
+        self.parent = array('i', np.arange(len(grid), dtype=np.int32).tobytes())
+        self.version = grid.version
+        self.stamps = Stamps(len(grid))
+
+    def find(self, label):
+        parent = self.parent
+        while parent[label] != label:
+            parent[label] = parent[parent[label]]
+            label = parent[label]
+        return label
+
+    def component(self, index):
+        # The component's label, or -1 for a wall
+        label = self.labels[index]
+        return self.find(label) if label >= 0 else -1
+
+    def connected(self, a, b):
+        first = self.component(a)
+        return first >= 0 and first == self.component(b)
+
+    def fresh(self):
+        self.parent.append(len(self.parent))
+        return len(self.parent) - 1
+
+    def set_wall(self, index, wall):
+        # Call after the grid's walls have been changed
+        if wall:
+            if self.labels[index] >= 0:
+                self.labels[index] = -1
+                self.split(index)
+        elif self.labels[index] < 0:
+            roots = {self.component(k) for k in self.grid.neighbors(index)}
+            root = roots.pop() if roots else self.fresh()
+            for other in roots:
+                self.parent[other] = root
+            self.labels[index] = root
+        self.version = self.grid.version
+
+    def split(self, index):
+        sides = ring_sides(self.grid, index)
+        if len(sides) < 2:
+            return
+        epoch = self.stamps.next_epoch()
+        stamp = self.stamps.stamp
+
+        # One cell per side per round. owner[cell] is the side that reached
+        # it; when two sides meet, the one stepping absorbs the other's queue.
+        owner = {}
+        merged = list(range(len(sides)))    # side -> the side it went into
+        queues = []
+        reached = []
+        for k, start in enumerate(sides):
+            stamp[start] = epoch
+            owner[start] = k
+            queues.append(deque([start]))
+            reached.append([start])
+
+        def survivor(k):
+            while merged[k] != k:
+                k = merged[k]
+            return k
+
+        active = list(range(len(sides)))
+        while len(active) > 1:
+            for k in tuple(active):
+                if k not in active:
+                    continue
+                queue = queues[k]
+                if not queue:
+                    # Cut off: a new label for all this side and those it absorbed reached
+                    label = self.fresh()
+                    labels = self.labels
+                    for j in range(len(sides)):
+                        if survivor(j) == k:
+                            for cell in reached[j]:
+                                labels[cell] = label
+                    active.remove(k)
+                    continue
+                for neighbor in self.grid.neighbors(queue.popleft()):
+                    if stamp[neighbor] != epoch:
+                        stamp[neighbor] = epoch
+                        owner[neighbor] = k
+                        reached[k].append(neighbor)
+                        queue.append(neighbor)
+                        continue
+                    other = survivor(owner[neighbor])
+                    if other != k:
+                        merged[other] = k
+                        queue.extend(queues[other])
+                        queues[other].clear()
+                        active.remove(other)
+
+# FUNCTIONS
+def label(grid):
+    # Vectorized labeling. Each run of open cells along a row starts out as
+    # one set, named by its first cell. Only the first of each stretch of
+    # vertical contacts between two runs is kept as an edge; the rest join
+    # the same two runs. Every edge hooks the larger of its two roots onto
+    # the smaller, the hooked roots are compressed by pointer jumping, and
+    # edges inside one component are dropped, until none are left. A
+    # component's label is its lowest index.
+    rows, cols = grid.rows, grid.cols
+    walls = grid.walls_view.reshape(rows, cols)
+    index = np.arange(rows * cols, dtype=np.int32).reshape(rows, cols)
+    open_cells = walls == 0
+    starts = open_cells.copy()
+    starts[:, 1:] &= ~open_cells[:, :-1]
+    runs = np.maximum.accumulate(np.where(starts, index, 0), axis=1).reshape(-1)
+    down = open_cells[:-1, :] & open_cells[1:, :]
+    down[:, 1:] &= ~down[:, :-1]
+    first = runs[index[:-1, :][down]]
+    second = runs[index[1:, :][down]]
+
+    parent = runs.copy()
+    while len(first):
+        a, b = parent[first], parent[second]
+        crossing = a != b
+        if not crossing.all():
+            first, second, a, b = first[crossing], second[crossing], a[crossing], b[crossing]
+            if not len(first):
+                break
+        low, high = np.minimum(a, b), np.maximum(a, b)
+        np.minimum.at(parent, high, low)
+        roots = parent[high]
+        while True:
+            jumped = parent[roots]
+            if np.array_equal(jumped, roots):
+                break
+            parent[high] = roots = jumped
+        parent = parent[parent]
+    parent[~open_cells.reshape(-1)] = -1
+    return parent
+
+def ring_sides(grid, index):
+    # One open 4-neighbor of `index` for each group of them that still
+    # touch through the eight cells around it
+    rows, cols = grid.rows, grid.cols
+    walls = grid.walls
+    row, col = divmod(index, cols)
+
+    def is_open(r, c):
+        return 0 <= r < rows and 0 <= c < cols and not walls[r * cols + c]
+
+    # The ring clockwise from the cell above; even positions are 4-neighbors
+    ring = [(row - 1, col), (row - 1, col + 1), (row, col + 1), (row + 1, col + 1),
+            (row + 1, col), (row + 1, col - 1), (row, col - 1), (row - 1, col - 1)]
+    opened = [is_open(r, c) for r, c in ring]
+    if all(opened):
+        return []
+    # Walk the runs of open ring cells, starting after a closed one so no
+    # run wraps around; each run with a 4-neighbor in it is one side
+    sides = []
+    closed = opened.index(False)
+    counted = False
+    for step in range(1, 9):
+        k = (closed + step) % 8
+        if not opened[k]:
+            counted = False
+        elif k % 2 == 0 and not counted:
+            r, c = ring[k]
+            sides.append(r * cols + c)
+            counted = True
+    return sides
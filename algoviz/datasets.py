@@ -0,0 +1,76 @@
+import numpy as np
+
+# Named input distributions for the sorts. Every generator takes the size,
+# the value range and an explicit seed, and returns an int64 ndarray built
+# with vectorized numpy calls (no per-element Python loop).
+
+# FUNCTIONS
+def uniform_unique(n, low, high, rng):
+    # Sampling without replacement; needs at least n distinct values
+    if high - low + 1 < n:
+        raise ValueError(f'cannot draw {n} unique values from [{low}, {high}]')
+    if high - low + 1 <= 4 * n:
+        return rng.permutation(high - low + 1)[:n] + low
+    # Sparse range: oversample, drop duplicates, then shuffle
+    values = np.unique(rng.integers(low, high + 1, size=n + n // 4 + 16))
+    while len(values) < n:
+        values = np.unique(np.concatenate((values, rng.integers(low, high + 1, size=n))))
+    values = rng.permutation(values)[:n]
+    return values
+
+def random_values(n, low, high, rng):
+    return rng.integers(low, high + 1, size=n)
+
+def sorted_values(n, low, high, rng):
+    return np.sort(random_values(n, low, high, rng))
+
+def reversed_values(n, low, high, rng):
+    return sorted_values(n, low, high, rng)[::-1].copy()
+
+def nearly_sorted(n, low, high, rng, swaps=None):
+    # Sorted, then k random transpositions (default about 1% of n)
+    values = sorted_values(n, low, high, rng)
+    if n < 2:
+        return values
+    k = swaps if swaps is not None else max(1, n // 100)
+    first = rng.integers(0, n, size=k)
+    second = rng.integers(0, n, size=k)
+    for i, j in zip(first.tolist(), second.tolist()):
+        values[i], values[j] = values[j], values[i]
+    return values
+
+def few_unique(n, low, high, rng, distinct=8):
+    choices = np.linspace(low, high, num=distinct).astype(np.int64)
+    return choices[rng.integers(0, distinct, size=n)]
+
+def sawtooth(n, low, high, rng, teeth=4):
+    tooth = max(1, -(-n // teeth))
+    ramp = np.arange(n) % tooth
+    return low + ramp * (high - low) // max(tooth - 1, 1)
+
+def organ_pipe(n, low, high, rng):
+    # Ascending to the middle, then descending
+    half = np.arange(n)
+    ramp = np.minimum(half, n - 1 - half)
+    peak = max(int(ramp.max(initial=0)), 1)
+    return low + ramp * (high - low) // peak
+
+DISTRIBUTIONS = {
+    'uniform-unique': uniform_unique,
+    'random': random_values,
+    'sorted': sorted_values,
+    'reversed': reversed_values,
+    'nearly-sorted': nearly_sorted,
+    'few-unique': few_unique,
+    'sawtooth': sawtooth,
+    'organ-pipe': organ_pipe,
+}
+
+def generate(distribution, n, low=1, high=None, seed=None, **options):
+    # high defaults to n, so uniform-unique gives a permutation of 1..n
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(f'unknown distribution {distribution!r}, expected one of {sorted(DISTRIBUTIONS)}')
+    if high is None:
+        high = max(low + n - 1, low)
+    rng = np.random.default_rng(seed)
+    return np.asarray(DISTRIBUTIONS[distribution](n, low, high, rng, **options), dtype=np.int64)
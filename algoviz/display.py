@@ -0,0 +1,21 @@
+import time
+
+# Process start, as close as we can get to it; the command line reports
+# time-to-first-frame against this.
+START = time.perf_counter()
+
+# FUNCTIONS
+def init_display(width, height, caption):
+    # pygame is imported here rather than at module level, and only the
+    # display and font subsystems are started (pygame.init() would also bring
+    # up audio, joysticks and the rest).
+    import pygame
+
+    pygame.display.init()
+    pygame.font.init()
+    window = pygame.display.set_mode((width, height))
+    pygame.display.set_caption(caption)
+    return pygame, window
+
+def first_frame_seconds():
+    return time.perf_counter() - START
@@ -0,0 +1,168 @@
+import os
+import shutil
+import sys
+import tempfile
+from itertools import islice
+from multiprocessing import Pool
+
+from algoviz import datasets
+from algoviz.arraystate import ArrayState, ArrayReplayer, Effect
+from algoviz.ops import record
+from algoviz.registry import SORTS
+
+# Offline rendering of a sort to a PNG sequence or a raw RGB24 stream,
+# without opening a window. The frames are split into one range per worker
+# process. The workers first find the Effect of every range but the last,
+# which this process chains from the input to a snapshot at the start of
+# each range; then each worker restores a snapshot, replays only its own
+# range and renders it off-screen.
+
+# VARIABLES
+FRAME_SIZE = 600
+FRAMES = 1800               # frames when neither a count nor steps per frame is given
+TOP = 100
+
+# COLORS
+BLACK = (0, 0, 0)
+YELLOW = (255, 255, 0)
+
+# Per-worker state, set once by init_worker() instead of being pickled with
+# every task
+job = {}
+
+# FUNCTIONS
+def frame_steps(total_steps, frames=FRAMES, steps_per_frame=None):
+    # Step count shown by every frame, from 0 to total_steps: every
+    # steps_per_frame steps and then the end, or else `frames` evenly
+    # spaced steps (fewer when there are fewer steps)
+    if steps_per_frame is not None:
+        steps = list(range(0, total_steps, steps_per_frame))
+        steps.append(total_steps)
+        return steps
+    count = min(frames, total_steps + 1)
+    if count < 2:
+        return [total_steps]
+    return [k * total_steps // (count - 1) for k in range(count)]
+
+def range_starts(frames, workers):
+    # First frame of each of up to `workers` ranges of about equal length
+    count = max(1, min(workers, frames))
+    return [k * frames // count for k in range(count)]
+
+def take_snapshots(pool, values, steps, starts):
+    # The replay state at the first frame of every range. The effects of
+    # the steps between range starts are found in the pool and chained
+    # here as they arrive, one vectorized pass per range.
+    snapshot = ArrayReplayer(ArrayState(values)).snapshot()
+    snapshots = [snapshot]
+    tasks = [(steps[first], steps[following], len(values)) for first, following in zip(starts, starts[1:])]
+    for effect in pool.imap(find_effect, tasks):
+        snapshot = effect.apply_to(snapshot)
+        snapshots.append(snapshot)
+    return snapshots
+
+def init_worker(trace, steps, title, size):
+    os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+    import pygame
+
+    pygame.font.init()
+    job.update(trace=trace, steps=steps, title=title, size=size, pygame=pygame)
+
+def find_effect(task):
+    # The Effect of trace steps [start, stop)
+    start, stop, n = task
+    effect = Effect(n)
+    apply = effect.apply
+    for op, i, j in islice(job['trace'].iter_from(start), stop - start):
+        apply(op, i, j)
+    return effect
+
+def render_chunk(task):
+    # Render frames [first, last) starting from `snapshot`, writing PNG files
+    # into `target` (a directory) or raw RGB into `target` (a file)
+    first, last, snapshot, target, fmt = task
+    from algoviz.render import ColumnRenderer
+    from algoviz.text import render_text
+
+    pygame = job['pygame']
+    trace, steps, size = job['trace'], job['steps'], job['size']
+    total_steps = steps[-1]
+
+    state = ArrayState(snapshot[0])
+    replayer = ArrayReplayer(state)
+    replayer.restore(snapshot)
+    surface = pygame.Surface((size, size))
+    renderer = ColumnRenderer(surface, (0, TOP, size, size - TOP), max(int(state.values.max(initial=1)), 1))
+    title = render_text(job['title'], 40, BLACK)
+
+    raw = open(target, 'wb') if fmt == 'raw' else None
+    try:
+        position = steps[first]
+        for frame in range(first, last):
+            for k in range(position, steps[frame]):
+                replayer.apply(*trace[k])
+            position = steps[frame]
+            if position == total_steps:
+                replayer.finish()
+
+            surface.fill(YELLOW)
+            surface.blit(title, title.get_rect(center=(size / 2, 30)))
+            status = render_text(f'Step {position} / {total_steps}', 20, BLACK)
+            surface.blit(status, status.get_rect(center=(size / 2, 70)))
+            renderer.draw(state)
+
+            if raw is None:
+                pygame.image.save(surface, os.path.join(target, f'frame_{frame:06d}.png'))
+            else:
+                raw.write(pygame.image.tobytes(surface, 'RGB'))
+    finally:
+        if raw is not None:
+            raw.close()
+    return last - first
+
+def export(algo, n, distribution, seed, output, fmt='png', steps_per_frame=None, frames=None, workers=None, size=FRAME_SIZE):
+    algorithm = SORTS[algo]
+    values = datasets.generate(distribution, n, seed=seed)
+    trace = record(algorithm.run, values.tolist())
+
+    steps = frame_steps(len(trace), frames or FRAMES, steps_per_frame)
+    workers = workers or os.cpu_count() or 1
+    starts = range_starts(len(steps), workers)
+    title = f'{algorithm.title} of {n} Elements'
+
+    scratch = None
+    if fmt == 'png':
+        os.makedirs(output, exist_ok=True)
+        targets = [output] * len(starts)
+    else:
+        scratch = tempfile.mkdtemp(prefix='algoviz-export-')
+        targets = [os.path.join(scratch, f'chunk_{k:05d}.rgb') for k in range(len(starts))]
+
+    try:
+        with Pool(workers, initializer=init_worker, initargs=(trace, steps, title, size)) as pool:
+            snapshots = take_snapshots(pool, values, steps, starts)
+            tasks = [
+                (first, last, snapshot, target, fmt)
+                for first, last, snapshot, target in zip(starts, starts[1:] + [len(steps)], snapshots, targets)
+            ]
+            if fmt == 'png':
+                for _ in pool.imap_unordered(render_chunk, tasks):
+                    pass
+            else:
+                # Chunks finish in any order but are streamed out in order
+                stream = sys.stdout.buffer if output == '-' else open(output, 'wb')
+                try:
+                    for task, _ in zip(tasks, pool.imap(render_chunk, tasks)):
+                        with open(task[3], 'rb') as part:
+                            shutil.copyfileobj(part, stream)
+                        os.remove(task[3])
+                finally:
+                    if stream is not sys.stdout.buffer:
+                        stream.close()
+                    else:
+                        stream.flush()
+    finally:
+        if scratch is not None:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+    return len(steps), len(trace)
@@ -0,0 +1,119 @@
+import numpy as np
+
+from algoviz import mazes
+from algoviz.components import Components
+
+# CELL STATES
+EMPTY = 0
+WALL = 1
+ENDPOINT = 2     # start / target
+CURRENT = 3      # cell being expanded
+VISITED = 4
+FOUND = 5
+
+FRONTIER = CURRENT    # queued but not expanded yet (pathfinding)
+
+# CLASSES
+class Grid:
+    # A rows x cols grid stored as flat bytearrays indexed by row * cols + col.
+    # Neighbors are computed by index arithmetic, so there is no per-cell
+    # object; 16M cells cost 16 MB per array. The numpy views share memory
+    # with the bytearrays for vectorized bulk updates.
+    def __init__(self, rows, cols):
+        self.rows = rows
+        self.cols = cols
+        self.walls = bytearray(rows * cols)
+        self.visited = bytearray(rows * cols)
+        self.state = bytearray(rows * cols)
+        self.weights = bytearray(b'\x01') * (rows * cols)    # cost to enter a cell
+        self.version = 0        # bumped by every wall change; cached search results are keyed by it
+        self.components = None  # built on the first reachable() call
+        self.make_views()
+
+    def make_views(self):
+        self.walls_view = np.frombuffer(self.walls, dtype=np.uint8)
+        self.visited_view = np.frombuffer(self.visited, dtype=np.uint8)
+        self.state_view = np.frombuffer(self.state, dtype=np.uint8)
+        self.weights_view = np.frombuffer(self.weights, dtype=np.uint8)
+
+    def __getstate__(self):
+        # Pickle the bytearrays only; the views are rebuilt over them
+        return {'rows': self.rows, 'cols': self.cols, 'walls': self.walls, 'visited': self.visited,
+                'state': self.state, 'weights': self.weights, 'version': self.version}
+
+    def __setstate__(self, state):
+        self.version = 0
+        self.components = None
+        self.__dict__.update(state)
+        self.make_views()
+
+    def __len__(self):
+        return self.rows * self.cols
+
+    def index(self, row, col):
+        return row * self.cols + col
+
+    def cell(self, index):
+        return divmod(index, self.cols)
+
+    def set_wall(self, index, wall=True):
+        self.walls[index] = wall
+        self.state[index] = WALL if wall else EMPTY
+        self.version += 1
+        if self.components is not None and self.components.version == self.version - 1:
+            self.components.set_wall(index, wall)
+
+    def reachable(self, start, target):
+        # O(1) once the components are labeled. Code that writes the walls
+        # directly instead of through set_wall must bump `version`, which
+        # makes the next call label them again.
+        if self.components is None or self.components.version != self.version:
+            self.components = Components(self)
+        return self.components.connected(start, target)
+
+    def neighbors(self, index):
+        # Open 4-neighbors in the order down, up, right, left
+        cols = self.cols
+        walls = self.walls
+        col = index % cols
+        result = []
+        if index + cols < len(walls) and not walls[index + cols]:
+            result.append(index + cols)
+        if index >= cols and not walls[index - cols]:
+            result.append(index - cols)
+        if col < cols - 1 and not walls[index + 1]:
+            result.append(index + 1)
+        if col > 0 and not walls[index - 1]:
+            result.append(index - 1)
+        return result
+
+    def reset_search(self):
+        # Clear visited flags and search colors, keeping walls and endpoints
+        self.visited_view[:] = 0
+        state = self.state_view
+        state[(state == CURRENT) | (state == VISITED) | (state == FOUND)] = EMPTY
+
+# FUNCTIONS
+def ignore(index):
+    pass
+
+def make_grid(rows, cols, start, target, density=None, seed=None, maze='random', weights='uniform'):
+    # Walls and cell weights from the generators in algoviz.mazes. The
+    # default is the original distribution: rows * cols * density random
+    # picks, duplicates allowed, drawn in one vectorized call, and every
+    # cell costing 1.
+    grid = Grid(rows, cols)
+    mazes.generate(grid, maze, seed=seed, density=density)
+    mazes.weigh(grid, weights, seed=seed)
+
+    start_index = grid.index(*start)
+    target_index = grid.index(*target)
+    if maze in mazes.PERFECT:
+        mazes.connect(grid, start_index)
+        mazes.connect(grid, target_index)
+    grid.walls[start_index] = 0
+    grid.walls[target_index] = 0
+    grid.state_view[:] = grid.walls_view
+    grid.state[start_index] = ENDPOINT
+    grid.state[target_index] = ENDPOINT
+    return grid
@@ -0,0 +1,215 @@
+from array import array
+from itertools import permutations
+
+import numpy as np
+
+# Named wall layouts for the grid searches. Every generator takes the walls
+# of a Grid as a (rows, cols) uint8 view and a numpy Generator, and writes
+# the layout in place with vectorized numpy calls; only the backtracker,
+# sequential by nature, loops in Python, over flat bytearrays. Perfect
+# mazes (one path between any two cells) put their cells at even rows and
+# columns and the walls between them at odd ones; with an even row or
+# column count the last one stays solid. Cell weights (the cost to enter a
+# cell, 1 to MAX_WEIGHT) are laid out the same way, from their own
+# generators, for the weighted searches.
+
+# VARIABLES
+DENSITY = 0.2              # random fill: wall picks per cell
+CAVE_DENSITY = 0.45        # caves: walls before smoothing
+CAVE_STEPS = 4             # smoothing passes
+CAVE_BIRTH = 5             # a cell is a wall when this many of its 3x3 block are
+MAX_WEIGHT = 9             # heaviest cell the weight generators make
+HILL_SIZE = 16             # terrain: hills are about 1/HILL_SIZE of the longer side across
+WEIGHT_STREAM = 1          # seeds the weights apart from walls of the same seed
+
+# FUNCTIONS
+def random_fill(walls, rng, density=None):
+    # rows * cols * density random picks, duplicates allowed, so a little
+    # under `density` of the cells end up walls
+    density = DENSITY if density is None else density
+    flat = walls.reshape(-1)
+    flat[:] = 0
+    flat[rng.integers(0, flat.size, size=int(flat.size * density))] = 1
+
+def caves(walls, rng, density=None, steps=CAVE_STEPS):
+    # Random fill smoothed by a cellular automaton: each pass, a cell becomes
+    # a wall when at least CAVE_BIRTH of the nine cells around it (itself
+    # included) are walls. Outside the grid counts as open, so the corners
+    # the endpoints sit in are usually reachable.
+    density = CAVE_DENSITY if density is None else density
+    rows, cols = walls.shape
+    walls[:] = rng.random((rows, cols)) < density
+    padded = np.zeros((rows + 2, cols + 2), dtype=np.uint8)
+    count = np.empty((rows, cols), dtype=np.uint8)
+    for _ in range(steps):
+        padded[1:-1, 1:-1] = walls
+        count[:] = 0
+        for dr in range(3):
+            for dc in range(3):
+                count += padded[dr:dr + rows, dc:dc + cols]
+        np.greater_equal(count, CAVE_BIRTH, out=walls, casting='unsafe')
+
+def backtracker(walls, rng, density=None):
+    # Depth-first: carve into a random unvisited neighbor, back up when there
+    # is none; runs and dead ends are long. Iterative, over flat bytearrays
+    # with a two-cell border, so no step needs a bounds check. Each cell gets
+    # a random order to try its neighbors in: the first one still unvisited
+    # in a random order is a uniform pick among those left.
+    rows, cols = walls.shape
+    width = cols + 4
+    padded = np.zeros((rows + 4, width), dtype=np.uint8)
+    padded[2:-2:2, 2:-2:2] = 1
+    unvisited = bytearray(padded.tobytes())
+    carved = bytearray(len(unvisited))
+    orders = tuple(permutations((-2 * width, 2 * width, -2, 2)))
+    order = rng.integers(0, len(orders), size=len(unvisited), dtype=np.uint8).tobytes()
+
+    cell = 2 * width + 2
+    unvisited[cell] = 0
+    carved[cell] = 1
+    stack = array('i')
+    while True:
+        for step in orders[order[cell]]:
+            if unvisited[cell + step]:
+                following = cell + step
+                unvisited[following] = 0
+                carved[cell + (step >> 1)] = 1
+                carved[following] = 1
+                stack.append(cell)
+                cell = following
+                break
+        else:
+            if not stack:
+                break
+            cell = stack.pop()
+    padded = np.frombuffer(carved, dtype=np.uint8).reshape(rows + 4, width)
+    np.equal(padded[2:-2, 2:-2], 0, out=walls, casting='unsafe')
+
+def kruskal(walls, rng, density=None):
+    # Kruskal's algorithm over randomly ordered walls, carving each wall that
+    # joins two different sets. Random distinct edge weights have a single
+    # minimum spanning tree, so the union-find work is done Boruvka style in
+    # vectorized rounds: every set takes its lightest outgoing edge, the sets
+    # are hooked together and the parent pointers compressed by jumping.
+    # The result is the maze Kruskal carves for the same order, in about
+    # log2(cells) rounds.
+    rows, cols = walls.shape
+    height, width = (rows + 1) // 2, (cols + 1) // 2
+    walls[:] = 1
+    walls[::2, ::2] = 0
+    if height * width < 2:
+        return
+
+    # Edges stay in grid order, which keeps the lookups below cache friendly.
+    # The order Kruskal takes them in is by a random weight in the high bits,
+    # ties broken by position in the low bits, so all keys are distinct.
+    ids = np.arange(height * width, dtype=np.int32).reshape(height, width)
+    first = np.concatenate((ids[:, :-1].reshape(-1), ids[:-1, :].reshape(-1)))
+    second = np.concatenate((ids[:, 1:].reshape(-1), ids[1:, :].reshape(-1)))
+    weight = rng.integers(0, 1 << 31, size=len(first), dtype=np.int64) << 32
+    cells = (2 * np.arange(height, dtype=np.int64)[:, None] * cols + 2 * np.arange(width)).reshape(-1)
+
+    parent = ids.reshape(-1).copy()
+    flat = walls.reshape(-1)
+    heaviest = np.iinfo(np.int64).max
+    while True:
+        a, b = parent[first], parent[second]
+        outgoing = a != b
+        if not outgoing.all():
+            if not outgoing.any():
+                break
+            first, second, weight, a, b = first[outgoing], second[outgoing], weight[outgoing], a[outgoing], b[outgoing]
+        key = weight | np.arange(len(first))
+        lightest = np.full(len(parent), heaviest)
+        np.minimum.at(lightest, a, key)
+        np.minimum.at(lightest, b, key)
+        sets = np.flatnonzero(lightest != heaviest).astype(np.int32)
+        chosen = lightest[sets] & 0xffffffff
+        flat[(cells[first[chosen]] + cells[second[chosen]]) >> 1] = 0
+
+        # Hook each set onto the set across its edge; two sets that chose
+        # the same edge point at each other, and the smaller stays a root.
+        # Then jump the pointers of the hooked sets to their new roots.
+        across = np.where(a[chosen] == sets, b[chosen], a[chosen])
+        parent[sets] = across
+        mutual = (parent[across] == sets) & (sets < across)
+        parent[sets[mutual]] = sets[mutual]
+        roots = parent[sets]
+        while True:
+            jumped = parent[roots]
+            if np.array_equal(jumped, roots):
+                break
+            parent[sets] = roots = jumped
+        parent = parent[parent]
+
+def uniform_weights(weights, rng):
+    weights[:] = 1
+
+def random_weights(weights, rng):
+    # Every cell on its own, uniform over 1..MAX_WEIGHT
+    weights[:] = rng.integers(1, MAX_WEIGHT + 1, size=weights.shape)
+
+def terrain(weights, rng):
+    # Hills and valleys: random noise blurred twice with a box a hill wide,
+    # then cut at its quantiles, so each weight 1..MAX_WEIGHT covers about
+    # as many cells. Cheap paths run along the valleys, so they bend where
+    # an unweighted shortest path would not.
+    rows, cols = weights.shape
+    radius = max(1, max(rows, cols) // (2 * HILL_SIZE))
+    height = rng.random((rows, cols))
+    for _ in range(2):
+        height = box_blur(height, radius)
+    levels = np.quantile(height, np.arange(1, MAX_WEIGHT) / MAX_WEIGHT)
+    weights[:] = 1 + np.searchsorted(levels, height)
+
+def box_blur(field, radius):
+    # Mean over the (2 * radius + 1) square around each cell, edge cells
+    # repeated outward, from one cumulative sum along each axis
+    width = 2 * radius + 1
+    for axis in (0, 1):
+        size = field.shape[axis]
+        pad = [(0, 0), (0, 0)]
+        pad[axis] = (radius + 1, radius)
+        sums = np.pad(field, pad, mode='edge').cumsum(axis=axis)
+        field = (sums.take(np.arange(width, width + size), axis=axis) - sums.take(np.arange(size), axis=axis)) / width
+    return field
+
+def connect(grid, index):
+    # Open a cell of a perfect maze. One on an odd row or column (the solid
+    # last one of an even size) is joined to the cell up or to the left of
+    # it, as a dead end.
+    row, col = grid.cell(index)
+    walls = grid.walls_view.reshape(grid.rows, grid.cols)
+    top = row - row % 2
+    walls[top:row + 1, col] = 0
+    if top == row:
+        walls[row, col - col % 2:col + 1] = 0
+
+MAZES = {
+    'random': random_fill,
+    'caves': caves,
+    'backtracker': backtracker,
+    'kruskal': kruskal,
+}
+PERFECT = ('backtracker', 'kruskal')
+WEIGHTS = {
+    'uniform': uniform_weights,
+    'random': random_weights,
+    'terrain': terrain,
+}
+
+def generate(grid, maze, seed=None, density=None):
+    # Write a layout into grid.walls; density only matters to random and caves
+    if maze not in MAZES:
+        raise ValueError(f'unknown maze {maze!r}, expected one of {sorted(MAZES)}')
+    walls = grid.walls_view.reshape(grid.rows, grid.cols)
+    MAZES[maze](walls, np.random.default_rng(seed), density=density)
+    grid.version += 1
+
+def weigh(grid, weights, seed=None):
+    # Write a weight layout into grid.weights. The generator gets its own
+    # stream of `seed`, so the weights do not follow the walls' random draws.
+    if weights not in WEIGHTS:
+        raise ValueError(f'unknown weights {weights!r}, expected one of {sorted(WEIGHTS)}')
+    rng = np.random.default_rng(None if seed is None else (seed, WEIGHT_STREAM))
+    WEIGHTS[weights](grid.weights_view.reshape(grid.rows, grid.cols), rng)
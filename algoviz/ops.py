@@ -0,0 +1,93 @@
+from array import array
+from threading import Thread
+
+import numpy as np
+
+# OPERATION CODES
+COMPARE = 0      # compare a[i] with a[j]
+SWAP = 1         # swap a[i] and a[j]
+WRITE = 2        # a[i] <- v
+SORTED = 3       # a[i] is in its final position
+PIVOT = 4        # a[i] is the current pivot / key
+AUX = 5          # i elements of auxiliary storage are now in use
+WORKER = 6       # the ops that follow come from worker i (-1: the main process)
+
+OP_NAMES = ('compare', 'swap', 'write', 'sorted', 'pivot', 'aux', 'worker')
+
+CHUNK = 4096     # operations iter_from copies out of the arrays at a time
+
+# SINKS
+# A sink is anything with an emit(op, i, j) method. The algorithms look up
+# sink.emit once and call it for every operation, so sinks should keep it cheap.
+class Trace:
+    def __init__(self):
+        # Structure of arrays: one byte of op code and two ints per operation
+        self.ops = array('B')
+        self.first = array('i')
+        self.second = array('i')
+        self.emit = self._make_emit()
+        self.recording = None       # the thread still filling it, see record_in_background()
+
+    def _make_emit(self):
+        # Bound appends in a closure; this is the hot path of every headless run
+        ops_append = self.ops.append
+        first_append = self.first.append
+        second_append = self.second.append
+
+        def emit(op, i, j=0):
+            ops_append(op)
+            first_append(i)
+            second_append(j)
+
+        return emit
+
+    def __getstate__(self):
+        # Pickle the arrays only; emit is a closure and is rebuilt over them
+        return {'ops': self.ops, 'first': self.first, 'second': self.second}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.emit = self._make_emit()
+        self.recording = None
+
+    def __len__(self):
+        # `second` is appended last, so an op a recording thread is halfway
+        # through emitting is not counted yet
+        return len(self.second)
+
+    def __getitem__(self, step):
+        return self.ops[step], self.first[step], self.second[step]
+
+    def __iter__(self):
+        return zip(self.ops, self.first, self.second)
+
+    def iter_from(self, step):
+        # Operations step, step + 1, ... by index, a chunk at a time, so
+        # starting late costs nothing; follows a trace still being recorded
+        while step < len(self):
+            stop = min(step + CHUNK, len(self))
+            yield from zip(self.ops[step:stop], self.first[step:stop], self.second[step:stop])
+            step = stop
+
+    def columns(self, start, stop):
+        # Steps start .. stop - 1 as numpy arrays for ArrayReplayer.apply_block.
+        # Slicing copies, so the recording can keep growing the arrays.
+        return (np.frombuffer(self.ops[start:stop], dtype=np.uint8),
+                np.frombuffer(self.first[start:stop], dtype=np.int32),
+                np.frombuffer(self.second[start:stop], dtype=np.int32))
+
+# FUNCTIONS
+def record(algorithm, values):
+    # Run an algorithm headless on a copy of values and return its trace
+    trace = Trace()
+    algorithm(list(values), trace)
+    return trace
+
+def record_in_background(algorithm, values):
+    # record() on a daemon thread. The trace comes back at once and fills
+    # while the caller draws; trace.recording is the thread, and an
+    # ArrayTimeline over the trace waits on it for steps not recorded yet.
+    trace = Trace()
+    trace.recording = Thread(target=algorithm, args=(list(values), trace), daemon=True)
+    trace.recording.start()
+    return trace
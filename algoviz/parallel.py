@@ -0,0 +1,446 @@
+import random
+from array import array
+from contextlib import contextmanager
+from multiprocessing import get_all_start_methods, get_context, resource_tracker, shared_memory
+
+import numpy as np
+
+from algoviz import sorts
+from algoviz.ops import COMPARE, SWAP, WRITE, SORTED, PIVOT, AUX, WORKER, Trace
+
+# Parallel sorts. The array lives in shared memory (with a second buffer for
+# the sorts that copy) and a multiprocessing pool works on it in rounds:
+# every task in a round owns its part of the array, and the main process
+# waits for the round to finish before starting the next. Tasks record their
+# operations with whole-array indices and send them back; the main process
+# interleaves each round's traces in batches headed by a WORKER op, so a
+# replay shows the workers side by side and colors what each one touched.
+#
+# The sorts take the usual (a, sink) plus a worker count. With sink=None
+# nothing is recorded and the tasks run at full speed, which is what the
+# speedup report times. Every call starts its own pool, unless one of the
+# right size is kept open by shared_pool(); workers attach to each call's
+# shared memory on their first task for it.
+
+# VARIABLES
+DEFAULT_WORKERS = 4     # fixed so recorded traces are the same on every machine
+BATCH = 32              # ops replayed from one worker before moving to the next
+OVERSAMPLING = 32       # sample sort draws this many candidates per splitter
+SAMPLE_SEED = 0
+
+# Workers are not forked from the caller: the app records parallel sorts on
+# a background thread of a process running pygame, and forking a process
+# with other threads running can deadlock the child. A fork server forks
+# them from a clean process that has already imported this module;
+# spawning is the fallback.
+if 'forkserver' in get_all_start_methods():
+    CONTEXT = get_context('forkserver')
+    CONTEXT.set_forkserver_preload([__name__])
+else:
+    CONTEXT = get_context('spawn')
+
+# Per-worker state, set by attach() for each call's shared memory instead
+# of being pickled with every task
+job = {}
+
+# Pools kept open by shared_pool(), by worker count
+pools = {}
+
+# CLASSES
+class NullSink:
+    def emit(self, op, i, j=0):
+        pass
+
+class Offset:
+    # Runs a serial engine on a slice: shifts its indices to the whole array
+    # and drops its AUX counts and, unless the slice is final, its SORTED marks
+    def __init__(self, sink, start, final=False):
+        emit = sink.emit
+
+        def shifted(op, i, j=0):
+            if op == COMPARE or op == SWAP:
+                emit(op, i + start, j + start)
+            elif op == WRITE or op == PIVOT or (op == SORTED and final):
+                emit(op, i + start, j)
+
+        self.emit = shifted
+
+class Team:
+    # The shared buffers and the pool, plus the trace merging
+    def __init__(self, values, workers, sink):
+        n = len(values)
+        self.n = n
+        self.workers = workers
+        self.recording = sink is not None
+        self.sink = sink if sink is not None else NullSink()
+        self.memory = shared_memory.SharedMemory(create=True, size=max(16 * n, 16))
+        self.buffers = make_buffers(self.memory, n)
+        self.buffers[0][:] = values
+        self.owns_pool = workers not in pools
+        self.pool = CONTEXT.Pool(workers) if self.owns_pool else pools[workers]
+
+    def run(self, function, tasks):
+        # One round. Task k is tagged as worker k; returns what each task
+        # returned after its trace
+        calls = [(function, self.memory.name, self.n, (self.recording,) + task) for task in tasks]
+        results = self.pool.map(call, calls, chunksize=1)
+        if self.recording:
+            self.interleave([result[0] for result in results])
+        return [result[1:] for result in results]
+
+    def interleave(self, packed):
+        traces = []
+        for ops, first, second in packed:
+            trace = (array('B'), array('i'), array('i'))
+            trace[0].frombytes(ops)
+            trace[1].frombytes(first)
+            trace[2].frombytes(second)
+            traces.append(trace)
+
+        emit = self.sink.emit
+        longest = max((len(ops) for ops, _, _ in traces), default=0)
+        for start in range(0, longest, BATCH):
+            for worker, (ops, first, second) in enumerate(traces):
+                if start < len(ops):
+                    emit(WORKER, worker)
+                    for k in range(start, min(start + BATCH, len(ops))):
+                        emit(ops[k], first[k], second[k])
+        if longest:
+            emit(WORKER, -1)
+
+    def close(self):
+        # Not terminate(): workers forked from a pygame process inherit SDL's
+        # SIGTERM handler and would never exit
+        if self.owns_pool:
+            self.pool.close()
+            self.pool.join()
+        del self.buffers
+        self.memory.close()
+        self.memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# FUNCTIONS
+def make_buffers(memory, n):
+    return [np.ndarray(n, dtype=np.int64, buffer=memory.buf, offset=8 * n * k) for k in range(2)]
+
+def attach(name, n):
+    if 'memory' in job:
+        del job['buffers']
+        job['memory'].close()
+    memory = shared_memory.SharedMemory(name=name)
+    job.update(name=name, memory=memory, buffers=make_buffers(memory, n))
+
+def call(packed_task):
+    # Run a task in a worker, attached to the shared memory it works on
+    function, name, n, task = packed_task
+    if job.get('name') != name:
+        attach(name, n)
+    return function(task)
+
+@contextmanager
+def shared_pool(workers):
+    # Keep a pool of `workers` processes open for the parallel sorts run
+    # inside, so its start-up is paid once instead of by every call. The
+    # resource tracker is started first so the workers share it; each
+    # would start its own otherwise and warn about memory already freed.
+    resource_tracker.ensure_running()
+    pool = CONTEXT.Pool(workers)
+    pool.map(abs, range(workers))       # one round trip, so start-up is over
+    pools[workers] = pool
+    try:
+        yield pool
+    finally:
+        del pools[workers]
+        pool.close()
+        pool.join()
+
+def task_sink(recording):
+    return Trace() if recording else NullSink()
+
+def packed(sink):
+    if isinstance(sink, Trace):
+        return sink.ops.tobytes(), sink.first.tobytes(), sink.second.tobytes()
+    return b'', b'', b''
+
+def bounds(n, parts):
+    # `parts` near-equal slices covering range(n)
+    return [(k * n // parts, (k + 1) * n // parts) for k in range(parts)]
+
+# TASKS
+# Each takes (recording, ...) and returns (packed trace, results...)
+def sort_slice(task):
+    # Sort buffer[start:stop] with one of the serial engines
+    recording, buffer, start, stop, engine, final = task
+    values = job['buffers'][buffer]
+    sink = task_sink(recording)
+    chunk = values[start:stop].tolist()
+    getattr(sorts, engine)(chunk, Offset(sink, start, final) if recording else sink)
+    values[start:stop] = chunk
+    return packed(sink),
+
+def co_rank(k, left, right):
+    # How many of the first k elements of the stable merge of two sorted
+    # arrays come from `left`
+    low, high = max(0, k - len(right)), min(k, len(left))
+    while low < high:
+        i = (low + high) // 2
+        if left[i] <= right[k - i - 1]:
+            low = i + 1
+        else:
+            high = i
+    return low
+
+def merge_segment(task):
+    # Outputs out_start..out_stop - 1 of merging source[low:mid] with
+    # source[mid:high] into target, found by co-ranking so several workers
+    # can share one merge
+    recording, source, target, low, mid, high, out_start, out_stop = task
+    values = job['buffers'][source]
+    left, right = values[low:mid], values[mid:high]
+    i = co_rank(out_start - low, left, right)
+    i_stop = co_rank(out_stop - low, left, right)
+    j, j_stop = out_start - low - i, out_stop - low - i_stop
+    left, right = left[i:i_stop].tolist(), right[j:j_stop].tolist()
+
+    sink = task_sink(recording)
+    emit = sink.emit
+    merged = []
+    x = y = 0
+    while x < len(left) and y < len(right):
+        emit(COMPARE, low + i + x, mid + j + y)
+        if right[y] < left[x]:
+            merged.append(right[y])
+            y += 1
+        else:
+            merged.append(left[x])
+            x += 1
+    merged.extend(left[x:])
+    merged.extend(right[y:])
+
+    if recording:
+        for k, value in enumerate(merged, out_start):
+            emit(WRITE, k, value)
+    job['buffers'][target][out_start:out_stop] = merged
+    return packed(sink),
+
+def merge_split(task):
+    # Odd-even transposition step between two sorted neighbours: after it
+    # the left block holds the smaller elements, both still sorted. Also
+    # returns whether anything moved.
+    recording, start, mid, stop = task
+    values = job['buffers'][0]
+    sink = task_sink(recording)
+    emit = sink.emit
+    emit(COMPARE, mid - 1, mid)
+    if values[mid - 1] <= values[mid]:
+        return packed(sink), False
+
+    left, right = values[start:mid].tolist(), values[mid:stop].tolist()
+    merged = []
+    x = y = 0
+    while x < len(left) and y < len(right):
+        emit(COMPARE, start + x, mid + y)
+        if right[y] < left[x]:
+            merged.append(right[y])
+            y += 1
+        else:
+            merged.append(left[x])
+            x += 1
+    merged.extend(left[x:])
+    merged.extend(right[y:])
+
+    if recording:
+        for k, (value, old) in enumerate(zip(merged, left + right), start):
+            if value != old:
+                emit(WRITE, k, value)
+    values[start:stop] = merged
+    return packed(sink), True
+
+def stage_pairs(start, stop, k, j, n):
+    # Comparators of bitonic stage (k, j) whose lower index is in
+    # [start, stop). The first stage of every k compares mirror images
+    # across the k-block, so all comparators sort ascending and the missing
+    # elements past n behave like +infinity at the end.
+    lower = np.arange(start, stop)
+    lower = lower[(lower & j) == 0]
+    upper = lower ^ (k - 1) if j == k // 2 else lower + j
+    keep = upper < n
+    return lower[keep], upper[keep]
+
+def bitonic_stages(task):
+    # Apply the given comparator stages to lower indices [start, stop)
+    recording, start, stop, stages, n = task
+    values = job['buffers'][0]
+    sink = task_sink(recording)
+    emit = sink.emit
+    for k, j in stages:
+        lower, upper = stage_pairs(start, stop, k, j, n)
+        first, second = values[lower], values[upper]
+        swap = first > second
+        if recording:
+            for x, y, swapped in zip(lower.tolist(), upper.tolist(), swap.tolist()):
+                emit(COMPARE, x, y)
+                if swapped:
+                    emit(SWAP, x, y)
+        values[lower[swap]] = second[swap]
+        values[upper[swap]] = first[swap]
+    return packed(sink),
+
+def count_buckets(task):
+    recording, start, stop, splitters = task
+    buckets = np.searchsorted(splitters, job['buffers'][0][start:stop], side='right')
+    return packed(None), np.bincount(buckets, minlength=len(splitters) + 1)
+
+def scatter(task):
+    # Write buffer 0's [start, stop) into buffer 1, each element at the next
+    # free slot of its bucket starting from `offsets`
+    recording, start, stop, splitters, offsets = task
+    block = job['buffers'][0][start:stop]
+    buckets = np.searchsorted(splitters, block, side='right')
+    order = np.argsort(buckets, kind='stable')
+    counts = np.bincount(buckets, minlength=len(offsets))
+    # Rank of every element within its bucket, in original order
+    ranks = np.empty(len(block), dtype=np.int64)
+    ranks[order] = np.arange(len(block)) - np.repeat(np.cumsum(counts) - counts, counts)
+    targets = np.asarray(offsets)[buckets] + ranks
+    job['buffers'][1][targets] = block
+
+    sink = task_sink(recording)
+    if recording:
+        emit = sink.emit
+        for k, value in zip(targets.tolist(), block.tolist()):
+            emit(WRITE, k, value)
+    return packed(sink),
+
+# SORTS
+def parallel_merge_sort(a, sink, workers=DEFAULT_WORKERS):
+    # Every worker sorts one block with the serial merge sort, then runs are
+    # merged pairwise between the two buffers. When there are fewer merges
+    # than workers each merge's output is split by co-ranking, so the last
+    # merge still uses every worker.
+    n = len(a)
+    with Team(a, workers, sink) as team:
+        emit = team.sink.emit
+        emit(AUX, n)
+        runs = [(start, stop) for start, stop in bounds(n, min(workers, n)) if stop > start]
+        team.run(sort_slice, [(0, start, stop, 'merge_sort', False) for start, stop in runs])
+
+        source = 0
+        while len(runs) > 1:
+            target = 1 - source
+            pairs = [(runs[k][0], runs[k][1], runs[k + 1][1]) for k in range(0, len(runs) - 1, 2)]
+            share = max(1, workers // len(pairs))
+            tasks = []
+            for low, mid, high in pairs:
+                for out_start, out_stop in bounds(high - low, share):
+                    if out_stop > out_start:
+                        tasks.append((source, target, low, mid, high, low + out_start, low + out_stop))
+            if len(runs) % 2:
+                # The odd run out is already in place; only the buffer changes
+                start, stop = runs[-1]
+                team.buffers[target][start:stop] = team.buffers[source][start:stop]
+            team.run(merge_segment, tasks)
+            runs = [(low, high) for low, _, high in pairs] + runs[len(pairs) * 2:]
+            source = target
+
+        emit(AUX, 0)
+        for k in range(n):
+            emit(SORTED, k)
+        a[:] = team.buffers[source].tolist()
+
+def bitonic_sort(a, sink, workers=DEFAULT_WORKERS):
+    # Bitonic sorting network. Stages whose comparators stay inside blocks
+    # of B (a power of two, about n / workers) run as one round of block
+    # tasks; the longer-range stages each take a round split by index.
+    n = len(a)
+    block = 1
+    while block * workers < n:
+        block *= 2
+    size = 1
+    while size < n:
+        size *= 2
+    blocks = [(start, min(start + block, n)) for start in range(0, n, block)]
+
+    with Team(a, workers, sink) as team:
+        def local_round(stages):
+            team.run(bitonic_stages, [(start, stop, stages, n) for start, stop in blocks])
+
+        local_round([(k, j) for k in powers(2, block) for j in reversed(powers(1, k // 2))])
+        k = 2 * block
+        while k <= size:
+            j = k // 2
+            while j >= block:
+                team.run(bitonic_stages, [(start, stop, [(k, j)], n) for start, stop in bounds(n, workers)])
+                j //= 2
+            local_round([(k, j) for j in reversed(powers(1, block // 2))])
+            k *= 2
+
+        emit = team.sink.emit
+        for k in range(n):
+            emit(SORTED, k)
+        a[:] = team.buffers[0].tolist()
+
+def powers(low, high):
+    # Powers of two from low to high inclusive
+    result = []
+    while low <= high:
+        result.append(low)
+        low *= 2
+    return result
+
+def odd_even_sort(a, sink, workers=DEFAULT_WORKERS):
+    # Block odd-even transposition: every worker sorts one block, then in
+    # alternating rounds neighbouring blocks merge and split, the left one
+    # keeping the smaller half. Done once an odd and an even round in a row
+    # move nothing (about one round per block).
+    n = len(a)
+    blocks = [(start, stop) for start, stop in bounds(n, min(workers, n)) if stop > start]
+    with Team(a, workers, sink) as team:
+        emit = team.sink.emit
+        team.run(sort_slice, [(0, start, stop, 'quick_sort', False) for start, stop in blocks])
+
+        emit(AUX, n)
+        phase = quiet = 0
+        while quiet < 2 and len(blocks) > 1:
+            moved = team.run(merge_split, [
+                (blocks[k][0], blocks[k][1], blocks[k + 1][1])
+                for k in range(phase % 2, len(blocks) - 1, 2)
+            ])
+            quiet = 0 if any(result[0] for result in moved) else quiet + 1
+            phase += 1
+        emit(AUX, 0)
+        for k in range(n):
+            emit(SORTED, k)
+        a[:] = team.buffers[0].tolist()
+
+def sample_sort(a, sink, workers=DEFAULT_WORKERS):
+    # Splitters from a sorted random sample cut the values into one bucket
+    # per worker. Workers count and scatter their blocks into the buckets in
+    # the second buffer, then each sorts one bucket in place, which is final.
+    n = len(a)
+    sample = sorted(random.Random(SAMPLE_SEED).sample(a, min(n, workers * OVERSAMPLING)))
+    picks = [k * len(sample) // workers for k in range(1, workers)] if sample else []
+    splitters = np.array([sample[k] for k in picks], dtype=np.int64)
+    blocks = bounds(n, workers)
+
+    with Team(a, workers, sink) as team:
+        emit = team.sink.emit
+        emit(AUX, n)
+        counts = [result[0] for result in team.run(count_buckets, [(start, stop, splitters) for start, stop in blocks])]
+        totals = np.sum(counts, axis=0)
+        starts = np.cumsum(totals) - totals
+        # Where each worker's share of each bucket begins
+        offsets = starts + np.cumsum(counts, axis=0) - counts
+        team.run(scatter, [(start, stop, splitters, offsets[w].tolist()) for w, (start, stop) in enumerate(blocks)])
+
+        team.run(sort_slice, [
+            (1, int(start), int(start + total), 'quick_sort', True)
+            for start, total in zip(starts, totals) if total
+        ])
+        emit(AUX, 0)
+        a[:] = team.buffers[1].tolist()
@@ -0,0 +1,588 @@
+import pickle
+from array import array
+from collections import OrderedDict
+from heapq import heappush, heappop
+from math import inf, sqrt
+from sys import maxsize
+
+import numpy as np
+
+from algoviz.grid import CURRENT, FRONTIER, VISITED, FOUND, ignore
+from algoviz.stamps import Stamps
+
+# VARIABLES
+SQRT2 = sqrt(2)
+CACHE_SIZE = 4096            # query results kept by DFSQueries
+BATCH = 256                  # fewest BFS steps taken in one vectorized batch
+
+# CLASSES
+class SearchStats:
+    def __init__(self):
+        self.expanded = 0
+        self.pushes = 0
+        self.pops = 0
+        self.stale = 0       # heap entries skipped by lazy deletion
+        self.path = None     # list of flat indices start..target, or None
+        self.cost = None
+
+    def as_dict(self):
+        return {
+            'expanded': self.expanded,
+            'pushes': self.pushes,
+            'pops': self.pops,
+            'stale': self.stale,
+            'path_length': len(self.path) if self.path else 0,
+            'cost': self.cost,
+        }
+
+class Search:
+    # A search as an explicit state machine. All progress lives in plain
+    # attributes (frontier, parents, stats, the grid itself), so a search can
+    # be inspected, pickled to disk and resumed. step(n) runs n steps, each
+    # ending in a visible change, in one call with the state in locals, and
+    # returns how many it took: fewer than n once the search is done.
+    # Iterating a search steps it one at a time, like the generators it
+    # replaces. A target in another component than the start (see
+    # Grid.reachable) ends the search before its first step.
+    def __init__(self, grid, start, target, dirty, stats):
+        self.grid = grid
+        self.start = start
+        self.target = target
+        self.stats = stats if stats is not None else SearchStats()
+        self.current = None
+        self.done = not grid.reachable(start, target)
+        self.attach(dirty)
+
+    def attach(self, dirty):
+        # Changed cells go to `dirty`; it is not part of the saved state
+        self.dirty = dirty
+        self.mark = dirty.add if dirty is not None else ignore
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if not self.step():
+            raise StopIteration
+        return self.current
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['dirty'], state['mark']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.attach(None)
+
+    def save(self, path):
+        with open(path, 'wb') as file:
+            pickle.dump(self, file, pickle.HIGHEST_PROTOCOL)
+
+class DFS(Search):
+    # The original wandering search: explores, it does not find shortest
+    # paths. A step either takes a cell off the stack (CURRENT) or expands
+    # it (VISITED, or the path it found marked FOUND when it is the target).
+    # A cell's parent is the cell that pushed it last: that is the push it
+    # is popped from, since any later one would be popped first. `closed`
+    # starts as a copy of the walls and takes the cells this search visits,
+    # so a neighbor takes one lookup to rule out and cells an earlier search
+    # left visited do not count. Should the stack run dry (walls changed
+    # under the search), it ends without a path.
+    name = 'dfs'
+
+    def __init__(self, grid, start, target, dirty=None, stats=None):
+        super().__init__(grid, start, target, dirty, stats)
+        self.closed = bytearray(grid.walls)
+        self.parent = array('i', [-1]) * len(grid)
+        self.stack = array('i', [start])
+        self.expanding = False
+        self.stats.pushes += 1
+
+    def step(self, count=1):
+        if self.done:
+            return 0
+        grid = self.grid
+        visited = grid.visited
+        state = grid.state
+        cols = grid.cols
+        last = cols - 1
+        size = len(visited)
+        closed = self.closed
+        parent = self.parent
+        stack = self.stack
+        push = stack.append
+        pop = stack.pop
+        mark = self.mark
+        target = self.target
+        current = self.current
+        expanding = self.expanding
+        # Counted in locals, added to stats on the way out
+        pushes = -len(stack)
+        pops = expanded = 0
+        taken = 0
+
+        # One pass takes a cell off the stack and expands it, two steps. A
+        # cell only shows as CURRENT when the call ends between the two.
+        while taken < count:
+            if not expanding:
+                try:
+                    current = pop()
+                    pops += 1
+                    while closed[current]:
+                        current = pop()
+                        pops += 1
+                except IndexError:
+                    self.done = True
+                    break
+                closed[current] = visited[current] = 1
+                expanded += 1
+                taken += 1
+                if taken == count:
+                    state[current] = CURRENT
+                    mark(current)
+                    expanding = True
+                    break
+
+            expanding = False
+            taken += 1
+            if current == target:
+                self.done = True
+                break
+            col = current % cols
+            neighbor = current + cols
+            if neighbor < size and not closed[neighbor]:
+                push(neighbor)
+                parent[neighbor] = current
+            neighbor = current - cols
+            if neighbor >= 0 and not closed[neighbor]:
+                push(neighbor)
+                parent[neighbor] = current
+            neighbor = current + 1
+            if col < last and not closed[neighbor]:
+                push(neighbor)
+                parent[neighbor] = current
+            neighbor = current - 1
+            if col and not closed[neighbor]:
+                push(neighbor)
+                parent[neighbor] = current
+            state[current] = VISITED
+            mark(current)
+
+        stats = self.stats
+        stats.pushes += pushes + len(stack) + pops
+        stats.pops += pops
+        stats.stale += pops - expanded
+        stats.expanded += expanded
+        if self.done and current == target:
+            finish(grid, parent, self.start, target, stats, self.dirty)
+            stats.cost = len(stats.path) - 1
+        self.current = current
+        self.expanding = expanding
+        return taken
+
+class BFS(Search):
+    # Unweighted shortest path (fewest moves). A step queues the previous
+    # cell's neighbors (FRONTIER) and expands the next cell (VISITED). The
+    # queue is an array read from `head`. When a call has at least BATCH
+    # steps and queued cells to take, they go in one vectorized batch (see
+    # take_batch) with the same result as taking them one by one.
+    name = 'bfs'
+
+    def __init__(self, grid, start, target, diagonal=False, dirty=None, stats=None):
+        super().__init__(grid, start, target, dirty, stats)
+        self.diagonal = diagonal
+        self.parent = array('i', [-1]) * len(grid)
+        self.queue = array('i', [start])
+        self.head = 0
+        grid.visited[start] = 1
+        self.stats.pushes += 1
+
+    def step(self, count=1):
+        grid = self.grid
+        visited = grid.visited
+        state = grid.state
+        parent = self.parent
+        queue = self.queue
+        stats = self.stats
+        mark = self.mark
+        diagonal = self.diagonal
+        current = self.current
+        taken = 0
+
+        while taken < count and not self.done:
+            if current is not None:
+                if current == self.target:
+                    finish(grid, parent, self.start, self.target, stats, self.dirty)
+                    stats.cost = len(stats.path) - 1
+                    self.done = True
+                    taken += 1
+                    break
+                if min(count - taken, len(queue) - self.head) >= BATCH:
+                    current, batch = self.take_batch(current, min(count - taken, len(queue) - self.head))
+                    taken += batch
+                    continue
+                for neighbor, _ in moves(grid, current, diagonal):
+                    if not visited[neighbor]:
+                        visited[neighbor] = 1
+                        parent[neighbor] = current
+                        queue.append(neighbor)
+                        stats.pushes += 1
+                        state[neighbor] = FRONTIER
+                        mark(neighbor)
+
+            if self.head == len(queue):
+                self.done = True
+                break
+            current = queue[self.head]
+            self.head += 1
+            stats.pops += 1
+            stats.expanded += 1
+            state[current] = VISITED
+            mark(current)
+            taken += 1
+
+        self.current = current
+        return taken
+
+    def take_batch(self, current, batch):
+        # `batch` steps at once: expand `current` and the queued cells
+        # before the last one taken, then take them all. New cells join the
+        # queue in the order single steps would add them, each with the
+        # first cell to reach it as its parent. Stops early at the target,
+        # which is taken but left to the next step to expand. Returns the
+        # new current cell and how many steps were taken.
+        grid = self.grid
+        head = self.head
+        taken = np.array(self.queue[head:head + batch], dtype=np.int64)
+        found = np.flatnonzero(taken[:-1] == self.target)
+        if len(found):
+            taken = taken[:found[0] + 1]
+        expanding = np.concatenate(([current], taken[:-1]))
+
+        neighbors, parents = batch_moves(grid, expanding, self.diagonal)
+        fresh = grid.visited_view[neighbors] == 0
+        neighbors, parents = neighbors[fresh], parents[fresh]
+        _, first = np.unique(neighbors, return_index=True)
+        first.sort()
+        neighbors, parents = neighbors[first], parents[first]
+
+        grid.visited_view[neighbors] = 1
+        np.frombuffer(self.parent, dtype=np.int32)[neighbors] = parents
+        grid.state_view[neighbors] = FRONTIER
+        grid.state_view[taken] = VISITED
+        self.queue.frombytes(neighbors.astype(np.int32).tobytes())
+        self.head = head + len(taken)
+        if self.head * 2 > len(self.queue):
+            # Drop the taken part once it outweighs what is still queued
+            del self.queue[:self.head]
+            self.head = 0
+        if self.dirty is not None:
+            self.dirty.update(neighbors.tolist())
+            self.dirty.update(taken.tolist())
+
+        stats = self.stats
+        stats.pushes += len(neighbors)
+        stats.pops += len(taken)
+        stats.expanded += len(taken)
+        return int(taken[-1]), len(taken)
+
+class AStar(Search):
+    # A* over cell weights with a binary heap and lazy deletion: improved
+    # entries are pushed again and stale ones skipped when popped. Entering a
+    # cell costs its weight (times sqrt 2 diagonally), and weights are at
+    # least 1, so manhattan is admissible for straight moves and octile with
+    # diagonal ones; manhattan overestimates once diagonals are allowed, so
+    # that pairing is refused. The default picks whichever fits. With the
+    # 'zero' heuristic this is Dijkstra's algorithm.
+    def __init__(self, grid, start, target, heuristic=None, diagonal=False, dirty=None, stats=None):
+        if heuristic is None:
+            heuristic = 'octile' if diagonal else 'manhattan'
+        elif heuristic == 'manhattan' and diagonal:
+            raise ValueError('manhattan is not admissible with diagonal moves; use octile')
+        super().__init__(grid, start, target, dirty, stats)
+        self.heuristic = heuristic
+        self.diagonal = diagonal
+        self.parent = array('i', [-1]) * len(grid)
+        self.dist = array('d', [inf]) * len(grid)
+        self.dist[start] = 0.0
+        self.heap = [(HEURISTICS[heuristic](grid.cols, start, target), 0.0, start)]
+        self.stats.pushes += 1
+
+    @property
+    def name(self):
+        return 'dijkstra' if self.heuristic == 'zero' else 'astar'
+
+    def step(self, count=1):
+        grid = self.grid
+        closed = grid.visited
+        state = grid.state
+        weights = grid.weights
+        cols = grid.cols
+        h = HEURISTICS[self.heuristic]
+        parent = self.parent
+        dist = self.dist
+        heap = self.heap
+        stats = self.stats
+        mark = self.mark
+        diagonal = self.diagonal
+        target = self.target
+        current = self.current
+        taken = 0
+
+        while taken < count and not self.done:
+            if current is not None:
+                g = dist[current]
+                if current == target:
+                    finish(grid, parent, self.start, target, stats, self.dirty)
+                    stats.cost = g
+                    self.done = True
+                    taken += 1
+                    break
+                for neighbor, step in moves(grid, current, diagonal):
+                    if closed[neighbor]:
+                        continue
+                    cost = g + weights[neighbor] * step
+                    if cost < dist[neighbor]:
+                        dist[neighbor] = cost
+                        parent[neighbor] = current
+                        heappush(heap, (cost + h(cols, neighbor, target), cost, neighbor))
+                        stats.pushes += 1
+                        state[neighbor] = FRONTIER
+                        mark(neighbor)
+
+            while heap:
+                _, g, current = heappop(heap)
+                stats.pops += 1
+                if closed[current] or g > dist[current]:
+                    stats.stale += 1
+                    continue
+                closed[current] = 1
+                stats.expanded += 1
+                state[current] = VISITED
+                mark(current)
+                taken += 1
+                break
+            else:
+                self.done = True
+
+        self.current = current
+        return taken
+
+class DFSQueries:
+    # Many (start, target) DFS queries against one grid, headless. Nothing is
+    # cleared between searches: a cell counts as reached when its stamp
+    # equals the current epoch, and each search just takes the next epoch.
+    # Cells are stamped when pushed, so each is pushed at most once and the
+    # stack never holds more than the cell count. Paths (tuples of flat
+    # indices, None when the target is unreachable) are kept in an LRU cache
+    # keyed by the grid version, which set_wall bumps, so results from before
+    # a wall change are never returned. Pairs in different components are
+    # answered from Grid.reachable without searching. `stats` totals every
+    # search run.
+    def __init__(self, grid, cache_size=CACHE_SIZE):
+        self.grid = grid
+        self.stamps = Stamps(len(grid))
+        self.parent = array('i', [-1]) * len(grid)
+        self.stack = array('i')
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0        # misses answered by the component index alone
+        self.stats = SearchStats()
+
+    def query(self, start, target):
+        key = (self.grid.version, start, target)
+        cache = self.cache
+        if key in cache:
+            cache.move_to_end(key)
+            self.hits += 1
+            return cache[key]
+        self.misses += 1
+        path = self.search(start, target)
+        if self.cache_size:
+            cache[key] = path
+            if len(cache) > self.cache_size:
+                cache.popitem(last=False)
+        return path
+
+    def query_many(self, pairs):
+        query = self.query
+        return [query(start, target) for start, target in pairs]
+
+    def search(self, start, target):
+        # Uncached: the DFS itself, with the neighbor order of DFS
+        grid = self.grid
+        if not grid.reachable(start, target):
+            self.skipped += 1
+            return None
+        if start == target:
+            return (start,)
+        walls = grid.walls
+        cols = grid.cols
+        size = len(walls)
+        epoch = self.stamps.next_epoch()
+        stamp = self.stamps.stamp
+        parent = self.parent
+        stack = self.stack
+        stats = self.stats
+        del stack[:]
+        stack.append(start)
+        stamp[start] = epoch
+        pushes = 1
+        expanded = 0
+
+        found = False
+        while stack:
+            current = stack.pop()
+            expanded += 1
+            if current == target:
+                found = True
+                break
+            pushed = len(stack)
+            col = current % cols
+            down = current + cols
+            up = current - cols
+            if down < size and not walls[down] and stamp[down] != epoch:
+                stamp[down] = epoch
+                parent[down] = current
+                stack.append(down)
+            if up >= 0 and not walls[up] and stamp[up] != epoch:
+                stamp[up] = epoch
+                parent[up] = current
+                stack.append(up)
+            if col < cols - 1 and not walls[current + 1] and stamp[current + 1] != epoch:
+                stamp[current + 1] = epoch
+                parent[current + 1] = current
+                stack.append(current + 1)
+            if col > 0 and not walls[current - 1] and stamp[current - 1] != epoch:
+                stamp[current - 1] = epoch
+                parent[current - 1] = current
+                stack.append(current - 1)
+            pushes += len(stack) - pushed
+
+        stats.expanded += expanded
+        stats.pushes += pushes
+        stats.pops += expanded
+        if not found:
+            return None
+        return tuple(reconstruct_path(parent, start, target))
+
+# FUNCTIONS
+def manhattan(cols, a, b):
+    ar, ac = divmod(a, cols)
+    br, bc = divmod(b, cols)
+    return abs(ar - br) + abs(ac - bc)
+
+def octile(cols, a, b):
+    ar, ac = divmod(a, cols)
+    br, bc = divmod(b, cols)
+    dr = abs(ar - br)
+    dc = abs(ac - bc)
+    return dr + dc + (SQRT2 - 2) * min(dr, dc)
+
+def zero(cols, a, b):
+    return 0
+
+HEURISTICS = {'manhattan': manhattan, 'octile': octile, 'zero': zero}
+
+def batch_moves(grid, cells, diagonal):
+    # moves() for an array of cells at once: the open neighbors of each
+    # cell in moves() order, cell by cell, and the cell each came from
+    cols = grid.cols
+    size = len(grid)
+    walls = grid.walls_view
+    col = cells % cols
+
+    def open_at(index, valid):
+        return valid & (walls[np.where(valid, index, 0)] == 0)
+
+    down = open_at(cells + cols, cells + cols < size)
+    up = open_at(cells - cols, cells >= cols)
+    right = open_at(cells + 1, col < cols - 1)
+    left = open_at(cells - 1, col > 0)
+    offsets = [cols, -cols, 1, -1]
+    allowed = [down, up, right, left]
+    if diagonal:
+        offsets += [cols + 1, cols - 1, -cols + 1, -cols - 1]
+        allowed += [open_at(cells + cols + 1, down & right), open_at(cells + cols - 1, down & left),
+                    open_at(cells - cols + 1, up & right), open_at(cells - cols - 1, up & left)]
+    neighbors = cells[:, None] + np.array(offsets)
+    allowed = np.stack(allowed, axis=1)
+    parents = np.broadcast_to(cells[:, None], neighbors.shape)
+    return neighbors[allowed], parents[allowed]
+
+def moves(grid, index, diagonal):
+    # (neighbor, step cost multiplier) pairs. A diagonal move needs both
+    # straight cells it passes between to be open; it never cuts past a wall.
+    cols = grid.cols
+    walls = grid.walls
+    size = len(walls)
+    row, col = divmod(index, cols)
+    down = index + cols < size and not walls[index + cols]
+    up = index >= cols and not walls[index - cols]
+    right = col < cols - 1 and not walls[index + 1]
+    left = col > 0 and not walls[index - 1]
+
+    result = []
+    if down:
+        result.append((index + cols, 1))
+    if up:
+        result.append((index - cols, 1))
+    if right:
+        result.append((index + 1, 1))
+    if left:
+        result.append((index - 1, 1))
+    if diagonal:
+        if down and right and not walls[index + cols + 1]:
+            result.append((index + cols + 1, SQRT2))
+        if down and left and not walls[index + cols - 1]:
+            result.append((index + cols - 1, SQRT2))
+        if up and right and not walls[index - cols + 1]:
+            result.append((index - cols + 1, SQRT2))
+        if up and left and not walls[index - cols - 1]:
+            result.append((index - cols - 1, SQRT2))
+    return result
+
+def reconstruct_path(parent, start, target):
+    path = [target]
+    append = path.append
+    index = target
+    while index != start:
+        index = parent[index]
+        append(index)
+    path.reverse()
+    return path
+
+def finish(grid, parent, start, target, stats, dirty):
+    # Record the path found and mark it FOUND, in one vectorized write
+    stats.path = reconstruct_path(parent, start, target)
+    grid.state_view[np.array(stats.path, dtype=np.intp)] = FOUND
+    if dirty is not None:
+        dirty.update(stats.path)
+
+def dfs(grid, start, target, dirty=None, stats=None):
+    return DFS(grid, start, target, dirty, stats)
+
+def bfs(grid, start, target, diagonal=False, dirty=None, stats=None):
+    return BFS(grid, start, target, diagonal, dirty, stats)
+
+def astar(grid, start, target, heuristic=None, diagonal=False, dirty=None, stats=None):
+    return AStar(grid, start, target, heuristic, diagonal, dirty, stats)
+
+def dijkstra(grid, start, target, diagonal=False, dirty=None, stats=None):
+    return AStar(grid, start, target, 'zero', diagonal, dirty, stats)
+
+def load_search(path, dirty=None):
+    # A search saved with Search.save(), grid included, ready to step on
+    with open(path, 'rb') as file:
+        search = pickle.load(file)
+    search.attach(dirty)
+    return search
+
+def find_path(search, grid, start, target, **options):
+    # Run a search headless to completion and return its SearchStats
+    stats = SearchStats()
+    search(grid, start, target, stats=stats, **options).step(maxsize)
+    return stats
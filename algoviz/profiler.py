@@ -0,0 +1,144 @@
+import cProfile
+import csv
+import json
+import sys
+import threading
+from collections import Counter
+from time import perf_counter_ns
+
+import numpy as np
+
+# Timing for the interactive loops. FrameProfiler keeps, for each of the
+# last CAPACITY frames, the nanoseconds spent in every phase of the frame;
+# the loop calls frame() at the top and mark(phase) after each phase, so
+# the whole frame is accounted for. StepProfiler is opt-in and wraps the
+# function that steps the algorithm, profiling only the time spent inside it.
+
+# VARIABLES
+PHASES = ('wait', 'step', 'draw', 'text', 'hud', 'update', 'idle', 'events')
+CAPACITY = 4096             # frames kept, about a minute at 60 fps
+SAMPLE_INTERVAL = 0.001     # seconds between stack samples
+PROFILERS = ('cprofile', 'sample')
+
+# CLASSES
+class FrameProfiler:
+    # A ring buffer of per-frame phase durations in nanoseconds
+    def __init__(self, phases=PHASES, capacity=CAPACITY):
+        self.phases = phases
+        self.columns = {phase: k for k, phase in enumerate(phases)}
+        self.samples = np.zeros((capacity, len(phases)), dtype=np.int64)
+        self.frames = 0             # frames started so far
+        self.row = self.samples[0]
+        self.last = perf_counter_ns()
+
+    def frame(self):
+        # Start the next row, overwriting the oldest once the buffer is full
+        self.row = self.samples[self.frames % len(self.samples)]
+        self.row[:] = 0
+        self.frames += 1
+        self.last = perf_counter_ns()
+
+    def mark(self, phase):
+        # Charge the time since the previous mark to `phase`
+        now = perf_counter_ns()
+        self.row[self.columns[phase]] += now - self.last
+        self.last = now
+
+    def history(self, current=True):
+        # Rows oldest first; without the frame in progress unless `current`
+        if self.frames <= len(self.samples):
+            rows = self.samples[:self.frames]
+        else:
+            rows = np.roll(self.samples, -(self.frames % len(self.samples)), axis=0)
+        return rows if current else rows[:-1]
+
+    def percentiles(self, quantiles=(50, 99)):
+        # {phase: [milliseconds at each quantile]}, plus 'total' for whole frames
+        rows = self.history(current=False)
+        if not len(rows):
+            return {}
+        rows = np.column_stack((rows, rows.sum(axis=1)))
+        values = np.percentile(rows, quantiles, axis=0) / 1e6
+        return {phase: values[:, k].tolist() for k, phase in enumerate(self.phases + ('total',))}
+
+    def dump(self, path):
+        # JSON when the name ends in .json, CSV otherwise
+        rows = self.history()
+        if path.endswith('.json'):
+            summary = {
+                phase: {'p50_ms': p50, 'p99_ms': p99}
+                for phase, (p50, p99) in self.percentiles().items()
+            }
+            with open(path, 'w') as file:
+                json.dump({
+                    'unit': 'ns', 'phases': list(self.phases), 'first_frame': self.frames - len(rows),
+                    'frames': rows.tolist(), 'summary': summary,
+                }, file, indent=1)
+        else:
+            first = self.frames - len(rows)
+            with open(path, 'w', newline='') as file:
+                writer = csv.writer(file)
+                writer.writerow(('frame',) + tuple(f'{phase}_ns' for phase in self.phases) + ('total_ns',))
+                for k, row in enumerate(rows.tolist(), first):
+                    writer.writerow([k] + row + [sum(row)])
+
+class StepProfiler:
+    # Profiles only the time spent inside wrapped step functions, either with
+    # cProfile (save() writes pstats, for `python -m pstats` or snakeviz) or
+    # by sampling the main thread's stack from a background thread (save()
+    # writes folded stacks, one "frame;frame;... count" line each, which
+    # flamegraph.pl and speedscope read).
+    def __init__(self, mode='cprofile', interval=SAMPLE_INTERVAL):
+        if mode not in PROFILERS:
+            raise ValueError(f'unknown profiler {mode!r}')
+        self.mode = mode
+        self.interval = interval
+        self.profile = cProfile.Profile() if mode == 'cprofile' else None
+        self.stacks = Counter()
+        self.active = False
+        self.thread = None
+        self.stopped = threading.Event()
+        self.target = threading.get_ident()
+
+    def wrap(self, step):
+        if self.profile is not None:
+            profile = self.profile
+
+            def profiled(*args, **kwargs):
+                return profile.runcall(step, *args, **kwargs)
+        else:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.sample, daemon=True)
+                self.thread.start()
+
+            def profiled(*args, **kwargs):
+                self.active = True
+                try:
+                    return step(*args, **kwargs)
+                finally:
+                    self.active = False
+        return profiled
+
+    def sample(self):
+        while not self.stopped.wait(self.interval):
+            if not self.active:
+                continue
+            frame = sys._current_frames().get(self.target)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_name} ({code.co_filename}:{frame.f_lineno})')
+                frame = frame.f_back
+            if self.active:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def save(self, path):
+        if self.profile is not None:
+            self.profile.dump_stats(path)
+            return
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+        with open(path, 'w') as file:
+            for stack, count in self.stacks.most_common():
+                file.write(f'{stack} {count}\n')
@@ -0,0 +1,59 @@
+from functools import partial
+
+from algoviz import parallel, pathfinding, sorts
+
+# Every algorithm the command line, the benchmark and the visualizers know
+# about, by short name.
+
+# CLASSES
+class Algorithm:
+    def __init__(self, name, title, run, quadratic=False, parallel=False, serial=None, options=()):
+        self.name = name
+        self.title = title
+        self.run = run
+        self.quadratic = quadratic    # too slow to benchmark at large n
+        self.parallel = parallel      # run also takes a worker count
+        self.serial = serial          # the serial sort a parallel one's speedup is measured against
+        self.options = options        # keyword options a search's run takes
+
+    def runner(self, workers=None):
+        # run(a, sink) with the worker count of a parallel sort fixed
+        if not self.parallel or workers is None:
+            return self.run
+        return partial(self.run, workers=workers)
+
+    def search(self, **options):
+        # run(grid, start, target, ...) with those of `options` it takes
+        # fixed; the rest, and any left as None, are dropped, so one set of
+        # command line options fits every search
+        options = {key: value for key, value in options.items() if key in self.options and value is not None}
+        return partial(self.run, **options) if options else self.run
+
+def table(*algorithms):
+    return {algorithm.name: algorithm for algorithm in algorithms}
+
+SORTS = table(
+    Algorithm('bubble', 'Bubble Sort', sorts.bubble_sort, quadratic=True),
+    Algorithm('selection', 'Selection Sort', sorts.selection_sort, quadratic=True),
+    Algorithm('insertion', 'Insertion Sort', sorts.insertion_sort, quadratic=True),
+    Algorithm('quick', 'Quick Sort', sorts.quick_sort),
+    Algorithm('merge', 'Merge Sort', sorts.merge_sort),
+    Algorithm('tim', 'TimSort', sorts.tim_sort),
+    Algorithm('heap', 'Heap Sort', sorts.heap_sort),
+    Algorithm('shell', 'Shell Sort', sorts.shell_sort),
+    Algorithm('counting', 'Counting Sort', sorts.counting_sort),
+    Algorithm('lsd-radix', 'LSD Radix Sort', sorts.lsd_radix_sort),
+    Algorithm('msd-radix', 'MSD Radix Sort', sorts.msd_radix_sort),
+    Algorithm('bucket', 'Bucket Sort', sorts.bucket_sort),
+    Algorithm('parallel-merge', 'Parallel Merge Sort', parallel.parallel_merge_sort, parallel=True, serial='merge'),
+    Algorithm('bitonic', 'Bitonic Sort', parallel.bitonic_sort, parallel=True, serial='merge'),
+    Algorithm('odd-even', 'Odd-Even Transposition Sort', parallel.odd_even_sort, parallel=True, serial='quick'),
+    Algorithm('sample', 'Sample Sort', parallel.sample_sort, parallel=True, serial='quick'),
+)
+
+SEARCHES = table(
+    Algorithm('dfs', 'DFS', pathfinding.dfs),
+    Algorithm('bfs', 'BFS', pathfinding.bfs, options=('diagonal',)),
+    Algorithm('dijkstra', 'Dijkstra', pathfinding.dijkstra, options=('diagonal',)),
+    Algorithm('astar', 'A*', pathfinding.astar, options=('diagonal', 'heuristic')),
+)
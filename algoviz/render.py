@@ -0,0 +1,261 @@
+import numpy as np
+import pygame
+
+from algoviz.arraystate import BACKGROUND, NORMAL, STATE_COLORS, WORKER_COLORS
+from algoviz.grid import EMPTY
+from algoviz.mazes import MAX_WEIGHT
+
+# CLASSES
+class BarRenderer:
+    # Repaints only the columns whose bars changed since the last frame.
+    # Indices land in `dirty` (an ArrayTimeline fills it); draw() returns
+    # the screen rects that were touched so the caller can pass them to
+    # display.update().
+    def __init__(self, window, background, outline):
+        self.window = window
+        self.background = background
+        self.outline = outline
+        self.dirty = set()
+        self.full_redraw = True
+        self.top = 0
+
+    def invalidate(self):
+        self.full_redraw = True
+
+    def draw_bar(self, rect):
+        bottom = self.window.get_height()
+        y = bottom - rect.height
+        pygame.draw.rect(self.window, rect.color, (rect.x, y, rect.width, rect.height))
+        pygame.draw.line(self.window, self.outline, (rect.x, bottom), (rect.x, y))
+        pygame.draw.line(self.window, self.outline, (rect.x + rect.width, bottom), (rect.x + rect.width, y))
+        pygame.draw.line(self.window, self.outline, (rect.x, y), (rect.x + rect.width, y))
+
+    def draw(self, rectangles):
+        if self.full_redraw:
+            self.window.fill(self.background)
+            for rect in rectangles:
+                self.draw_bar(rect)
+            if rectangles:
+                self.top = self.window.get_height() - max(rect.height for rect in rectangles)
+            self.dirty.clear()
+            self.full_redraw = False
+            return [self.window.get_rect()]
+
+        if not self.dirty:
+            return []
+
+        bottom = self.window.get_height()
+        updated = []
+        for k in self.dirty:
+            rect = rectangles[k]
+            column = pygame.Rect(rect.x, self.top, rect.width + 1, bottom - self.top)
+            self.window.fill(self.background, column)
+            updated.append(column)
+
+        # Neighbours share a border pixel with every repainted column, so redraw
+        # them as well; their pixels fall inside the columns already listed.
+        redraw = set()
+        for k in self.dirty:
+            redraw.update((k - 1, k, k + 1))
+        for k in redraw:
+            if 0 <= k < len(rectangles):
+                self.draw_bar(rectangles[k])
+
+        self.dirty.clear()
+        return updated
+
+class GridRenderer:
+    # Draws a Grid's cell states through a palette lookup. A full redraw
+    # builds a one-pixel-per-cell image, scales it up once and lays a cached
+    # grid-line overlay on top; after that only cells listed in `dirty` are
+    # patched. draw() returns the screen rects that changed. A cell_size
+    # under 1 (see grid_cell_size) scales down instead: each pixel shows one
+    # sampled cell, and only dirty cells that are sampled get repainted.
+    # The palette is looked up by weight and state: with a `terrain` color,
+    # open cells shade toward it as their weight goes up to MAX_WEIGHT.
+    def __init__(self, window, grid, cell_size, palette, line_color, terrain=None):
+        self.window = window
+        self.grid = grid
+        self.cell_size = cell_size
+        self.width = round(grid.cols * cell_size)
+        self.height = round(grid.rows * cell_size)
+        colors = np.array([palette[k] for k in range(len(palette))], dtype=np.uint8)
+        self.palette = np.repeat(colors[None], 256, axis=0)
+        if terrain is not None:
+            blend = np.clip((np.arange(256) - 1) / (MAX_WEIGHT - 1), 0, 1)[:, None]
+            self.palette[:, EMPTY] = np.rint(colors[EMPTY] + blend * (np.array(terrain) - colors[EMPTY]))
+        self.colors = [[tuple(color) for color in row] for row in self.palette.tolist()]
+        self.dirty = set()
+        self.full_redraw = True
+        self.downscaled = cell_size < 1
+        if self.downscaled:
+            # The cell each pixel row and column samples, and the reverse
+            # (-1 for cells no pixel shows)
+            self.sampled_rows = np.arange(self.height) * grid.rows // self.height
+            self.sampled_cols = np.arange(self.width) * grid.cols // self.width
+            self.pixel_rows = [-1] * grid.rows
+            for y, row in enumerate(self.sampled_rows.tolist()):
+                self.pixel_rows[row] = y
+            self.pixel_cols = [-1] * grid.cols
+            for x, col in enumerate(self.sampled_cols.tolist()):
+                self.pixel_cols[col] = x
+            self.small = pygame.Surface((self.width, self.height))
+        else:
+            self.small = pygame.Surface((grid.cols, grid.rows))
+        self.overlay = self.make_overlay(line_color)
+
+    def make_overlay(self, line_color):
+        # One-pixel border around every cell, like the old per-cell outline
+        size = self.cell_size
+        if size < 3:
+            return None
+        width = self.grid.cols * size
+        height = self.grid.rows * size
+        xs = np.arange(width) % size
+        ys = np.arange(height) % size
+        on_line = ((xs == 0) | (xs == size - 1))[:, None] | ((ys == 0) | (ys == size - 1))[None, :]
+
+        key = (255, 0, 255) if tuple(line_color) != (255, 0, 255) else (0, 255, 0)
+        pixels = np.empty((width, height, 3), dtype=np.uint8)
+        pixels[:] = key
+        pixels[on_line] = line_color
+        overlay = pygame.Surface((width, height))
+        pygame.surfarray.blit_array(overlay, pixels)
+        overlay.set_colorkey(key)
+        return overlay
+
+    def invalidate(self):
+        self.full_redraw = True
+
+    def cell_at(self, x, y):
+        # Flat index of the cell drawn at pixel (x, y)
+        if self.downscaled:
+            return self.grid.index(int(self.sampled_rows[y]), int(self.sampled_cols[x]))
+        return self.grid.index(y // self.cell_size, x // self.cell_size)
+
+    def draw(self):
+        if self.downscaled:
+            return self.draw_sampled()
+        grid = self.grid
+        size = self.cell_size
+        # Past a quarter of the grid a full redraw is cheaper than patching
+        if self.full_redraw or len(self.dirty) * 4 > len(grid):
+            states = grid.state_view.reshape(grid.rows, grid.cols).T
+            weights = grid.weights_view.reshape(grid.rows, grid.cols).T
+            pygame.surfarray.blit_array(self.small, self.palette[weights, states])
+            scaled = pygame.transform.scale(self.small, (grid.cols * size, grid.rows * size))
+            self.window.blit(scaled, (0, 0))
+            if self.overlay is not None:
+                self.window.blit(self.overlay, (0, 0))
+            self.dirty.clear()
+            self.full_redraw = False
+            return [pygame.Rect(0, 0, grid.cols * size, grid.rows * size)]
+
+        updated = []
+        state = grid.state
+        weights = grid.weights
+        colors = self.colors
+        cols = grid.cols
+        for k in self.dirty:
+            row, col = divmod(k, cols)
+            cell = pygame.Rect(col * size, row * size, size, size)
+            self.window.fill(colors[weights[k]][state[k]], cell)
+            if self.overlay is not None:
+                self.window.blit(self.overlay, cell, cell)
+            updated.append(cell)
+        self.dirty.clear()
+        return updated
+
+    def draw_sampled(self):
+        grid = self.grid
+        if self.full_redraw or len(self.dirty) * 4 > len(grid):
+            sampled = np.ix_(self.sampled_rows, self.sampled_cols)
+            states = grid.state_view.reshape(grid.rows, grid.cols)[sampled]
+            weights = grid.weights_view.reshape(grid.rows, grid.cols)[sampled]
+            pygame.surfarray.blit_array(self.small, self.palette[weights.T, states.T])
+            self.window.blit(self.small, (0, 0))
+            self.dirty.clear()
+            self.full_redraw = False
+            return [pygame.Rect(0, 0, self.width, self.height)]
+
+        updated = []
+        state = grid.state
+        weights = grid.weights
+        colors = self.colors
+        cols = grid.cols
+        pixel_rows = self.pixel_rows
+        pixel_cols = self.pixel_cols
+        for k in self.dirty:
+            row, col = divmod(k, cols)
+            y, x = pixel_rows[row], pixel_cols[col]
+            if y >= 0 and x >= 0:
+                self.window.set_at((x, y), colors[weights[k]][state[k]])
+                updated.append(pygame.Rect(x, y, 1, 1))
+        self.dirty.clear()
+        return updated
+
+class ColumnRenderer:
+    # Draws an ArrayState into `area` by binning consecutive elements into
+    # pixel columns. Each column shows the bin's min (solid) and max (light)
+    # in the color of its highest-priority state, and the whole image goes to
+    # the screen with a single surfarray blit. Normal columns a parallel
+    # worker touched take that worker's color.
+    def __init__(self, window, area, max_value):
+        self.window = window
+        self.area = pygame.Rect(area)
+        self.max_value = max(int(max_value), 1)
+        self.surface = pygame.Surface(self.area.size)
+
+        # Palette index 0 is background, then (solid, light) per state and
+        # per worker
+        palette = [BACKGROUND]
+        for color in STATE_COLORS + WORKER_COLORS:
+            palette.append(color)
+            palette.append(tuple((c + b) // 2 for c, b in zip(color, BACKGROUND)))
+        self.palette = np.array(palette, dtype=np.uint8)
+
+        # Pixel height of every row measured from the bottom of the area
+        self.rows_from_bottom = np.arange(self.area.height - 1, -1, -1)
+
+    def bin(self, state):
+        n = len(state)
+        width = self.area.width
+        if n >= width:
+            starts = np.arange(width) * n // width
+            high = np.maximum.reduceat(state.values, starts)
+            low = np.minimum.reduceat(state.values, starts)
+            colors = np.maximum.reduceat(state.colors, starts)
+            owners = np.maximum.reduceat(state.owners, starts)
+        else:
+            index = np.arange(width) * n // width
+            high = low = state.values[index]
+            colors = state.colors[index]
+            owners = state.owners[index]
+        # Tones index STATE_COLORS + WORKER_COLORS
+        tones = np.where((colors == NORMAL) & (owners > 0), owners + (len(STATE_COLORS) - 1), colors)
+        return high, low, tones
+
+    def draw(self, state):
+        if len(state) == 0:
+            self.surface.fill(BACKGROUND)
+            self.window.blit(self.surface, self.area)
+            return self.area
+
+        high, low, tones = self.bin(state)
+        scale = self.area.height / self.max_value
+        high_px = (high * scale).astype(np.int64)[:, None]
+        low_px = (low * scale).astype(np.int64)[:, None]
+        solid = 1 + 2 * tones.astype(np.int64)[:, None]
+
+        rows = self.rows_from_bottom[None, :]
+        index = np.where(rows < low_px, solid, np.where(rows < high_px, solid + 1, 0))
+        pygame.surfarray.blit_array(self.surface, self.palette[index])
+        self.window.blit(self.surface, self.area)
+        return self.area
+
+# FUNCTIONS
+def grid_cell_size(rows, cols, pixels=600):
+    # Whole pixels per cell while the grid fits in `pixels`, else a fraction
+    # of one, so a grid is never drawn larger than that
+    cells = max(rows, cols, 1)
+    return pixels // cells if cells <= pixels else pixels / cells
@@ -0,0 +1,68 @@
+from itertools import islice
+from time import perf_counter
+
+# VARIABLES
+MIN_STEPS_PER_SECOND = 1
+MAX_STEPS_PER_SECOND = 10_000_000
+FRAME_BUDGET = 0.012    # seconds of stepping allowed per frame
+CHUNK = 256             # steps taken between clock checks
+
+# CLASSES
+class StepScheduler:
+    # Runs an algorithm at a fixed number of steps per second, independent of
+    # the frame rate. Each frame, advance() takes every step that has come
+    # due since the last call, in batches, until the frame budget runs out;
+    # the caller then draws the latest state once. The source is a stepper
+    # with step(n), which takes a whole batch per call, or any iterator.
+    # `wrap`, when set, is applied to the step function (for profiling).
+    def __init__(self, steps_per_second, frame_budget=FRAME_BUDGET):
+        self.steps_per_second = steps_per_second
+        self.frame_budget = frame_budget
+        self.credit = 0.0
+        self.last = perf_counter()
+        self.wrap = None
+
+    def faster(self):
+        self.steps_per_second = min(self.steps_per_second * 2, MAX_STEPS_PER_SECOND)
+
+    def slower(self):
+        self.steps_per_second = max(self.steps_per_second // 2, MIN_STEPS_PER_SECOND)
+
+    def reset(self):
+        # Call when (re)starting so time spent paused is not owed as steps
+        self.credit = 0.0
+        self.last = perf_counter()
+
+    def advance(self, source):
+        # Returns (steps taken, finished)
+        step = getattr(source, 'step', None)
+        if step is None:
+            def step(count):
+                return sum(1 for _ in islice(source, count))
+        if self.wrap is not None:
+            step = self.wrap(step)
+
+        now = perf_counter()
+        self.credit += (now - self.last) * self.steps_per_second
+        self.last = now
+
+        due = int(self.credit)
+        if due == 0:
+            return 0, False
+
+        deadline = now + self.frame_budget
+        taken = 0
+        while taken < due:
+            chunk = min(CHUNK, due - taken)
+            batch = step(chunk)
+            taken += batch
+            if batch < chunk:
+                self.credit = 0.0
+                return taken, True
+            if perf_counter() >= deadline:
+                break
+
+        # Steps that did not fit in the budget are dropped rather than piling
+        # up; the run simply goes as fast as the machine allows.
+        self.credit = min(self.credit - taken, 1.0)
+        return taken, False
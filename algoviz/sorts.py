@@ -0,0 +1,724 @@
+from sys import maxsize
+
+from algoviz.ops import COMPARE, SWAP, WRITE, SORTED, PIVOT, AUX
+
+# Every algorithm sorts the list `a` in place and reports what it does to
+# `sink`. They never draw and never yield, so they run at full speed; the
+# visualizers replay the recorded operations afterwards. Algorithms that
+# need scratch space report its size in elements with AUX as it changes.
+
+# VARIABLES
+MIN_MERGE = 32          # shorter inputs are one binary-insertion run
+MIN_GALLOP = 7          # wins in a row before a merge starts galloping
+NO_GALLOP = maxsize
+INSERTION_CUTOFF = 16   # quick sort hands shorter ranges to insertion sort
+NINTHER_CUTOFF = 128    # and picks pivots by ninther from this length on
+CIURA_GAPS = (1, 4, 10, 23, 57, 132, 301, 701, 1750)
+GAP_GROWTH = 2.25       # extends Ciura's sequence past 1750
+RADIX_BITS = 8
+RADIX = 1 << RADIX_BITS
+
+def bubble_sort(a, sink):
+    emit = sink.emit
+    n = len(a)
+
+    for i in range(n):
+        for j in range(n - i - 1):
+            emit(COMPARE, j, j + 1)
+            if a[j] > a[j + 1]:
+                a[j], a[j + 1] = a[j + 1], a[j]
+                emit(SWAP, j, j + 1)
+        emit(SORTED, n - i - 1)
+
+def selection_sort(a, sink):
+    emit = sink.emit
+    n = len(a)
+
+    for i in range(n):
+        min_index = i
+        emit(PIVOT, i)
+
+        for j in range(i + 1, n):
+            emit(COMPARE, j, min_index)
+            if a[j] < a[min_index]:
+                min_index = j
+                emit(PIVOT, j)
+
+        if min_index != i:
+            a[i], a[min_index] = a[min_index], a[i]
+            emit(SWAP, i, min_index)
+        emit(SORTED, i)
+
+def insertion_sort(a, sink):
+    emit = sink.emit
+    n = len(a)
+
+    for i in range(1, n):
+        key = a[i]
+        emit(PIVOT, i)
+
+        j = i - 1
+        while j >= 0:
+            emit(COMPARE, j, j + 1)
+            if a[j] <= key:
+                break
+            a[j + 1] = a[j]
+            emit(WRITE, j + 1, a[j])
+            j -= 1
+
+        if j + 1 != i:
+            a[j + 1] = key
+            emit(WRITE, j + 1, key)
+
+    for i in range(n):
+        emit(SORTED, i)
+
+def quick_sort(a, sink):
+    # Introsort with an explicit stack: median-of-three pivots (ninther on
+    # long ranges), three-way partitioning so duplicates end up in place,
+    # the larger side pushed and the smaller one sorted first so the stack
+    # stays O(log n), heap sort once a range has been split more than
+    # 2 log2(n) times, and insertion sort below INSERTION_CUTOFF.
+    emit = sink.emit
+    n = len(a)
+    stack = [(0, n - 1, 2 * n.bit_length())]
+
+    while stack:
+        low, high, depth = stack.pop()
+        while high - low >= INSERTION_CUTOFF:
+            if depth == 0:
+                heap_sort_range(a, emit, low, high)
+                break
+            depth -= 1
+            lt, gt = partition(a, emit, low, high)
+            if lt - low < high - gt:
+                stack.append((gt + 1, high, depth))
+                high = lt - 1
+            else:
+                stack.append((low, lt - 1, depth))
+                low = gt + 1
+        else:
+            insertion_range(a, emit, low, high)
+
+def partition(a, emit, low, high):
+    # Dijkstra's three-way partition around a median pivot. Returns the
+    # bounds of the band equal to the pivot, which is already in place.
+    if high - low >= NINTHER_CUTOFF:
+        step = (high - low) // 8
+        middle = (low + high) // 2
+        pivot = median_of_three(a, emit,
+                                median_of_three(a, emit, low, low + step, low + 2 * step),
+                                median_of_three(a, emit, middle - step, middle, middle + step),
+                                median_of_three(a, emit, high - 2 * step, high - step, high))
+    else:
+        pivot = median_of_three(a, emit, low, (low + high) // 2, high)
+
+    if pivot != low:
+        a[low], a[pivot] = a[pivot], a[low]
+        emit(SWAP, low, pivot)
+    emit(PIVOT, low)
+    value = a[low]
+    lt, i, gt = low, low + 1, high
+
+    # a[low:lt] < value, a[lt:i] == value, a[gt + 1:high + 1] > value
+    while i <= gt:
+        emit(COMPARE, i, lt)
+        if a[i] < value:
+            a[lt], a[i] = a[i], a[lt]
+            emit(SWAP, lt, i)
+            lt += 1
+            i += 1
+        elif a[i] > value:
+            a[i], a[gt] = a[gt], a[i]
+            emit(SWAP, i, gt)
+            gt -= 1
+        else:
+            i += 1
+
+    for k in range(lt, gt + 1):
+        emit(SORTED, k)
+    return lt, gt
+
+def median_of_three(a, emit, i, j, k):
+    # Index of the median of a[i], a[j], a[k] in at most three comparisons
+    emit(COMPARE, i, j)
+    if a[i] < a[j]:
+        emit(COMPARE, j, k)
+        if a[j] < a[k]:
+            return j
+        emit(COMPARE, i, k)
+        return k if a[i] < a[k] else i
+    emit(COMPARE, j, k)
+    if a[k] < a[j]:
+        return j
+    emit(COMPARE, i, k)
+    return k if a[k] < a[i] else i
+
+def insertion_range(a, emit, low, high):
+    # insertion_sort on a[low:high + 1], then marked sorted
+    for i in range(low + 1, high + 1):
+        key = a[i]
+        j = i - 1
+        while j >= low:
+            emit(COMPARE, j, j + 1)
+            if a[j] <= key:
+                break
+            a[j + 1] = a[j]
+            emit(WRITE, j + 1, a[j])
+            j -= 1
+        if j + 1 != i:
+            a[j + 1] = key
+            emit(WRITE, j + 1, key)
+
+    for k in range(low, high + 1):
+        emit(SORTED, k)
+
+def heap_sort(a, sink):
+    heap_sort_range(a, sink.emit, 0, len(a) - 1)
+
+def shell_sort(a, sink):
+    # Gapped insertion sort over Ciura's gaps, largest first
+    emit = sink.emit
+    n = len(a)
+    gaps = list(CIURA_GAPS)
+    while gaps[-1] * GAP_GROWTH < n:
+        gaps.append(int(gaps[-1] * GAP_GROWTH))
+
+    for gap in reversed(gaps):
+        if gap >= n:
+            continue
+        for i in range(gap, n):
+            key = a[i]
+            j = i
+            while j >= gap:
+                emit(COMPARE, j - gap, j)
+                if a[j - gap] <= key:
+                    break
+                a[j] = a[j - gap]
+                emit(WRITE, j, a[j])
+                j -= gap
+            if j != i:
+                a[j] = key
+                emit(WRITE, j, key)
+
+    for k in range(n):
+        emit(SORTED, k)
+
+def counting_sort(a, sink):
+    # Stable counting sort: histogram the keys, turn it into start offsets,
+    # place every element in an output buffer and write that back. Needs
+    # max - min + 1 counters next to the n-element buffer.
+    emit = sink.emit
+    n = len(a)
+    if n == 0:
+        return
+    low = min(a)
+    counts = [0] * (max(a) - low + 1)
+    output = [0] * n
+    emit(AUX, n + len(counts))
+
+    for value in a:
+        counts[value - low] += 1
+    total = 0
+    for key, count in enumerate(counts):
+        counts[key] = total
+        total += count
+    for value in a:
+        output[counts[value - low]] = value
+        counts[value - low] += 1
+
+    for k in range(n):
+        a[k] = output[k]
+        emit(WRITE, k, a[k])
+        emit(SORTED, k)
+    emit(AUX, 0)
+
+def lsd_radix_sort(a, sink):
+    # Least significant digit first, RADIX_BITS at a time, each pass a stable
+    # counting sort through one n-element buffer and written back. Keys are
+    # taken relative to the minimum so negative values work too.
+    emit = sink.emit
+    n = len(a)
+    if n == 0:
+        return
+    low = min(a)
+    span = max(a) - low
+    output = [0] * n
+    counts = [0] * RADIX
+    emit(AUX, n + RADIX)
+
+    shift = 0
+    while span >> shift:
+        for k in range(RADIX):
+            counts[k] = 0
+        for value in a:
+            counts[(value - low) >> shift & RADIX - 1] += 1
+        total = 0
+        for digit in range(RADIX):
+            counts[digit], total = total, total + counts[digit]
+        for value in a:
+            digit = (value - low) >> shift & RADIX - 1
+            output[counts[digit]] = value
+            counts[digit] += 1
+        for k in range(n):
+            a[k] = output[k]
+            emit(WRITE, k, a[k])
+        shift += RADIX_BITS
+
+    emit(AUX, 0)
+    for k in range(n):
+        emit(SORTED, k)
+
+def msd_radix_sort(a, sink):
+    # Most significant digit first and in place (American flag sort): each
+    # range is permuted into its RADIX buckets by swapping elements along
+    # cycles, then every bucket is pushed to be sorted on the next digit.
+    # Short buckets go to insertion sort. The only scratch space is two
+    # RADIX-sized tables per pending range.
+    emit = sink.emit
+    n = len(a)
+    if n == 0:
+        return
+    low = min(a)
+    top = max(a) - low
+    shift = max(top.bit_length() - RADIX_BITS, 0)
+    stack = [(0, n, shift)]
+
+    while stack:
+        emit(AUX, 2 * RADIX * len(stack))
+        start, stop, shift = stack.pop()
+        if stop - start <= INSERTION_CUTOFF or shift < 0:
+            if stop - start > 1 and shift >= 0:
+                insertion_range(a, emit, start, stop - 1)
+            else:
+                for k in range(start, stop):
+                    emit(SORTED, k)
+            continue
+
+        counts = [0] * RADIX
+        for k in range(start, stop):
+            counts[(a[k] - low) >> shift & RADIX - 1] += 1
+        heads = [0] * RADIX
+        tails = [0] * RADIX
+        total = start
+        for digit in range(RADIX):
+            heads[digit] = total
+            total += counts[digit]
+            tails[digit] = total
+
+        for digit in range(RADIX):
+            while heads[digit] < tails[digit]:
+                k = heads[digit]
+                other = (a[k] - low) >> shift & RADIX - 1
+                if other == digit:
+                    heads[digit] += 1
+                    continue
+                # a[k] belongs in bucket `other`: swap it to that bucket's head
+                target = heads[other]
+                a[k], a[target] = a[target], a[k]
+                emit(SWAP, k, target)
+                heads[other] += 1
+
+        begin = start
+        for digit in range(RADIX):
+            end = tails[digit]
+            if end - begin > 0:
+                stack.append((begin, end, max(shift - RADIX_BITS, 0) if shift else -1))
+            begin = end
+    emit(AUX, 0)
+
+def bucket_sort(a, sink):
+    # n buckets over the value range. Elements are dealt into the buckets
+    # and written back bucket by bucket, so every bucket becomes a
+    # contiguous range that insertion sort then finishes. Uniform inputs
+    # leave about one element per bucket.
+    emit = sink.emit
+    n = len(a)
+    if n == 0:
+        return
+    low = min(a)
+    width = (max(a) - low) // n + 1
+    buckets = [[] for _ in range(n)]
+    emit(AUX, 2 * n)
+
+    for value in a:
+        buckets[(value - low) // width].append(value)
+    k = 0
+    bounds = []
+    for bucket in buckets:
+        start = k
+        for value in bucket:
+            a[k] = value
+            emit(WRITE, k, value)
+            k += 1
+        if k > start:
+            bounds.append((start, k - 1))
+    del buckets
+    emit(AUX, 0)
+
+    for start, end in bounds:
+        insertion_range(a, emit, start, end)
+
+def heap_sort_range(a, emit, low, high):
+    # In-place max-heap sort of a[low:high + 1]; each maximum is marked
+    # sorted as it reaches its final position
+    count = high - low + 1
+    for root in range(count // 2 - 1, -1, -1):
+        sift_down(a, emit, low, root, count)
+
+    for end in range(count - 1, 0, -1):
+        a[low], a[low + end] = a[low + end], a[low]
+        emit(SWAP, low, low + end)
+        emit(SORTED, low + end)
+        sift_down(a, emit, low, 0, end)
+    if count:
+        emit(SORTED, low)
+
+def sift_down(a, emit, base, root, count):
+    # Heap positions are relative to `base`; children of r are 2r+1, 2r+2
+    while True:
+        child = 2 * root + 1
+        if child >= count:
+            return
+        if child + 1 < count:
+            emit(COMPARE, base + child, base + child + 1)
+            if a[base + child] < a[base + child + 1]:
+                child += 1
+        emit(COMPARE, base + root, base + child)
+        if a[base + root] >= a[base + child]:
+            return
+        a[base + root], a[base + child] = a[base + child], a[base + root]
+        emit(SWAP, base + root, base + child)
+        root = child
+
+def merge_sort(a, sink):
+    # Bottom-up over run widths 1, 2, 4, ...: no recursion, no slicing. All
+    # merges share one buffer sized for the shorter of two runs, half the list.
+    emit = sink.emit
+    n = len(a)
+    aux = [0] * (n // 2)
+    emit(AUX, len(aux))
+    width = 1
+
+    while width < n:
+        for low in range(0, n - width, 2 * width):
+            mid = low + width
+            high = min(mid + width, n)
+            emit(COMPARE, mid - 1, mid)
+            if a[mid - 1] > a[mid]:
+                merge(a, aux, emit, low, mid, high, NO_GALLOP)
+        width *= 2
+
+    emit(AUX, 0)
+    for k in range(n):
+        emit(SORTED, k)
+
+def tim_sort(a, sink):
+    # TimSort: merge the ascending (or reversed descending) runs already in
+    # the input, padded to a minimum length by binary insertion, in the order
+    # the run-stack invariants give. Merges gallop once one side keeps
+    # winning. Sorted input costs n - 1 comparisons.
+    emit = sink.emit
+    n = len(a)
+    aux = [0] * (n // 2)
+    emit(AUX, len(aux))
+    minimum = min_run(n)
+    runs = []
+    min_gallop = MIN_GALLOP
+    low = 0
+
+    while low < n:
+        high = count_run(a, emit, low, n)
+        if high - low < minimum:
+            forced = min(low + minimum, n)
+            binary_insertion(a, emit, low, high, forced)
+            high = forced
+        runs.append((low, high - low))
+        low = high
+
+        # Keep run lengths growing at least like the Fibonacci numbers
+        while len(runs) > 1:
+            k = len(runs) - 2
+            if (k > 0 and runs[k - 1][1] <= runs[k][1] + runs[k + 1][1]) or \
+                    (k > 1 and runs[k - 2][1] <= runs[k - 1][1] + runs[k][1]):
+                if runs[k - 1][1] < runs[k + 1][1]:
+                    k -= 1
+            elif runs[k][1] > runs[k + 1][1]:
+                break
+            min_gallop = merge_at(a, aux, emit, runs, k, min_gallop)
+
+    while len(runs) > 1:
+        k = len(runs) - 2
+        if k > 0 and runs[k - 1][1] < runs[k + 1][1]:
+            k -= 1
+        min_gallop = merge_at(a, aux, emit, runs, k, min_gallop)
+
+    emit(AUX, 0)
+    for k in range(n):
+        emit(SORTED, k)
+
+def min_run(n):
+    # Between MIN_MERGE / 2 and MIN_MERGE, chosen so n / min_run is a power
+    # of two or just below one
+    bits = 0
+    while n >= MIN_MERGE:
+        bits |= n & 1
+        n >>= 1
+    return n + bits
+
+def count_run(a, emit, low, n):
+    # End of the run starting at `low`; a strictly descending run is reversed
+    # in place so every run is ascending
+    high = low + 1
+    if high == n:
+        return high
+
+    emit(COMPARE, high, high - 1)
+    if a[high] < a[high - 1]:
+        high += 1
+        while high < n:
+            emit(COMPARE, high, high - 1)
+            if a[high] >= a[high - 1]:
+                break
+            high += 1
+        i, j = low, high - 1
+        while i < j:
+            a[i], a[j] = a[j], a[i]
+            emit(SWAP, i, j)
+            i += 1
+            j -= 1
+    else:
+        high += 1
+        while high < n:
+            emit(COMPARE, high, high - 1)
+            if a[high] < a[high - 1]:
+                break
+            high += 1
+    return high
+
+def binary_insertion(a, emit, low, start, high):
+    # a[low:start] is sorted; insert a[start:high] into it one at a time
+    for i in range(start, high):
+        key = a[i]
+        emit(PIVOT, i)
+        left, right = low, i
+        while left < right:
+            middle = (left + right) // 2
+            emit(COMPARE, middle, i)
+            if key < a[middle]:
+                right = middle
+            else:
+                left = middle + 1
+        for k in range(i, left, -1):
+            a[k] = a[k - 1]
+            emit(WRITE, k, a[k])
+        if left != i:
+            a[left] = key
+            emit(WRITE, left, key)
+
+def merge_at(a, aux, emit, runs, k, min_gallop):
+    # Merge runs k and k + 1 of the stack. Elements of the first run that
+    # are <= the second's first element, and of the second that are >= the
+    # first's last, are already in place and skipped.
+    low, length = runs[k]
+    mid, right_length = runs[k + 1]
+    high = mid + right_length
+    runs[k] = (low, length + right_length)
+    del runs[k + 1]
+
+    emit(COMPARE, mid - 1, mid)
+    if a[mid - 1] <= a[mid]:
+        return min_gallop
+    low = binary_search(a, a[mid], low, mid, emit, 0, mid, True)
+    high = binary_search(a, a[mid - 1], mid, high, emit, 0, mid - 1, False)
+    return merge(a, aux, emit, low, mid, high, min_gallop)
+
+def merge(a, aux, emit, low, mid, high, min_gallop):
+    # Stable merge of the sorted runs a[low:mid] and a[mid:high]; only the
+    # shorter one goes through aux. Returns the updated gallop threshold.
+    if mid - low <= high - mid:
+        return merge_low(a, aux, emit, low, mid, high, min_gallop)
+    return merge_high(a, aux, emit, low, mid, high, min_gallop)
+
+def merge_low(a, aux, emit, low, mid, high, min_gallop):
+    # Left run moves to aux[0:m] and the output fills a from the front. aux
+    # has no place on screen, so a COMPARE of aux[t] is drawn at t + k - i,
+    # where aux[t] lands if aux[i:t + 1] are the next ones taken.
+    m = mid - low
+    for t in range(m):
+        aux[t] = a[low + t]
+    i, j, k = 0, mid, low
+
+    while i < m and j < high:
+        left_wins = right_wins = 0
+        while i < m and j < high:
+            emit(COMPARE, k, j)
+            if aux[i] <= a[j]:
+                a[k] = aux[i]
+                i += 1
+                left_wins += 1
+                right_wins = 0
+            else:
+                a[k] = a[j]
+                j += 1
+                right_wins += 1
+                left_wins = 0
+            emit(WRITE, k, a[k])
+            k += 1
+            if left_wins >= min_gallop or right_wins >= min_gallop:
+                break
+        else:
+            break
+
+        # Galloping: find and copy whole stretches from one side at a time
+        while i < m and j < high:
+            count = gallop(aux, a[j], i, m, emit, k - i, j, True)
+            for t in range(i, i + count):
+                a[k] = aux[t]
+                emit(WRITE, k, a[k])
+                k += 1
+            i += count
+            if i == m:
+                break
+            a[k] = a[j]
+            emit(WRITE, k, a[k])
+            k += 1
+            j += 1
+            if j == high:
+                break
+
+            found = gallop(a, aux[i], j, high, emit, 0, k, False)
+            for t in range(j, j + found):
+                a[k] = a[t]
+                emit(WRITE, k, a[k])
+                k += 1
+            j += found
+            if j == high:
+                break
+            a[k] = aux[i]
+            emit(WRITE, k, a[k])
+            k += 1
+            i += 1
+
+            if count < MIN_GALLOP and found < MIN_GALLOP:
+                min_gallop += 1
+                break
+            min_gallop = max(1, min_gallop - 1)
+
+    # Whatever is left of the right run is already in place
+    while i < m:
+        a[k] = aux[i]
+        emit(WRITE, k, a[k])
+        i += 1
+        k += 1
+    return min_gallop
+
+def merge_high(a, aux, emit, low, mid, high, min_gallop):
+    # Mirror image of merge_low: the right run moves to aux[0:r] and the
+    # output fills a from the back. A COMPARE of aux[t] is drawn at
+    # t + k - j, where aux[t] lands if aux[t:j + 1] are the next ones taken.
+    r = high - mid
+    for t in range(r):
+        aux[t] = a[mid + t]
+    i, j, k = mid - 1, r - 1, high - 1
+
+    while i >= low and j >= 0:
+        left_wins = right_wins = 0
+        while i >= low and j >= 0:
+            emit(COMPARE, i, k)
+            if a[i] > aux[j]:
+                a[k] = a[i]
+                i -= 1
+                left_wins += 1
+                right_wins = 0
+            else:
+                a[k] = aux[j]
+                j -= 1
+                right_wins += 1
+                left_wins = 0
+            emit(WRITE, k, a[k])
+            k -= 1
+            if left_wins >= min_gallop or right_wins >= min_gallop:
+                break
+        else:
+            break
+
+        while i >= low and j >= 0:
+            count = gallop_back(a, aux[j], low, i + 1, emit, 0, k, True)
+            for t in range(i, i - count, -1):
+                a[k] = a[t]
+                emit(WRITE, k, a[k])
+                k -= 1
+            i -= count
+            if i < low:
+                break
+            a[k] = aux[j]
+            emit(WRITE, k, a[k])
+            k -= 1
+            j -= 1
+            if j < 0:
+                break
+
+            found = gallop_back(aux, a[i], 0, j + 1, emit, k - j, i, False)
+            for t in range(j, j - found, -1):
+                a[k] = aux[t]
+                emit(WRITE, k, a[k])
+                k -= 1
+            j -= found
+            if j < 0:
+                break
+            a[k] = a[i]
+            emit(WRITE, k, a[k])
+            k -= 1
+            i -= 1
+
+            if count < MIN_GALLOP and found < MIN_GALLOP:
+                min_gallop += 1
+                break
+            min_gallop = max(1, min_gallop - 1)
+
+    # Whatever is left of the left run is already in place
+    while j >= 0:
+        a[k] = aux[j]
+        emit(WRITE, k, a[k])
+        j -= 1
+        k -= 1
+    return min_gallop
+
+def gallop(seq, key, start, stop, emit, shift, other, inclusive):
+    # How many of seq[start:stop], from the front, are <= key (inclusive) or
+    # < key. Probes offsets 0, 1, 3, 7, ... and then bisects the last gap;
+    # each probe is a COMPARE of seq[t], drawn at t + shift, with `other`.
+    passed = -1
+    probe = 0
+    while start + probe < stop:
+        emit(COMPARE, start + probe + shift, other)
+        if seq[start + probe] > key if inclusive else seq[start + probe] >= key:
+            break
+        passed = probe
+        probe = 2 * probe + 1
+    return binary_search(seq, key, start + passed + 1, min(start + probe, stop), emit, shift, other, inclusive) - start
+
+def gallop_back(seq, key, start, stop, emit, shift, other, strict):
+    # How many of seq[start:stop], from the back, are > key (strict) or >= key
+    passed = -1
+    probe = 0
+    while stop - 1 - probe >= start:
+        emit(COMPARE, stop - 1 - probe + shift, other)
+        if seq[stop - 1 - probe] <= key if strict else seq[stop - 1 - probe] < key:
+            break
+        passed = probe
+        probe = 2 * probe + 1
+    return stop - binary_search(seq, key, max(stop - probe, start), stop - 1 - passed, emit, shift, other, strict)
+
+def binary_search(seq, key, low, high, emit, shift, other, after):
+    # bisect_right (after) or bisect_left of key in seq[low:high], with a
+    # COMPARE of seq[t], drawn at t + shift, with `other` for every probe
+    while low < high:
+        middle = (low + high) // 2
+        emit(COMPARE, middle + shift, other)
+        if key < seq[middle] if after else not seq[middle] < key:
+            high = middle
+        else:
+            low = middle + 1
+    return low
@@ -0,0 +1,23 @@
+from array import array
+
+# Visited marks that are never cleared. A cell counts as marked when its
+# stamp equals the current epoch, so starting over is just taking the next
+# epoch; only when the epochs run out is the array zeroed.
+
+# VARIABLES
+EPOCH_LIMIT = 2 ** 32 - 1    # largest stamp an array('I') holds
+
+# CLASSES
+class Stamps:
+    def __init__(self, size):
+        self.stamp = array('I', [0]) * size
+        self.epoch = 0
+
+    def next_epoch(self):
+        # Every cell is unmarked in the epoch returned. Read `stamp` after
+        # calling: running out of epochs replaces the array.
+        if self.epoch == EPOCH_LIMIT:
+            self.stamp = array('I', [0]) * len(self.stamp)
+            self.epoch = 0
+        self.epoch += 1
+        return self.epoch
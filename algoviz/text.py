@@ -0,0 +1,60 @@
+from functools import lru_cache
+
+import pygame
+
+# VARIABLES
+FONT_NAME = 'Futura'
+TEXT_CACHE_SIZE = 256
+
+# One SysFont per size, created on first use. SysFont scans the system font
+# list, so it must never be called per frame.
+fonts = {}
+
+# FUNCTIONS
+def get_font(size):
+    font = fonts.get(size)
+    if font is None:
+        font = fonts[size] = pygame.font.SysFont(FONT_NAME, size)
+    return font
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def render_text(txt, size, color):
+    # Rendered surfaces are shared, so callers must only blit them
+    return get_font(size).render(txt, True, color)
+
+# CLASSES
+class TextOverlay:
+    # A line of text that changes at runtime (step counters and the like).
+    # draw() only touches the screen when the text differs from last time and
+    # returns the dirty rect, or None when nothing changed.
+    def __init__(self, window, center_x, y, size, color, background):
+        self.window = window
+        self.center_x = center_x
+        self.y = y
+        self.size = size
+        self.color = color
+        self.background = background
+        self.txt = None
+        self.rect = None
+
+    def invalidate(self):
+        # The area underneath was repainted; draw again on the next call
+        self.txt = None
+        self.rect = None
+
+    def draw(self, txt):
+        if txt == self.txt:
+            return None
+
+        old_rect = self.rect
+        if old_rect is not None:
+            self.window.fill(self.background, old_rect)
+
+        text = render_text(txt, self.size, self.color)
+        self.rect = text.get_rect(center=(self.center_x, self.y))
+        self.window.blit(text, self.rect)
+        self.txt = txt
+
+        if old_rect is None:
+            return self.rect
+        return self.rect.union(old_rect)
@@ -0,0 +1,396 @@
+from array import array
+from itertools import islice
+
+from algoviz.arraystate import NORMAL, SELECTED, KEY, ArrayReplayer
+from algoviz.ops import COMPARE, SWAP, WRITE, SORTED, PIVOT, WORKER
+
+# Replays that can run backwards. Stepping forward logs only what it takes
+# to invert the step: a swap is its own inverse, a write keeps the value it
+# overwrote, and color changes fit in one flag byte. A full snapshot is kept
+# every `interval` steps, so a long jump restores the nearest one and then
+# replays or undoes less than one interval. Long replays go a block at a
+# time through ArrayReplayer.apply_block and log nothing; only the last
+# UNDO_REACH steps before a seek's target are stepped with the undo log.
+# Every index a step or an undo changes is added to `dirty`, so renderers
+# repaint just those.
+
+# VARIABLES
+MIN_INTERVAL = 4096
+UNDO_REACH = 65536      # steps a seek replays one at a time, so they can be undone
+RECORDING_WAIT = 0.001  # seconds between checks on a trace still being recorded
+
+# UNDO FLAGS (one byte per sort step)
+PREVIOUS_FIRST = 1      # the step before left its first index highlighted
+PREVIOUS_SECOND = 2     # ... and/or its second
+COLOR_SHIFT = 2         # bits 2-3: the color SORTED or PIVOT overwrote
+PIVOT_RESET = 16        # PIVOT turned the old pivot back to normal
+OWNERS_SAVED = 32       # the step repainted worker owners; old ones are in `owners`
+
+# CLASSES
+class ArrayTimeline:
+    # A seekable replay of a sort trace over an ArrayState. The undo log
+    # takes one byte per step, eight more per write, pivot or worker switch
+    # and up to two more per step a parallel worker takes. It reaches back
+    # to the interval boundary before the last one passed, so stepping or
+    # paging back over at least one interval is all undo; only seeks
+    # further back restore a snapshot. After a seek it reaches back
+    # UNDO_REACH steps at most. Snapshots are kept every `interval`
+    # steps (8 * n by default, about one byte per step). A TraceFile's
+    # keyframes are used directly instead of taking snapshots. A trace from
+    # record_in_background() can be played while it is still growing: the
+    # length follows it, and steps past its end wait for the recording.
+    def __init__(self, state, trace, dirty=None, interval=None):
+        self.state = state
+        self.trace = trace
+        self.length = len(trace)
+        self.recording = getattr(trace, 'recording', None)
+        self.replayer = ArrayReplayer(state)
+        self.dirty = dirty
+        self.keyframes = hasattr(trace, 'keyframe') and interval in (None, trace.interval)
+        if self.keyframes:
+            interval = trace.interval
+        self.interval = interval or max(MIN_INTERVAL, 8 * len(state))
+        self.checkpoints = {}
+        self.position = 0
+        self.base = 0               # the undo log covers steps base .. position - 1
+        self.boundary = (0, 0, 0)   # last boundary passed, with the log's saved and owners lengths there
+        self.flags = array('B')
+        self.saved = array('q')     # overwritten values, old pivots and workers, newest last
+        self.owners = array('B')    # owners repainted by parallel workers, newest last
+        self.previous = (-1, -1)    # indices of the last step applied
+        self.finished = None        # colors and highlights from before finish()
+        self.ops = None             # trace iterator positioned at `position`
+        self.full_redraw = False
+        self.checkpoint()
+
+    def __len__(self):
+        # Steps recorded so far; all of them once the recording has ended
+        self.wait(0)
+        return self.length
+
+    def wait(self, step):
+        # Until the recording has reached `step` or ended
+        while self.recording is not None:
+            running = self.recording.is_alive()
+            self.length = len(self.trace)
+            if not running:
+                self.recording = None
+            elif self.length >= step:
+                break
+            else:
+                self.recording.join(RECORDING_WAIT)
+
+    def mark(self, *indices):
+        if self.dirty is not None:
+            self.dirty.update(indices)
+
+    def checkpoint(self):
+        block = self.position // self.interval
+        if not self.keyframes and block not in self.checkpoints:
+            self.checkpoints[block] = self.replayer.snapshot()
+
+    def has_checkpoint(self, block):
+        return self.keyframes or block in self.checkpoints
+
+    def restore(self, block):
+        snapshot = self.trace.keyframe(block) if self.keyframes else self.checkpoints[block]
+        self.replayer.restore(snapshot)
+        self.position = block * self.interval
+        self.clear_log()
+        self.previous = self.trace[self.position - 1][1:] if self.position else (-1, -1)
+        self.finished = None
+        self.ops = None
+        self.full_redraw = True
+
+    def clear_log(self):
+        # The undo log restarts at the current position
+        self.base = self.position
+        self.boundary = (self.position, 0, 0)
+        del self.flags[:]
+        del self.saved[:]
+        del self.owners[:]
+
+    def trim_log(self):
+        # At a boundary: drop what the log holds from before the previous
+        # one. The boundary recorded last is this one again when the log was
+        # undone past it and replayed, and then there is nothing to drop.
+        start, saved, owners = self.boundary
+        if start < self.position:
+            del self.flags[:start - self.base]
+            del self.saved[:saved]
+            del self.owners[:owners]
+            self.base = start
+        self.boundary = (self.position, len(self.saved), len(self.owners))
+
+    def apply(self, op, i, j):
+        replayer = self.replayer
+        colors = self.state.colors
+        highlighted = replayer.highlighted
+        flags = 0
+        if highlighted:
+            first, second = self.previous
+            if first in highlighted:
+                flags = PREVIOUS_FIRST
+            if second in highlighted:
+                flags |= PREVIOUS_SECOND
+            self.mark(*highlighted)
+
+        # Colors below are the ones apply() sees, after it clears highlights
+        owners = self.state.owners
+        if op == COMPARE or op == SWAP:
+            if replayer.worker:
+                flags |= OWNERS_SAVED
+                self.owners.append(owners[i])
+                self.owners.append(owners[j])
+            self.mark(i, j)
+        elif op == WRITE:
+            self.saved.append(int(self.state.values[i]))
+            if replayer.worker:
+                flags |= OWNERS_SAVED
+                self.owners.append(owners[i])
+            self.mark(i)
+        elif op == SORTED:
+            flags |= (NORMAL if i in highlighted else int(colors[i])) << COLOR_SHIFT
+            self.mark(i)
+        elif op == PIVOT:
+            pivot = replayer.pivot
+            if pivot is None:
+                self.saved.append(-1)
+            else:
+                self.saved.append(pivot)
+                if pivot not in highlighted and colors[pivot] == KEY:
+                    flags |= PIVOT_RESET
+                self.mark(pivot)
+            if i in highlighted or (flags & PIVOT_RESET and i == pivot):
+                flags |= NORMAL << COLOR_SHIFT
+            else:
+                flags |= int(colors[i]) << COLOR_SHIFT
+            self.mark(i)
+        elif op == WORKER:
+            self.saved.append(replayer.worker)
+
+        self.flags.append(flags)
+        replayer.apply(op, i, j)
+        self.previous = (i, j)
+        self.position += 1
+        if self.position % self.interval == 0:
+            self.checkpoint()
+            self.trim_log()
+
+    def unstep(self):
+        if self.finished is not None:
+            self.unfinish()
+        self.position -= 1
+        op, i, j = self.trace[self.position]
+        flags = self.flags.pop()
+        replayer = self.replayer
+        values = self.state.values
+        colors = self.state.colors
+
+        if op == COMPARE:
+            for k in replayer.highlighted:
+                colors[k] = NORMAL
+            self.mark(i, j)
+        elif op == SWAP:
+            values[i], values[j] = values[j], values[i]
+            colors[i], colors[j] = colors[j], colors[i]
+            if replayer.pivot == i:
+                replayer.pivot = j
+            elif replayer.pivot == j:
+                replayer.pivot = i
+            self.mark(i, j)
+        elif op == WRITE:
+            values[i] = self.saved.pop()
+            self.mark(i)
+        elif op == SORTED:
+            colors[i] = flags >> COLOR_SHIFT & 3
+            self.mark(i)
+        elif op == PIVOT:
+            colors[i] = flags >> COLOR_SHIFT & 3
+            pivot = self.saved.pop()
+            if flags & PIVOT_RESET:
+                colors[pivot] = KEY
+            replayer.pivot = None if pivot < 0 else pivot
+            self.mark(i)
+            if pivot >= 0:
+                self.mark(pivot)
+        elif op == WORKER:
+            replayer.worker = self.saved.pop()
+
+        if flags & OWNERS_SAVED:
+            owners = self.state.owners
+            if op == WRITE:
+                owners[i] = self.owners.pop()
+            else:
+                owners[j] = self.owners.pop()
+                owners[i] = self.owners.pop()
+
+        # Put back the highlights this step cleared
+        self.previous = self.trace[self.position - 1][1:] if self.position else (-1, -1)
+        highlighted = []
+        if flags & PREVIOUS_FIRST:
+            highlighted.append(self.previous[0])
+        if flags & PREVIOUS_SECOND:
+            highlighted.append(self.previous[1])
+        for k in highlighted:
+            colors[k] = SELECTED
+        self.mark(*highlighted)
+        replayer.highlighted = highlighted
+        self.ops = None
+
+    def finish(self):
+        replayer = self.replayer
+        self.finished = (self.state.colors.copy(), replayer.highlighted, replayer.pivot)
+        replayer.finish()
+        self.mark(*range(len(self.state)))
+
+    def unfinish(self):
+        colors, highlighted, pivot = self.finished
+        self.state.colors[:] = colors
+        self.replayer.highlighted = highlighted
+        self.replayer.pivot = pivot
+        self.finished = None
+        self.mark(*range(len(self.state)))
+
+    def step(self, count=1):
+        # Apply up to `count` steps; returns how many were taken
+        self.wait(self.position + count)
+        count = max(0, min(count, self.length - self.position))
+        if count:
+            if self.ops is None:
+                self.ops = self.trace.iter_from(self.position)
+            apply = self.apply
+            for op, i, j in islice(self.ops, count):
+                apply(op, i, j)
+        if self.position == self.length and self.finished is None and self.recording is None:
+            self.finish()
+        return count
+
+    def seek(self, step):
+        # Move to just before `step` (len(self) is the finished state)
+        self.wait(step)
+        step = max(0, min(step, self.length))
+        block = step // self.interval
+        if step < self.position:
+            if step >= self.base and self.position - step <= self.interval:
+                while self.position > step:
+                    self.unstep()
+                return
+            self.restore(block)
+        elif block * self.interval > self.position and self.has_checkpoint(block):
+            self.restore(block)
+        self.skip(step - UNDO_REACH)
+        self.step(step - self.position)
+
+    def skip(self, step):
+        # Replay up to `step` with apply_block, one interval at a time so the
+        # snapshots are taken on the way. Nothing is logged: the undo log
+        # restarts at `step`.
+        if step <= self.position:
+            return
+        while self.position < step:
+            stop = min(step, (self.position // self.interval + 1) * self.interval)
+            self.replayer.apply_block(*self.trace.columns(self.position, stop))
+            self.position = stop
+            if stop % self.interval == 0:
+                self.checkpoint()
+        self.clear_log()
+        self.previous = self.trace[step - 1][1:]
+        self.ops = None
+        self.full_redraw = True
+
+class GridTimeline:
+    # Runs a grid search and records the cells each step changes, old and new
+    # state (six bytes a cell), so the grid can be wound back and forth over
+    # everything explored so far. Stepping past the explored end advances the
+    # search itself. Searches never read grid.state, so rewinding it under a
+    # paused search is safe. A copy of the states is kept every `interval`
+    # steps; the default of half the cell count makes that at most two bytes
+    # per step, whatever the grid size.
+    def __init__(self, grid, search, dirty, interval=None):
+        self.grid = grid
+        self.dirty = dirty
+        self.touched = set()
+        self.search = search
+        search.attach(self.touched)
+        self.shadow = bytearray(grid.state)     # the states at the explored end
+        self.cells = array('i')
+        self.old = array('B')
+        self.new = array('B')
+        self.offsets = array('q', [0])          # step s changed cells offsets[s]:offsets[s + 1]
+        self.interval = interval or max(MIN_INTERVAL, len(grid) // 2)
+        self.checkpoints = [bytes(grid.state)]
+        self.position = 0
+        self.finished = False
+        self.full_redraw = False
+
+    def __len__(self):
+        # Steps explored so far
+        return len(self.offsets) - 1
+
+    def explore(self):
+        # One more step of the search. Changes made on the way out of a
+        # finished search still count as a step.
+        if not self.search.step() and not self.touched:
+            self.finished = True
+            return False
+
+        state = self.grid.state
+        shadow = self.shadow
+        for k in self.touched:
+            if state[k] != shadow[k]:
+                self.cells.append(k)
+                self.old.append(shadow[k])
+                self.new.append(state[k])
+                shadow[k] = state[k]
+        self.dirty.update(self.touched)
+        self.touched.clear()
+        self.offsets.append(len(self.cells))
+        self.position += 1
+        if self.position % self.interval == 0:
+            self.checkpoints.append(bytes(state))
+        return True
+
+    def redo(self):
+        state = self.grid.state
+        cells = self.cells
+        new = self.new
+        mark = self.dirty.add
+        for c in range(self.offsets[self.position], self.offsets[self.position + 1]):
+            state[cells[c]] = new[c]
+            mark(cells[c])
+        self.position += 1
+
+    def undo(self):
+        self.position -= 1
+        state = self.grid.state
+        cells = self.cells
+        old = self.old
+        mark = self.dirty.add
+        for c in range(self.offsets[self.position + 1] - 1, self.offsets[self.position] - 1, -1):
+            state[cells[c]] = old[c]
+            mark(cells[c])
+
+    def step(self, count=1):
+        # Returns how many steps were taken; fewer once the search is done
+        taken = 0
+        while taken < count:
+            if self.position < len(self):
+                self.redo()
+            elif self.finished or not self.explore():
+                break
+            taken += 1
+        return taken
+
+    def seek(self, step):
+        # Move within the explored steps; never runs the search further
+        step = max(0, min(step, len(self)))
+        if abs(step - self.position) > self.interval:
+            block = step // self.interval
+            self.grid.state[:] = self.checkpoints[block]
+            self.position = block * self.interval
+            self.full_redraw = True
+        while self.position < step:
+            self.redo()
+        while self.position > step:
+            self.undo()
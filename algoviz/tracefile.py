@@ -0,0 +1,208 @@
+import mmap
+import struct
+from array import array
+
+import numpy as np
+
+from algoviz.arraystate import ArrayState, ArrayReplayer
+from algoviz.ops import CHUNK
+
+# Binary trace files. Layout, all little-endian:
+#
+#   header   MAGIC, version, elements, steps, keyframe interval K
+#   block 0  keyframe (state before step 0), then up to K op records
+#   block 1  keyframe (state before step K), then up to K op records
+#   ...
+#
+# Every block has the same size, so step s lives in block s // K at record
+# s % K and seeking costs one keyframe copy plus at most K replayed ops.
+# A keyframe is about 10n bytes, so K defaults to 8 * n (at least
+# KEYFRAME_INTERVAL), which holds keyframes to about 1.25 bytes a step next
+# to the 12 of the records at any size. Seeks replay the records between
+# with ArrayReplayer.apply_block, so long blocks stay quick to seek in.
+# Op records are three int32s (op, i, j). A keyframe holds the values
+# (int64), the color states and the worker owners (uint8 each, padded to 8
+# bytes) and four int64s of replayer state: pivot, the two highlighted
+# indices (-1 when unset) and the owner the current worker paints.
+# Readers memory-map the file, so nothing is loaded until it is touched.
+
+# VARIABLES
+MAGIC = b'AVTR'
+VERSION = 2
+HEADER = struct.Struct('<4sIQQQ')
+RECORD = np.dtype([('op', '<i4'), ('i', '<i4'), ('j', '<i4')])
+KEYFRAME_INTERVAL = 65536      # fewest steps between keyframes by default
+STEPS_PER_ELEMENT = 8          # default keyframe interval per element
+
+# FUNCTIONS
+def padded(size):
+    return -(-size // 8) * 8
+
+def keyframe_size(elements):
+    return 8 * elements + 2 * padded(elements) + 32
+
+def block_size(elements, interval):
+    return keyframe_size(elements) + interval * RECORD.itemsize
+
+def default_interval(elements):
+    return max(KEYFRAME_INTERVAL, STEPS_PER_ELEMENT * elements)
+
+# CLASSES
+class TraceWriter:
+    # A sink that streams operations straight to disk; memory use stays at
+    # one block no matter how long the run is. emit only appends, like
+    # Trace's. When a block fills up it is written out and replayed in one
+    # apply_block call to get the next keyframe.
+    def __init__(self, path, values, keyframe_interval=None):
+        self.file = open(path, 'wb')
+        self.interval = keyframe_interval or default_interval(len(values))
+        self.state = ArrayState(values)
+        self.replayer = ArrayReplayer(self.state)
+        self.ops = array('B')
+        self.first = array('i')
+        self.second = array('i')
+        self.steps = 0          # written out so far; counts the pending records at close
+        self.emit = self._make_emit()
+        self.file.write(HEADER.pack(MAGIC, VERSION, len(self.state), 0, self.interval))
+        self.write_keyframe()
+
+    def _make_emit(self):
+        ops_append = self.ops.append
+        first_append = self.first.append
+        second_append = self.second.append
+        second = self.second
+        interval = self.interval
+        end_block = self.end_block
+
+        def emit(op, i, j=0):
+            ops_append(op)
+            first_append(i)
+            second_append(j)
+            if len(second) == interval:
+                end_block()
+
+        return emit
+
+    def flush(self):
+        # Write the pending records and return them as numpy columns
+        records = np.empty(len(self.second), dtype=RECORD)
+        records['op'] = self.ops
+        records['i'] = self.first
+        records['j'] = self.second
+        self.file.write(records.tobytes())
+        del self.ops[:], self.first[:], self.second[:]
+        return records
+
+    def end_block(self):
+        records = self.flush()
+        self.replayer.apply_block(records['op'], records['i'], records['j'])
+        self.steps += len(records)
+        self.write_keyframe()
+
+    def write_keyframe(self):
+        values, colors, highlighted, pivot, owners, worker = self.replayer.snapshot()
+        highlighted = (list(highlighted) + [-1, -1])[:2]
+        padding = bytes(padded(len(colors)) - len(colors))
+        self.file.write(values.astype('<i8').tobytes())
+        self.file.write(colors.tobytes() + padding)
+        self.file.write(owners.tobytes() + padding)
+        self.file.write(struct.pack('<4q', -1 if pivot is None else pivot, *highlighted, worker))
+
+    def close(self):
+        self.steps += len(self.flush())
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, VERSION, len(self.state), self.steps, self.interval))
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class TraceFile:
+    # Read-only, memory-mapped view of a trace file. Behaves like a Trace
+    # (len, indexing, iteration) and adds state_at() for random access.
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.elements, self.steps, self.interval = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{path} is not a version {VERSION} trace file')
+        self.keyframe_bytes = keyframe_size(self.elements)
+        self.block_bytes = block_size(self.elements, self.interval)
+
+    def __len__(self):
+        return self.steps
+
+    def block_offset(self, block):
+        return HEADER.size + block * self.block_bytes
+
+    def keyframe(self, block):
+        offset = self.block_offset(block)
+        n = self.elements
+        values = np.frombuffer(self.map, dtype='<i8', count=n, offset=offset)
+        colors = np.frombuffer(self.map, dtype=np.uint8, count=n, offset=offset + 8 * n)
+        owners = np.frombuffer(self.map, dtype=np.uint8, count=n, offset=offset + 8 * n + padded(n))
+        pivot, first, second, worker = struct.unpack_from('<4q', self.map, offset + self.keyframe_bytes - 32)
+        highlighted = tuple(k for k in (first, second) if k >= 0)
+        return values, colors, highlighted, None if pivot < 0 else pivot, owners, worker
+
+    def records(self, block):
+        count = min(self.interval, self.steps - block * self.interval)
+        offset = self.block_offset(block) + self.keyframe_bytes
+        return np.frombuffer(self.map, dtype=RECORD, count=max(count, 0), offset=offset)
+
+    def __getitem__(self, step):
+        if not 0 <= step < self.steps:
+            raise IndexError(step)
+        record = self.records(step // self.interval)[step % self.interval]
+        return int(record['op']), int(record['i']), int(record['j'])
+
+    def iter_from(self, step):
+        # Operations step, step + 1, ..., CHUNK of them in memory at a time
+        while step < self.steps:
+            block, offset = divmod(step, self.interval)
+            # Copied out to lists so no view pins the map while suspended
+            records = self.records(block)[offset:offset + CHUNK].tolist()
+            yield from records
+            step += len(records)
+
+    def __iter__(self):
+        return self.iter_from(0)
+
+    def columns(self, start, stop):
+        # Steps start .. stop - 1 as numpy arrays, copied out of the map
+        stop = min(stop, self.steps)
+        parts = []
+        while start < stop:
+            block, offset = divmod(start, self.interval)
+            records = self.records(block)[offset:offset + stop - start]
+            parts.append(records)
+            start += len(records)
+        records = np.concatenate(parts) if parts else np.empty(0, dtype=RECORD)
+        return records['op'], records['i'], records['j']
+
+    def state_at(self, step):
+        # A fresh ArrayState and replayer positioned just before `step`
+        step = max(0, min(step, self.steps))
+        block, offset = divmod(step, self.interval)
+        keyframe = self.keyframe(block)
+        state = ArrayState(keyframe[0])
+        replayer = ArrayReplayer(state)
+        replayer.restore(keyframe)
+        records = self.records(block)[:offset]
+        replayer.apply_block(records['op'], records['i'], records['j'])
+        if step == self.steps:
+            replayer.finish()
+        return state, replayer
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,40 @@
+import pytest
+
+from algoviz import bench, datasets
+from algoviz.ops import AUX, OP_NAMES, record
+from algoviz.registry import SORTS
+
+# The suite counts every operation a sort sends (AUX as its peak size), and
+# the baseline check flags changed counts, slowdowns past the tolerance and
+# failed runs, but nothing the baseline does not know.
+
+# FUNCTIONS
+def result(**fields):
+    fields = {'kind': 'sort', 'algorithm': 'merge', 'distribution': 'sorted', 'n': 100,
+              'status': 'ok', 'seconds': 0.1, 'compare': 500, **fields}
+    return fields
+
+@pytest.mark.parametrize('name', ['insertion', 'merge'])
+def test_bench_sort_counts_the_trace(name):
+    result = bench.bench_sort(name, 'uniform-unique', 300, None)
+    trace = record(SORTS[name].run, datasets.generate('uniform-unique', 300, seed=bench.SEED).tolist())
+    assert result['status'] == 'ok'
+    for op, op_name in enumerate(OP_NAMES):
+        if op != AUX:
+            assert result[op_name] == sum(1 for code in trace.ops if code == op)
+    assert result['aux'] == max((i for op, i, _ in trace if op == AUX), default=0)
+
+@pytest.mark.parametrize('name', list(bench.SEARCHES))
+def test_bench_search_runs(name):
+    result = bench.bench_search(name, 30, None)
+    assert result['status'] == 'ok' and result['expanded'] > 0
+
+def test_compare():
+    baseline = [result(frames_per_second=60.0)]
+    assert bench.compare([result(seconds=0.12)], baseline, 0.25) == []
+    assert bench.compare([result(n=200, seconds=9.0)], baseline, 0.25) == []
+    assert len(bench.compare([result(compare=501)], baseline, 0.25)) == 1
+    assert len(bench.compare([result(seconds=0.2)], baseline, 0.25)) == 1
+    assert len(bench.compare([result(status='recursion-error')], baseline, 0.25)) == 1
+    assert len(bench.compare([result(frames_per_second=30.0)], baseline, 0.25)) == 1
+    assert bench.key(baseline[0]) == ('sort', 'merge', 'sorted', 100)
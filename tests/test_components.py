@@ -0,0 +1,38 @@
+import random
+
+import numpy as np
+import pytest
+
+from algoviz.components import label
+from algoviz.grid import make_grid
+
+# Grid.set_wall keeps the labels of Grid.components current by unions and
+# splits; after any run of edits they must give the same partition of the
+# open cells as labeling the grid from scratch.
+
+# FUNCTIONS
+def same_partition(grid):
+    components = grid.components
+    kept = np.array([components.component(index) for index in range(len(grid))])
+    fresh = label(grid)
+    if not np.array_equal(kept < 0, fresh < 0):
+        return False
+    pairs = set(zip(kept[kept >= 0].tolist(), fresh[fresh >= 0].tolist()))
+    return len(pairs) == len(set(kept[kept >= 0])) == len(set(fresh[fresh >= 0]))
+
+@pytest.mark.parametrize('maze', ['random', 'caves', 'backtracker'])
+@pytest.mark.parametrize('epochs', [None, 3])
+def test_set_wall_matches_fresh_labeling(maze, epochs, monkeypatch):
+    if epochs:
+        # The split BFS stamps wrap around every few splits
+        monkeypatch.setattr('algoviz.stamps.EPOCH_LIMIT', epochs)
+    rng = random.Random(3)
+    grid = make_grid(15, 21, (0, 0), (14, 20), seed=5, maze=maze)
+    grid.reachable(0, len(grid) - 1)
+    for step in range(400):
+        index = rng.randrange(len(grid))
+        grid.set_wall(index, not grid.walls[index])
+        assert grid.components.version == grid.version
+        if step % 10 == 0:
+            assert same_partition(grid), step
+    assert same_partition(grid)
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from algoviz import datasets
+
+# Every distribution is seeded, stays in its value range and has the shape
+# its name promises.
+
+# FUNCTIONS
+@pytest.mark.parametrize('distribution', sorted(datasets.DISTRIBUTIONS))
+@pytest.mark.parametrize('n', [0, 1, 2, 7, 1000])
+def test_seeded_and_in_range(distribution, n):
+    values = datasets.generate(distribution, n, 5, 5000, seed=11)
+    assert values.dtype == np.int64 and len(values) == n
+    assert np.array_equal(values, datasets.generate(distribution, n, 5, 5000, seed=11))
+    if n:
+        assert values.min() >= 5 and values.max() <= 5000
+
+@pytest.mark.parametrize('n', [1, 10, 1000])
+def test_uniform_unique_default_is_a_permutation(n):
+    values = datasets.generate('uniform-unique', n, seed=3)
+    assert np.array_equal(np.sort(values), np.arange(1, n + 1))
+
+def test_uniform_unique_sparse_range():
+    # Far more values than elements, drawn by oversampling
+    values = datasets.generate('uniform-unique', 5000, 1, 10 ** 12, seed=3)
+    assert len(np.unique(values)) == 5000
+    assert values.min() >= 1 and values.max() <= 10 ** 12
+
+def test_uniform_unique_range_too_small():
+    with pytest.raises(ValueError):
+        datasets.generate('uniform-unique', 10, 1, 9)
+
+def test_unknown_distribution():
+    with pytest.raises(ValueError):
+        datasets.generate('gaussian', 10)
+
+def test_shapes():
+    n = 1000
+    assert np.all(np.diff(datasets.generate('sorted', n, seed=1)) >= 0)
+    assert np.all(np.diff(datasets.generate('reversed', n, seed=1)) <= 0)
+    nearly = datasets.generate('nearly-sorted', n, seed=1)
+    assert np.count_nonzero(nearly != np.sort(nearly)) <= 2 * (n // 100)
+    assert len(np.unique(datasets.generate('few-unique', n, seed=1))) <= 8
+    pipe = datasets.generate('organ-pipe', n, seed=1)
+    peak = int(np.argmax(pipe))
+    assert np.all(np.diff(pipe[:peak + 1]) >= 0) and np.all(np.diff(pipe[peak:]) <= 0)
+    saw = datasets.generate('sawtooth', n, seed=1)
+    assert np.count_nonzero(np.diff(saw) < 0) == 3
@@ -0,0 +1,54 @@
+import random
+
+import numpy as np
+import pytest
+
+from algoviz import datasets
+from algoviz.arraystate import ArrayReplayer, ArrayState, Effect
+from algoviz.export import FRAMES, export, frame_steps
+from algoviz.ops import record
+from algoviz.registry import SORTS
+
+# Export chains the effects of the frame ranges instead of replaying the
+# trace in one process; the chained snapshots must be the replay state, and
+# the frames the same on any worker count.
+
+# FUNCTIONS
+def same_snapshot(a, b):
+    return all(np.array_equal(x, y) if isinstance(x, np.ndarray) else x == y for x, y in zip(a, b))
+
+def test_frame_steps():
+    steps = frame_steps(10 ** 6)
+    assert len(steps) == FRAMES and steps[0] == 0 and steps[-1] == 10 ** 6
+    assert all(a < b for a, b in zip(steps, steps[1:]))
+    assert frame_steps(5, 100) == [0, 1, 2, 3, 4, 5]
+    assert frame_steps(0) == [0]
+    assert frame_steps(10, steps_per_frame=4) == [0, 4, 8, 10]
+
+@pytest.mark.parametrize('name', list(SORTS))
+def test_chained_effects_match_replay(name):
+    rng = random.Random(4)
+    values = datasets.generate('uniform-unique', 60, seed=2)
+    trace = record(SORTS[name].run, values.tolist())
+    for _ in range(5):
+        cuts = [0] + sorted(rng.sample(range(len(trace) + 1), 6)) + [len(trace)]
+        replayer = ArrayReplayer(ArrayState(values))
+        snapshot = replayer.snapshot()
+        for start, stop in zip(cuts, cuts[1:]):
+            effect = Effect(len(values))
+            for k in range(start, stop):
+                effect.apply(*trace[k])
+                replayer.apply(*trace[k])
+            snapshot = effect.apply_to(snapshot)
+            assert same_snapshot(snapshot, replayer.snapshot())
+
+def test_frames_do_not_depend_on_workers(tmp_path):
+    pytest.importorskip('pygame')
+    outputs = []
+    for workers in (1, 3):
+        output = tmp_path / f'{workers}.rgb'
+        frames, _ = export('quick', 300, 'uniform-unique', 1, str(output), fmt='raw', frames=40, workers=workers, size=120)
+        assert frames == 40
+        outputs.append(output.read_bytes())
+    assert len(outputs[0]) == 40 * 120 * 120 * 3
+    assert outputs[0] == outputs[1]
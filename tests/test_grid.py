@@ -0,0 +1,19 @@
+from algoviz.grid import WALL, make_grid
+from algoviz.pathfinding import dfs
+
+# Clearing a search keeps the walls, and the same seed builds the same grid.
+
+# FUNCTIONS
+def test_reset_search_keeps_walls():
+    grid = make_grid(20, 20, (0, 0), (19, 19), seed=3)
+    walls = bytes(grid.walls)
+    list(dfs(grid, 0, 399))
+    grid.reset_search()
+    assert bytes(grid.walls) == walls
+    assert not any(grid.visited)
+    assert all((state == WALL) == bool(wall) for state, wall in zip(grid.state[1:-1], walls[1:-1]))
+
+def test_make_grid_is_seeded():
+    a = make_grid(30, 30, (0, 0), (29, 29), seed=8)
+    b = make_grid(30, 30, (0, 0), (29, 29), seed=8)
+    assert a.walls == b.walls and not a.walls[0] and not a.walls[-1]
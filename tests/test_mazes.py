@@ -0,0 +1,26 @@
+import pytest
+
+from algoviz import mazes
+from algoviz.components import label
+from algoviz.grid import Grid
+
+# A perfect maze is a spanning tree of its cells: every cell at an even row
+# and column is open, all open cells are connected, and there is one fewer
+# open edge between 4-neighbors than there are open cells, so no cycles.
+
+# FUNCTIONS
+@pytest.mark.parametrize('maze', mazes.PERFECT)
+@pytest.mark.parametrize('rows, cols', [(1, 1), (1, 9), (9, 1), (11, 15), (12, 17), (30, 40)])
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_perfect_maze_is_spanning_tree(maze, rows, cols, seed):
+    grid = Grid(rows, cols)
+    mazes.generate(grid, maze, seed=seed)
+    walls = grid.walls_view.reshape(rows, cols)
+    open_cells = walls == 0
+    assert open_cells[::2, ::2].all()
+    assert not open_cells[1::2, 1::2].any()
+
+    labels = label(grid)
+    assert len(set(labels[labels >= 0].tolist())) == 1
+    edges = (open_cells[:, :-1] & open_cells[:, 1:]).sum() + (open_cells[:-1, :] & open_cells[1:, :]).sum()
+    assert edges == open_cells.sum() - 1
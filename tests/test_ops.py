@@ -0,0 +1,50 @@
+import pickle
+import random
+
+import pytest
+
+from algoviz import sorts
+from algoviz.ops import COMPARE, SORTED, SWAP, WRITE, Trace, record
+
+# Every sort leaves its input sorted, and replaying its trace on a copy of the
+# input ends in the same order; a trace survives pickling for the export pool.
+
+# VARIABLES
+ALGORITHMS = [sorts.bubble_sort, sorts.selection_sort, sorts.insertion_sort, sorts.quick_sort, sorts.merge_sort]
+
+# FUNCTIONS
+def replay(values, trace):
+    values = list(values)
+    for op, i, j in trace:
+        if op == SWAP:
+            values[i], values[j] = values[j], values[i]
+        elif op == WRITE:
+            values[i] = j
+    return values
+
+@pytest.mark.parametrize('algorithm', ALGORITHMS)
+@pytest.mark.parametrize('n', [0, 1, 2, 31, 200])
+def test_replay_matches_the_sort(algorithm, n):
+    rng = random.Random(n)
+    values = [rng.randint(1, 50) for _ in range(n)]
+    a = list(values)
+    algorithm(a, Trace())
+    assert a == sorted(values)
+    trace = record(algorithm, values)
+    assert replay(values, trace) == sorted(values)
+    assert sorted(i for op, i, _ in trace if op == SORTED) == list(range(n))
+
+def test_trace_columns():
+    trace = Trace()
+    trace.emit(COMPARE, 3, 4)
+    trace.emit(SORTED, 2)
+    assert len(trace) == 2
+    assert trace[0] == (COMPARE, 3, 4)
+    assert list(trace) == [(COMPARE, 3, 4), (SORTED, 2, 0)]
+
+def test_trace_pickles():
+    trace = record(sorts.merge_sort, [5, 2, 4, 1])
+    copy = pickle.loads(pickle.dumps(trace))
+    assert list(copy) == list(trace)
+    copy.emit(SORTED, 0)
+    assert len(copy) == len(trace) + 1
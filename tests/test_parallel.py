@@ -0,0 +1,70 @@
+import random
+
+import numpy as np
+import pytest
+
+from algoviz import datasets, parallel
+from algoviz.arraystate import ArrayReplayer, ArrayState
+from algoviz.ops import SORTED, WORKER, Trace
+from algoviz.registry import SORTS
+
+# The parallel sorts sort in place with and without a sink, their traces
+# replay to the sorted array with every position marked sorted once, and
+# a pool kept open by shared_pool() gives the same traces as fresh pools.
+
+# VARIABLES
+PARALLEL = [name for name, algorithm in SORTS.items() if algorithm.parallel]
+
+# FUNCTIONS
+def recorded(name, values, workers):
+    a = values.tolist()
+    trace = Trace()
+    SORTS[name].run(a, trace, workers=workers)
+    return a, trace
+
+@pytest.mark.parametrize('name', PARALLEL)
+@pytest.mark.parametrize('workers', [1, 3])
+@pytest.mark.parametrize('distribution, n', [('uniform-unique', 0), ('uniform-unique', 1), ('few-unique', 5),
+                                              ('reversed', 37), ('random', 300), ('organ-pipe', 300)])
+def test_parallel_sorts(name, workers, distribution, n):
+    values = datasets.generate(distribution, n, 1, 2 * n + 1, seed=n)
+    a, trace = recorded(name, values, workers)
+    assert a == sorted(values.tolist())
+    replayer = ArrayReplayer(ArrayState(values))
+    for op in trace:
+        replayer.apply(*op)
+    assert np.array_equal(replayer.state.values, np.sort(values))
+    assert sorted(i for op, i, _ in trace if op == SORTED) == list(range(n))
+
+    unrecorded = values.tolist()
+    SORTS[name].run(unrecorded, None, workers=workers)
+    assert unrecorded == a
+
+@pytest.mark.parametrize('name', PARALLEL)
+def test_workers_take_turns(name):
+    # Batches of at most BATCH ops, each headed by its worker, and the main
+    # process's turn again at the end
+    _, trace = recorded(name, datasets.generate('random', 600, seed=1), 3)
+    switches = [k for k, (op, _, _) in enumerate(trace) if op == WORKER]
+    assert {trace[k][1] for k in switches} == {-1, 0, 1, 2}
+    assert all(b - a - 1 <= parallel.BATCH for a, b in zip(switches, switches[1:]))
+    assert trace[switches[-1]][1] == -1
+
+def test_shared_pool_matches_fresh_pools():
+    values = datasets.generate('random', 400, seed=9)
+    fresh = {name: list(recorded(name, values, 2)[1]) for name in PARALLEL}
+    with parallel.shared_pool(2) as pool:
+        assert parallel.pools[2] is pool
+        for name in PARALLEL:
+            assert list(recorded(name, values, 2)[1]) == fresh[name]
+    assert 2 not in parallel.pools
+
+@pytest.mark.parametrize('seed', range(10))
+def test_co_rank(seed):
+    rng = random.Random(seed)
+    left = sorted(rng.randrange(20) for _ in range(rng.randrange(30)))
+    right = sorted(rng.randrange(20) for _ in range(rng.randrange(30)))
+    # Stable merge: ties go to the left
+    merged = sorted([(value, 0) for value in left] + [(value, 1) for value in right])
+    for k in range(len(merged) + 1):
+        assert parallel.co_rank(k, np.array(left), np.array(right)) == sum(1 for _, side in merged[:k] if side == 0)
@@ -0,0 +1,251 @@
+import random
+from collections import deque
+from heapq import heappop, heappush
+from math import inf
+from sys import maxsize
+
+import pytest
+
+from algoviz import pathfinding
+from algoviz.grid import FOUND, VISITED, make_grid
+from algoviz.registry import SEARCHES
+
+# Whatever the searches return must be a real walk through open cells. DFS
+# must reach the target exactly when it is connected to the start, and
+# otherwise end before its first step; taken in many small steps, it must
+# end where one long call does. BFS must take the fewest moves, and its
+# batches must leave the same queue as single steps. The weighted searches
+# must find paths as cheap as a plain Dijkstra over moves(). DFSQueries
+# must answer from its cache only while the grid is unchanged. A search
+# saved mid-run and loaded must finish as if never paused.
+
+# FUNCTIONS
+def assert_walk(grid, path, start, target, diagonal=False):
+    assert path[0] == start and path[-1] == target
+    for a, b in zip(path, path[1:]):
+        assert b in [neighbor for neighbor, _ in pathfinding.moves(grid, a, diagonal)]
+
+def path_cost(grid, path, diagonal):
+    cost = 0.0
+    for a, b in zip(path, path[1:]):
+        cost += grid.weights[b] * dict(pathfinding.moves(grid, a, diagonal))[b]
+    return cost
+
+def cheapest(grid, start, target, diagonal):
+    # Textbook Dijkstra, for reference
+    dist = {start: 0.0}
+    heap = [(0.0, start)]
+    while heap:
+        g, cell = heappop(heap)
+        if cell == target:
+            return g
+        if g > dist[cell]:
+            continue
+        for neighbor, step in pathfinding.moves(grid, cell, diagonal):
+            cost = g + grid.weights[neighbor] * step
+            if cost < dist.get(neighbor, inf):
+                dist[neighbor] = cost
+                heappush(heap, (cost, neighbor))
+    return None
+
+def component(grid, start):
+    seen = {start}
+    todo = [start]
+    while todo:
+        for neighbor in grid.neighbors(todo.pop()):
+            if neighbor not in seen:
+                seen.add(neighbor)
+                todo.append(neighbor)
+    return seen
+
+def step_randomly(search, seed):
+    rng = random.Random(seed)
+    while search.step(rng.choice((1, 2, 3, 50, 700))):
+        pass
+
+def fewest_moves(grid, start, target, diagonal):
+    depth = {start: 0}
+    queue = deque([start])
+    while queue:
+        cell = queue.popleft()
+        if cell == target:
+            return depth[cell]
+        for neighbor, _ in pathfinding.moves(grid, cell, diagonal):
+            if neighbor not in depth:
+                depth[neighbor] = depth[cell] + 1
+                queue.append(neighbor)
+    return None
+
+@pytest.mark.parametrize('density', [0.2, 0.45])
+@pytest.mark.parametrize('seed', range(6))
+def test_dfs_reaches_exactly_the_component(density, seed):
+    grid = make_grid(25, 35, (0, 0), (24, 34), density=density, seed=seed)
+    start, target = 0, len(grid) - 1
+    reach = component(grid, start)
+    changed = list(pathfinding.dfs(grid, start, target))
+    visited = {index for index in range(len(grid)) if grid.visited[index]}
+    assert visited <= reach and set(changed) == visited
+    if target in reach:
+        assert grid.state[target] == FOUND
+        assert VISITED in grid.state
+    else:
+        assert not changed and not visited
+
+@pytest.mark.parametrize('maze', ['random', 'caves', 'backtracker'])
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_dfs_path_is_a_walk(maze, seed):
+    grid = make_grid(31, 41, (0, 0), (30, 40), seed=seed, maze=maze)
+    start, target = 0, len(grid) - 1
+    stats = pathfinding.find_path(pathfinding.dfs, grid, start, target)
+    if grid.reachable(start, target):
+        assert_walk(grid, stats.path, start, target)
+        assert stats.cost == len(stats.path) - 1
+    else:
+        assert stats.path is None
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_dfs_steps_match_one_call(seed):
+    grids = [make_grid(40, 40, (0, 0), (39, 39), seed=seed, maze='caves') for _ in range(2)]
+    whole = pathfinding.dfs(grids[0], 0, 1599)
+    whole.step(maxsize)
+    stepped = pathfinding.dfs(grids[1], 0, 1599)
+    step_randomly(stepped, seed)
+    assert grids[0].state == grids[1].state
+    assert whole.stats.as_dict() == stepped.stats.as_dict()
+    assert whole.stats.path == stepped.stats.path
+
+def test_dfs_reuses_a_grid():
+    # A second search without reset_search ignores what the first visited
+    grid = make_grid(30, 30, (0, 0), (29, 29), density=0.2, seed=4)
+    first = pathfinding.find_path(pathfinding.dfs, grid, 0, len(grid) - 1)
+    again = pathfinding.find_path(pathfinding.dfs, grid, 0, len(grid) - 1)
+    assert again.path == first.path
+
+def test_dfs_ends_when_the_stack_runs_dry():
+    # Walls written without bumping the version fool the reachability check
+    grid = make_grid(20, 20, (0, 0), (19, 19), density=0.1, seed=2)
+    target = len(grid) - 1
+    assert grid.reachable(0, target)
+    for wall in (target - 1, target - grid.cols):
+        grid.walls[wall] = 1
+    stats = pathfinding.find_path(pathfinding.dfs, grid, 0, target)
+    assert stats.path is None and stats.cost is None
+
+@pytest.mark.parametrize('diagonal', [False, True])
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_bfs_takes_fewest_moves(diagonal, seed):
+    grid = make_grid(45, 45, (0, 0), (44, 44), density=0.3, seed=seed)
+    start, target = 0, len(grid) - 1
+    best = fewest_moves(grid, start, target, diagonal)
+    stats = pathfinding.find_path(pathfinding.bfs, grid, start, target, diagonal=diagonal)
+    if best is None:
+        assert stats.path is None
+    else:
+        assert stats.cost == best
+        assert_walk(grid, stats.path, start, target, diagonal)
+
+@pytest.mark.parametrize('diagonal', [False, True])
+@pytest.mark.parametrize('seed', [0, 1])
+def test_bfs_batches_match_single_steps(diagonal, seed, monkeypatch):
+    # A small BATCH, so a small grid's frontier is batched often
+    monkeypatch.setattr(pathfinding, 'BATCH', 8)
+    batches = []
+    original = pathfinding.BFS.take_batch
+
+    def take_batch(search, current, batch):
+        batches.append(batch)
+        return original(search, current, batch)
+
+    monkeypatch.setattr(pathfinding.BFS, 'take_batch', take_batch)
+    rng = random.Random(seed)
+    grids = [make_grid(70, 70, (0, 0), (69, 69), seed=seed) for _ in range(2)]
+    single = pathfinding.bfs(grids[0], 0, len(grids[0]) - 1, diagonal)
+    batched = pathfinding.bfs(grids[1], 0, len(grids[1]) - 1, diagonal)
+    while not single.done:
+        taken = batched.step(rng.choice((1, 9, 50, 300)))
+        assert sum(single.step() for _ in range(taken)) == taken
+        assert single.current == batched.current
+        assert single.queue[single.head:] == batched.queue[batched.head:]
+        assert single.parent == batched.parent
+        assert grids[0].state == grids[1].state
+        assert grids[0].visited == grids[1].visited
+        assert single.stats.as_dict() == batched.stats.as_dict()
+    assert batched.done and batches
+    assert single.stats.path == batched.stats.path
+
+@pytest.mark.parametrize('weights', ['uniform', 'random', 'terrain'])
+@pytest.mark.parametrize('diagonal', [False, True])
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_weighted_searches_are_optimal(weights, diagonal, seed):
+    grid = make_grid(45, 45, (0, 0), (44, 44), seed=seed, maze='caves', weights=weights)
+    start, target = 0, len(grid) - 1
+    best = cheapest(grid, start, target, diagonal)
+    heuristics = [None, 'octile', 'zero'] + ([] if diagonal else ['manhattan'])
+    searches = [(pathfinding.dijkstra, {})] + [(pathfinding.astar, {'heuristic': h}) for h in heuristics]
+    for search, options in searches:
+        grid.reset_search()
+        stats = pathfinding.find_path(search, grid, start, target, diagonal=diagonal, **options)
+        if best is None:
+            assert stats.path is None
+            continue
+        assert stats.cost == pytest.approx(best)
+        assert_walk(grid, stats.path, start, target, diagonal)
+        assert path_cost(grid, stats.path, diagonal) == pytest.approx(stats.cost)
+
+@pytest.mark.parametrize('seed', [0, 1])
+def test_dfs_queries_are_walks_and_cached(seed, monkeypatch):
+    # A tiny epoch limit so the stamps wrap around between searches
+    monkeypatch.setattr('algoviz.stamps.EPOCH_LIMIT', 3)
+    grid = make_grid(40, 40, (0, 0), (39, 39), density=0.3, seed=seed)
+    queries = pathfinding.DFSQueries(grid)
+    rng = random.Random(seed)
+    pairs = [(rng.randrange(len(grid)), rng.randrange(len(grid))) for _ in range(30)]
+    pairs = [(start, target) for start, target in pairs if not grid.walls[start] and not grid.walls[target]]
+    paths = queries.query_many(pairs)
+    for (start, target), path in zip(pairs, paths):
+        if path is None:
+            assert cheapest(grid, start, target, False) is None
+        else:
+            assert_walk(grid, path, start, target)
+    assert queries.query_many(pairs) == paths
+    assert queries.hits == len(pairs) and queries.misses == len(pairs)
+
+def test_dfs_queries_follow_wall_changes():
+    grid = make_grid(30, 30, (0, 0), (29, 29), density=0.2, seed=3)
+    queries = pathfinding.DFSQueries(grid)
+    start, target = grid.index(0, 0), grid.index(29, 29)
+    path = queries.query(start, target)
+    blocked = path[len(path) // 2]
+    grid.set_wall(blocked)
+    detour = queries.query(start, target)
+    assert queries.misses == 2
+    if detour is not None:
+        assert_walk(grid, detour, start, target)
+        assert blocked not in detour
+
+    # Walls written directly count once the version is bumped
+    for col in range(30):
+        grid.walls[grid.index(15, col)] = 1
+    grid.version += 1
+    assert queries.query(start, target) is None
+    assert queries.misses == 3
+
+@pytest.mark.parametrize('name, options', [('dfs', {}), ('bfs', {'diagonal': True}), ('dijkstra', {}),
+                                           ('astar', {'diagonal': True, 'heuristic': 'octile'})])
+@pytest.mark.parametrize('pause', [0, 1, 37, 500])
+def test_saved_search_resumes(name, options, pause, tmp_path):
+    def search(grid):
+        return SEARCHES[name].search(**options)(grid, 0, len(grid) - 1)
+
+    whole = search(make_grid(40, 40, (0, 0), (39, 39), density=0.25, seed=6, weights='terrain'))
+    order = list(whole)
+    paused = search(make_grid(40, 40, (0, 0), (39, 39), density=0.25, seed=6, weights='terrain'))
+    resumed = [next(paused) for _ in range(min(pause, len(order)))]
+    paused.save(tmp_path / 'search.pickle')
+    loaded = pathfinding.load_search(tmp_path / 'search.pickle')
+    resumed += list(loaded)
+    assert resumed == order
+    assert loaded.stats.as_dict() == whole.stats.as_dict()
+    assert loaded.stats.path == whole.stats.path
+    assert loaded.grid.state == whole.grid.state
+
@@ -0,0 +1,41 @@
+import random
+
+import numpy as np
+import pygame
+
+from algoviz.app import BarView
+from algoviz.arraystate import ArrayState
+from algoviz.ops import record
+from algoviz.registry import SORTS
+from algoviz.timeline import ArrayTimeline
+
+# Repainting only the bars a timeline marked dirty, stepping forward or back,
+# must leave the same pixels as repainting every bar.
+
+# FUNCTIONS
+def test_dirty_repaints_match_full_repaints():
+    rng = random.Random(4)
+    values = np.array([rng.randint(20, 500) for _ in range(30)])
+    state = ArrayState(values)
+    window = pygame.Surface((600, 600))
+    view = BarView(window, state)
+    timeline = ArrayTimeline(state, record(SORTS['quick'].run, values.tolist()), view.dirty)
+    assert view.draw(True) == [window.get_rect()]
+
+    fresh = pygame.Surface((600, 600))
+    for _ in range(300):
+        if rng.random() < 0.7:
+            timeline.step(rng.randint(1, 5))
+        else:
+            timeline.seek(timeline.position - rng.randint(1, 8))
+        dirty = set(view.dirty)
+        updated = view.draw(timeline.full_redraw)
+        if not timeline.full_redraw:
+            assert len(updated) == len(dirty)
+        timeline.full_redraw = False
+
+        BarView(fresh, state).draw(True)
+        assert pygame.image.tostring(window, 'RGB') == pygame.image.tostring(fresh, 'RGB')
+
+    timeline.step(len(timeline))
+    assert np.array_equal(state.values, np.sort(values))
@@ -0,0 +1,169 @@
+import random
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+import pytest
+
+from algoviz import datasets, sorts
+from algoviz.arraystate import ArrayReplayer, ArrayState
+from algoviz.ops import AUX, COMPARE, PIVOT, SORTED, SWAP, WRITE, record
+from algoviz.registry import SORTS
+
+# The serial sorts sort every input shape, replay to the sorted array, mark
+# every position sorted once and give back their scratch space; then the
+# properties each engine promises on top of that.
+
+# VARIABLES
+INPUTS = [(distribution, n) for distribution in sorted(datasets.DISTRIBUTIONS) for n in (0, 1, 2, 31, 33, 500)]
+
+# CLASSES
+class Item:
+    # Ordered by key only, to tell equal keys apart
+    def __init__(self, key, tag):
+        self.key = key
+        self.tag = tag
+
+    def __lt__(self, other):
+        return self.key < other.key
+
+    def __le__(self, other):
+        return self.key <= other.key
+
+    def __gt__(self, other):
+        return self.key > other.key
+
+    def __ge__(self, other):
+        return self.key >= other.key
+
+class NullSink:
+    def emit(self, op, i, j=0):
+        pass
+
+# FUNCTIONS
+def check_sort(name, values):
+    trace = record(SORTS[name].run, values.tolist())
+    replayer = ArrayReplayer(ArrayState(values))
+    for op in trace:
+        replayer.apply(*op)
+    assert np.array_equal(replayer.state.values, np.sort(values))
+    assert sorted(i for op, i, _ in trace if op == SORTED) == list(range(len(values)))
+    sizes = [i for op, i, _ in trace if op == AUX]
+    assert not sizes or sizes[-1] == 0
+    return trace
+
+def compares(trace):
+    return sum(1 for op, _, _ in trace if op == COMPARE)
+
+@pytest.mark.parametrize('name', ['merge', 'tim'])
+@pytest.mark.parametrize('distribution, n', INPUTS)
+def test_merge_sorts(name, distribution, n):
+    check_sort(name, datasets.generate(distribution, n, 1, 2 * n + 1, seed=n))
+
+@pytest.mark.parametrize('name', ['merge', 'tim'])
+def test_merge_sorts_are_stable(name):
+    rng = random.Random(5)
+    items = [Item(rng.randrange(20), tag) for tag in range(3000)]
+    SORTS[name].run(items, NullSink())
+    assert [(item.key, item.tag) for item in items] == sorted((item.key, item.tag) for item in items)
+
+@pytest.mark.parametrize('distribution', ['sorted', 'reversed'])
+def test_tim_sort_finds_one_run(distribution):
+    # Strictly ascending or descending input is one run: n - 1 comparisons
+    values = datasets.generate('uniform-unique', 1000, seed=1)
+    values = np.sort(values) if distribution == 'sorted' else np.sort(values)[::-1].copy()
+    assert compares(check_sort('tim', values)) == len(values) - 1
+
+def test_tim_sort_gallops():
+    # Two runs interleaved in blocks of 64: finding the runs costs n - 1
+    # comparisons, and galloping merges them in far fewer than n more
+    n, width = 4096, 64
+    blocks = np.arange(n).reshape(-1, width)
+    values = np.concatenate((blocks[0::2].reshape(-1), blocks[1::2].reshape(-1)))
+    assert compares(check_sort('tim', values)) < n - 1 + n // 4
+
+@pytest.mark.parametrize('seed', range(20))
+def test_gallops_match_bisect(seed):
+    rng = random.Random(seed)
+    seq = sorted(rng.randrange(30) for _ in range(rng.randrange(1, 200)))
+    start = rng.randrange(len(seq))
+    stop = rng.randrange(start, len(seq) + 1)
+    key = rng.randrange(-1, 31)
+    emit = NullSink().emit
+    assert sorts.gallop(seq, key, start, stop, emit, 0, 0, True) == bisect_right(seq, key, start, stop) - start
+    assert sorts.gallop(seq, key, start, stop, emit, 0, 0, False) == bisect_left(seq, key, start, stop) - start
+    assert sorts.gallop_back(seq, key, start, stop, emit, 0, 0, True) == stop - bisect_right(seq, key, start, stop)
+    assert sorts.gallop_back(seq, key, start, stop, emit, 0, 0, False) == stop - bisect_left(seq, key, start, stop)
+
+@pytest.mark.parametrize('n', [0, 1, 31, 32, 33, 64, 65, 1000, 10 ** 6])
+def test_min_run(n):
+    length = sorts.min_run(n)
+    if n < sorts.MIN_MERGE:
+        assert length == n
+    else:
+        assert sorts.MIN_MERGE // 2 <= length <= sorts.MIN_MERGE
+
+@pytest.mark.parametrize('distribution, n', INPUTS)
+def test_quick_sort(distribution, n):
+    check_sort('quick', datasets.generate(distribution, n, 1, 2 * n + 1, seed=n))
+
+@pytest.mark.parametrize('distribution', ['sorted', 'reversed', 'organ-pipe', 'few-unique'])
+def test_quick_sort_shapes_stay_n_log_n(distribution):
+    # The inputs a last-element pivot took quadratic time and O(n) depth on
+    n = 5000
+    trace = check_sort('quick', datasets.generate(distribution, n, seed=2))
+    assert len(trace) < 8 * n * n.bit_length()
+
+def test_quick_sort_falls_back_to_heap_sort(monkeypatch):
+    # With the worst pivot every partition peels off one element, until the
+    # depth limit hands the rest to heap sort
+    ranges = []
+    heap_sort_range = sorts.heap_sort_range
+
+    def smallest(a, emit, i, j, k):
+        return min((i, j, k), key=lambda index: a[index])
+
+    def heap_sort_logged(a, emit, low, high):
+        ranges.append((low, high))
+        heap_sort_range(a, emit, low, high)
+
+    monkeypatch.setattr(sorts, 'median_of_three', smallest)
+    monkeypatch.setattr(sorts, 'heap_sort_range', heap_sort_logged)
+    n = 2000
+    trace = check_sort('quick', datasets.generate('sorted', n, seed=1))
+    assert ranges and len(trace) < 8 * n * n.bit_length()
+
+def test_short_input_is_insertion_sorted():
+    trace = check_sort('quick', datasets.generate('random', sorts.INSERTION_CUTOFF - 1, seed=3))
+    assert PIVOT not in (op for op, _, _ in trace)
+
+def test_heap_sort_range_leaves_the_rest():
+    a = [9, 8, 7, 6, 5, 4, 3, 2, 1, 0]
+    sorts.heap_sort_range(a, NullSink().emit, 2, 6)
+    assert a == [9, 8, 3, 4, 5, 6, 7, 2, 1, 0]
+
+@pytest.mark.parametrize('name', ['heap', 'shell', 'counting', 'lsd-radix', 'msd-radix', 'bucket'])
+@pytest.mark.parametrize('distribution, n', INPUTS)
+def test_sub_quadratic_sorts(name, distribution, n):
+    check_sort(name, datasets.generate(distribution, n, 1, 2 * n + 1, seed=n))
+
+@pytest.mark.parametrize('name', ['lsd-radix', 'msd-radix', 'bucket'])
+@pytest.mark.parametrize('low, high', [(-1000, 1000), (0, 1), (-2 ** 30, 2 ** 30)])
+def test_key_sorts_any_range(name, low, high):
+    # Negative keys, one bit of range and several radix digits
+    check_sort(name, np.random.default_rng(7).integers(low, high, 700, endpoint=True))
+
+@pytest.mark.parametrize('name, peak', [('counting', lambda n, span: n + span),
+                                        ('lsd-radix', lambda n, span: n + sorts.RADIX),
+                                        ('bucket', lambda n, span: 2 * n)])
+def test_aux_counts(name, peak):
+    values = datasets.generate('random', 1000, -300, 300, seed=4)
+    trace = check_sort(name, values)
+    span = int(values.max() - values.min()) + 1
+    assert max(i for op, i, _ in trace if op == AUX) == peak(len(values), span)
+
+def test_msd_radix_sort_is_in_place():
+    # Buckets are permuted by swaps; only ranges short enough for insertion
+    # sort write
+    n = 5000
+    trace = check_sort('msd-radix', datasets.generate('uniform-unique', n, 0, 2 ** 30, seed=8))
+    assert sum(1 for op, _, _ in trace if op == WRITE) < sum(1 for op, _, _ in trace if op == SWAP)
@@ -0,0 +1,94 @@
+import random
+from functools import lru_cache
+
+import numpy as np
+import pytest
+
+from algoviz import datasets, pathfinding
+from algoviz.arraystate import ArrayReplayer, ArrayState
+from algoviz.grid import make_grid
+from algoviz.ops import record
+from algoviz.registry import SORTS
+from algoviz.timeline import UNDO_REACH, ArrayTimeline, GridTimeline
+
+# ArrayTimeline.seek restores a keyframe and replays, in blocks and then
+# step by step, or steps back through its undo log; wherever it lands, the
+# array must look as it does after replaying the trace forward from the
+# start to that step. GridTimeline.seek must likewise show the grid as the
+# search left it after that many steps.
+
+# FUNCTIONS
+def forward(values, trace, step):
+    state = ArrayState(values)
+    replayer = ArrayReplayer(state)
+    for op in list(trace)[:step]:
+        replayer.apply(*op)
+    if step == len(trace):
+        replayer.finish()
+    return state, replayer
+
+@lru_cache
+def recorded(name):
+    # Recorded once for all the parametrizations; the parallel sorts start
+    # a pool each time
+    values = datasets.generate('uniform-unique', 40, seed=2)
+    return values, record(SORTS[name].run, values.tolist())
+
+@pytest.mark.parametrize('name', list(SORTS))
+@pytest.mark.parametrize('interval', [5, 64, None])
+@pytest.mark.parametrize('reach', [3, UNDO_REACH])
+def test_seek_matches_forward_replay(name, interval, reach, monkeypatch):
+    monkeypatch.setattr('algoviz.timeline.UNDO_REACH', reach)
+    rng = random.Random(1)
+    values, trace = recorded(name)
+    state = ArrayState(values)
+    timeline = ArrayTimeline(state, trace, set(), interval)
+    for _ in range(40):
+        choice = rng.random()
+        if choice < 0.3:
+            timeline.step(rng.randint(1, 20))
+        elif choice < 0.6:
+            timeline.seek(timeline.position - rng.randint(1, 20))
+        else:
+            timeline.seek(rng.randint(0, len(trace)))
+        expected, replayer = forward(values, trace, timeline.position)
+        assert np.array_equal(state.values, expected.values)
+        assert np.array_equal(state.colors, expected.colors)
+        assert np.array_equal(state.owners, expected.owners)
+        assert list(timeline.replayer.highlighted) == list(replayer.highlighted)
+        assert timeline.replayer.pivot == replayer.pivot
+
+def test_trace_reads_from_any_step():
+    trace = record(SORTS['quick'].run, datasets.generate('uniform-unique', 300, seed=4).tolist())
+    steps = list(trace)
+    for start in (0, 1, 4095, 4096, len(steps) - 1, len(steps)):
+        assert list(trace.iter_from(start)) == steps[start:]
+        ops, first, second = trace.columns(start, min(start + 5000, len(steps)))
+        assert list(zip(ops.tolist(), first.tolist(), second.tolist())) == steps[start:start + 5000]
+
+@pytest.mark.parametrize('search', [pathfinding.dfs, pathfinding.bfs, pathfinding.astar])
+@pytest.mark.parametrize('interval', [7, None])
+def test_grid_seek_matches_the_search(search, interval):
+    def grid():
+        return make_grid(30, 30, (0, 0), (29, 29), density=0.25, seed=5)
+
+    # The grid after every step of an uninterrupted run
+    fresh = grid()
+    run = search(fresh, 0, len(fresh) - 1)
+    states = [bytes(fresh.state)]
+    while run.step():
+        states.append(bytes(fresh.state))
+
+    played = grid()
+    timeline = GridTimeline(played, search(played, 0, len(played) - 1), set(), interval)
+    rng = random.Random(3)
+    timeline.step(rng.randint(1, len(states)))
+    for _ in range(60):
+        if rng.random() < 0.3:
+            timeline.step(rng.randint(1, 40))
+        else:
+            timeline.seek(rng.randint(0, len(timeline)))
+        assert bytes(played.state) == states[timeline.position]
+    timeline.step(len(states))
+    assert len(timeline) == len(states) - 1
+
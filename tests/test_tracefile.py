@@ -0,0 +1,85 @@
+import random
+
+import numpy as np
+import pytest
+
+from algoviz import datasets
+from algoviz.arraystate import ArrayReplayer, ArrayState
+from algoviz.ops import record
+from algoviz.registry import SORTS
+from algoviz.tracefile import KEYFRAME_INTERVAL, RECORD, TraceFile, TraceWriter, keyframe_size
+
+# A recorded file holds the same operations as an in-memory trace, its
+# keyframes are the replay state at every block start, and state_at() lands
+# where a replay from the start would.
+
+# FUNCTIONS
+def same_snapshot(a, b):
+    return all(np.array_equal(x, y) if isinstance(x, np.ndarray) else x == y for x, y in zip(a, b))
+
+def write(path, name, values, interval):
+    with TraceWriter(path, values, interval) as writer:
+        SORTS[name].run(values.tolist(), writer)
+    return writer
+
+@pytest.mark.parametrize('name', list(SORTS))
+def test_round_trip_and_seek(name, tmp_path):
+    values = datasets.generate('uniform-unique', 80, seed=6)
+    trace = record(SORTS[name].run, values.tolist())
+    writer = write(tmp_path / 'run.avtr', name, values, 97)
+    tracefile = TraceFile(tmp_path / 'run.avtr')
+    assert writer.steps == len(tracefile) == len(trace)
+    assert list(tracefile) == list(trace)
+    assert list(tracefile.iter_from(150)) == list(trace)[150:]
+    ops, first, second = tracefile.columns(90, 300)
+    assert list(zip(ops.tolist(), first.tolist(), second.tolist())) == list(trace)[90:300]
+
+    checks = set(random.Random(1).sample(range(len(trace)), 10)) | {0, 96, 97, 98, len(trace)}
+    replayer = ArrayReplayer(ArrayState(values))
+    for step in range(len(trace) + 1):
+        if step % 97 == 0:
+            assert same_snapshot(tracefile.keyframe(step // 97), replayer.snapshot())
+        if step in checks:
+            _, seeked = tracefile.state_at(step)
+            if step == len(trace):
+                replayer.finish()
+            assert same_snapshot(seeked.snapshot(), replayer.snapshot())
+        if step < len(trace):
+            replayer.apply(*trace[step])
+    tracefile.close()
+
+@pytest.mark.parametrize('name', list(SORTS))
+def test_blocks_replay_like_single_steps(name):
+    values = datasets.generate('uniform-unique', 60, seed=3)
+    trace = record(SORTS[name].run, values.tolist())
+    ops, first, second = (np.asarray(column, dtype=np.int64) for column in (trace.ops, trace.first, trace.second))
+    cuts = [0] + sorted(random.Random(2).sample(range(len(trace) + 1), 8)) + [len(trace)]
+    blocks = ArrayReplayer(ArrayState(values))
+    steps = ArrayReplayer(ArrayState(values))
+    for start, stop in zip(cuts, cuts[1:]):
+        blocks.apply_block(ops[start:stop], first[start:stop], second[start:stop])
+        for k in range(start, stop):
+            steps.apply(*trace[k])
+        assert same_snapshot(blocks.snapshot(), steps.snapshot())
+
+@pytest.mark.parametrize('n', [4000, 20000])
+def test_keyframes_stay_a_small_part_of_the_file(n, tmp_path):
+    # The default interval grows with n, so keyframes cost about 1.25 bytes
+    # a step however large the array is
+    path = tmp_path / 'run.avtr'
+    writer = write(path, 'quick', datasets.generate('uniform-unique', n, seed=1), None)
+    tracefile = TraceFile(path)
+    assert writer.interval == tracefile.interval == max(KEYFRAME_INTERVAL, 8 * n)
+    steps = len(tracefile)
+    assert steps > tracefile.interval
+    keyframes = path.stat().st_size - steps * RECORD.itemsize
+    assert keyframes <= 1.3 * steps + 2 * keyframe_size(n)
+    _, replayer = tracefile.state_at(steps)
+    assert np.array_equal(replayer.state.values, np.sort(replayer.state.values))
+    tracefile.close()
+
+def test_not_a_trace(tmp_path):
+    path = tmp_path / 'other.bin'
+    path.write_bytes(bytes(64))
+    with pytest.raises(ValueError):
+        TraceFile(path)